@@ -0,0 +1,116 @@
+# Importación de numpy para el cálculo vectorizado de distancias
+# Se utiliza para calcular la fórmula de Haversine para todas las ciudades en una sola operación
+import numpy as np
+
+
+# Radio de la Tierra en kilómetros
+RADIO_TIERRA_KM = 6371
+
+
+class AlmacenCoordenadas:
+    """
+    Almacén de coordenadas geográficas precalculadas para el cálculo de distancias en línea recta.
+
+    Guarda, para cada ciudad de la representación compacta del grafo (en el mismo orden de
+    identificadores), su latitud y longitud en radianes y el coseno de la latitud. Así la
+    fórmula de Haversine no necesita volver a convertir a radianes ni recalcular el coseno
+    en cada consulta, y puede evaluarse para todas las ciudades a la vez.
+
+    Las ciudades sin coordenadas quedan marcadas con NaN.
+    """
+
+    def __init__(self, nombres, coordenadas):
+        """
+        Construye el almacén a partir de la tabla de nombres y el diccionario de coordenadas.
+
+        Args:
+            nombres (list): Nombres de las ciudades ordenados por identificador (GrafoCompacto.nombres).
+            coordenadas (dict): Diccionario {ciudad: (latitud, longitud)} en grados.
+        """
+        latitudes = np.full(len(nombres), np.nan)
+        longitudes = np.full(len(nombres), np.nan)
+        for i, nombre in enumerate(nombres):
+            lat, lon = coordenadas.get(nombre, (None, None))
+            if lat is not None and lon is not None:
+                latitudes[i] = lat
+                longitudes[i] = lon
+
+        self.latitudes_rad = np.radians(latitudes)
+        self.longitudes_rad = np.radians(longitudes)
+        self.cos_latitudes = np.cos(self.latitudes_rad)
+
+    @classmethod
+    def desde_grados(cls, latitudes, longitudes):
+        """
+        Construye el almacén directamente a partir de arreglos de coordenadas en grados.
+
+        Args:
+            latitudes (numpy.ndarray): Latitud de cada ciudad por identificador (NaN si no tiene).
+            longitudes (numpy.ndarray): Longitud de cada ciudad por identificador (NaN si no tiene).
+
+        Returns:
+            AlmacenCoordenadas: Almacén equivalente al construido con __init__, sin pasar por
+            un diccionario de coordenadas (lo usan las instantáneas del grafo).
+        """
+        almacen = cls.__new__(cls)
+        almacen.latitudes_rad = np.radians(latitudes)
+        almacen.longitudes_rad = np.radians(longitudes)
+        almacen.cos_latitudes = np.cos(almacen.latitudes_rad)
+        return almacen
+
+    def distancias_desde(self, indice):
+        """
+        Calcula la distancia en línea recta desde una ciudad hacia todas las demás.
+
+        Args:
+            indice (int): Identificador de la ciudad de referencia.
+
+        Returns:
+            numpy.ndarray: Distancias en kilómetros, una por identificador. Vale NaN para las
+            ciudades sin coordenadas (o todas, si la ciudad de referencia no tiene coordenadas).
+        """
+        lat = self.latitudes_rad[indice]
+        lon = self.longitudes_rad[indice]
+        a = np.sin((self.latitudes_rad - lat) / 2) ** 2 + \
+            self.cos_latitudes * self.cos_latitudes[indice] * np.sin((self.longitudes_rad - lon) / 2) ** 2
+        return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(a))
+
+    def completo(self):
+        """
+        Indica si todas las ciudades tienen coordenadas.
+
+        Returns:
+            bool: True si no hay ninguna ciudad sin latitud o longitud.
+        """
+        return not np.isnan(self.latitudes_rad).any()
+
+    def factor_consistencia(self, compacto):
+        """
+        Calcula el factor que hace consistente la heurística de línea recta en este grafo.
+
+        Args:
+            compacto (GrafoCompacto): Representación compacta del grafo (mismos identificadores).
+
+        Returns:
+            float: El menor cociente distancia_por_carretera / distancia_en_línea_recta entre
+            todas las aristas, limitado a 1.
+
+        Una heurística h es consistente si h(u) <= w(u, v) + h(v) para cada arista. La
+        distancia en línea recta multiplicada por este factor lo cumple siempre, aun cuando
+        algún tramo del grafo registre una distancia menor que la línea recta entre sus extremos.
+        """
+        if compacto.num_aristas == 0:
+            return 1.0
+
+        origenes = np.repeat(np.arange(compacto.num_nodos), np.diff(np.asarray(compacto.offsets)))
+        destinos = np.asarray(compacto.destinos)
+        a = np.sin((self.latitudes_rad[destinos] - self.latitudes_rad[origenes]) / 2) ** 2 + \
+            self.cos_latitudes[origenes] * self.cos_latitudes[destinos] * \
+            np.sin((self.longitudes_rad[destinos] - self.longitudes_rad[origenes]) / 2) ** 2
+        rectas = 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(a))
+
+        validas = rectas > 0
+        if not validas.any():
+            return 1.0
+        cocientes = np.asarray(compacto.pesos, dtype=np.float64)[validas] / rectas[validas]
+        return float(min(1.0, cocientes.min()))
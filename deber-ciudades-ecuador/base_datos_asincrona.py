@@ -0,0 +1,239 @@
+# Importación de asyncio para exponer la base de datos con corrutinas
+import asyncio
+
+# Importación de ThreadPoolExecutor para ejecutar las consultas bloqueantes fuera del bucle de eventos
+from concurrent.futures import ThreadPoolExecutor
+
+# Importación de functools para pasar argumentos con nombre al ejecutor
+import functools
+
+# Módulo local con la base de datos síncrona (en modo pool, una conexión por hilo)
+from base_datos_rutas import BaseDatosRutas
+
+# Cantidad de hilos por defecto del ejecutor; acota las consultas simultáneas a SQLite
+HILOS_EJECUTOR = 8
+
+
+class BaseDatosAsincrona:
+    """
+    Fachada asíncrona de BaseDatosRutas, pensada para servicios basados en asyncio.
+
+    Cada método es una corrutina que ejecuta la consulta de BaseDatosRutas en un ejecutor
+    con un número acotado de hilos, de modo que el bucle de eventos nunca se bloquea. La
+    base de datos se abre en modo pool: cada hilo del ejecutor lee con su propia conexión
+    (las lecturas se ejecutan en paralelo) y las escrituras pasan por el hilo escritor.
+
+    Las llamadas concurrentes a agregar_ruta sin coordenadas se agrupan: todas las que
+    llegan en la misma vuelta del bucle de eventos se guardan con un solo agregar_rutas,
+    es decir, en una sola transacción.
+
+    Ejemplo:
+        async with BaseDatosAsincrona('rutas_ecuador.db') as db:
+            conexiones = await db.listar_conexiones("Quito")
+    """
+
+    def __init__(self, ruta_db='rutas_ecuador.db', hilos=HILOS_EJECUTOR):
+        """
+        Abre la base de datos y crea el ejecutor.
+
+        Args:
+            ruta_db (str): Ruta del archivo de la base de datos.
+            hilos (int, optional): Máximo de consultas que se ejecutan a la vez.
+        """
+        self.db = BaseDatosRutas(ruta_db, pool=True)
+        self._ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="consultas-db")
+        # Rutas pendientes de guardar en el próximo lote: (origen, destino, distancia, futuro)
+        self._rutas_pendientes = []
+        self._tarea_lote = None
+
+    async def __aenter__(self):
+        """Permite usar la fachada con async with."""
+        return self
+
+    async def __aexit__(self, tipo, valor, traza):
+        """Cierra la base de datos al salir del bloque async with."""
+        await self.cerrar()
+
+    async def _ejecutar(self, metodo, *args, **kwargs):
+        """
+        Ejecuta un método de BaseDatosRutas en el ejecutor y espera su resultado.
+
+        Args:
+            metodo (callable): Método de self.db.
+            *args: Argumentos posicionales del método.
+            **kwargs: Argumentos con nombre del método.
+
+        Returns:
+            object: Lo que retorne el método.
+        """
+        bucle = asyncio.get_running_loop()
+        return await bucle.run_in_executor(self._ejecutor, functools.partial(metodo, *args, **kwargs))
+
+    # Lecturas
+
+    async def obtener_coordenadas(self, nombre):
+        """Versión asíncrona de BaseDatosRutas.obtener_coordenadas."""
+        return await self._ejecutar(self.db.obtener_coordenadas, nombre)
+
+    async def obtener_distancia(self, origen, destino):
+        """Versión asíncrona de BaseDatosRutas.obtener_distancia."""
+        return await self._ejecutar(self.db.obtener_distancia, origen, destino)
+
+    async def listar_ciudades(self):
+        """Versión asíncrona de BaseDatosRutas.listar_ciudades."""
+        return await self._ejecutar(self.db.listar_ciudades)
+
+    async def listar_ciudades_con_coordenadas(self):
+        """Versión asíncrona de BaseDatosRutas.listar_ciudades_con_coordenadas."""
+        return await self._ejecutar(self.db.listar_ciudades_con_coordenadas)
+
+    async def listar_conexiones(self, ciudad):
+        """Versión asíncrona de BaseDatosRutas.listar_conexiones."""
+        return await self._ejecutar(self.db.listar_conexiones, ciudad)
+
+    async def obtener_grafo_completo(self):
+        """Versión asíncrona de BaseDatosRutas.obtener_grafo_completo."""
+        return await self._ejecutar(self.db.obtener_grafo_completo)
+
+    async def obtener_grafo_completo_con_coords(self):
+        """Versión asíncrona de BaseDatosRutas.obtener_grafo_completo_con_coords."""
+        return await self._ejecutar(self.db.obtener_grafo_completo_con_coords)
+
+    async def ciudades_alcanzables(self, origen, distancia_maxima):
+        """Versión asíncrona de BaseDatosRutas.ciudades_alcanzables."""
+        return await self._ejecutar(self.db.ciudades_alcanzables, origen, distancia_maxima)
+
+    async def ruta_mas_corta(self, origen, destino, distancia_maxima):
+        """Versión asíncrona de BaseDatosRutas.ruta_mas_corta."""
+        return await self._ejecutar(self.db.ruta_mas_corta, origen, destino, distancia_maxima)
+
+    async def ultimo_cambio(self):
+        """Versión asíncrona de BaseDatosRutas.ultimo_cambio."""
+        return await self._ejecutar(self.db.ultimo_cambio)
+
+    async def aplicar_cambios_desde(self, seq, grafo):
+        """Versión asíncrona de BaseDatosRutas.aplicar_cambios_desde."""
+        return await self._ejecutar(self.db.aplicar_cambios_desde, seq, grafo)
+
+    async def exportar_a_json(self, ruta_archivo):
+        """Versión asíncrona de BaseDatosRutas.exportar_a_json."""
+        return await self._ejecutar(self.db.exportar_a_json, ruta_archivo)
+
+    # Escrituras
+
+    async def agregar_ciudad(self, nombre, latitud=None, longitud=None):
+        """Versión asíncrona de BaseDatosRutas.agregar_ciudad."""
+        return await self._ejecutar(self.db.agregar_ciudad, nombre, latitud, longitud)
+
+    async def actualizar_coordenadas(self, nombre, latitud, longitud):
+        """Versión asíncrona de BaseDatosRutas.actualizar_coordenadas."""
+        return await self._ejecutar(self.db.actualizar_coordenadas, nombre, latitud, longitud)
+
+    async def agregar_ruta(self, origen, destino, distancia, origen_lat=None, origen_lng=None,
+                           destino_lat=None, destino_lng=None):
+        """
+        Versión asíncrona de BaseDatosRutas.agregar_ruta.
+
+        Args:
+            origen (str): Ciudad de origen.
+            destino (str): Ciudad de destino.
+            distancia (int): Distancia en kilómetros.
+            origen_lat, origen_lng, destino_lat, destino_lng (float, optional): Coordenadas.
+
+        Returns:
+            bool: True si la ruta se agregó correctamente, False si hubo error
+
+        Sin coordenadas, la ruta se agrega al lote pendiente (ver _guardar_lote); con
+        coordenadas se guarda individualmente.
+        """
+        if any(valor is not None for valor in (origen_lat, origen_lng, destino_lat, destino_lng)):
+            return await self._ejecutar(self.db.agregar_ruta, origen, destino, distancia,
+                                        origen_lat, origen_lng, destino_lat, destino_lng)
+
+        bucle = asyncio.get_running_loop()
+        futuro = bucle.create_future()
+        if not self._rutas_pendientes:
+            # La tarea empieza después de las corrutinas ya listas, que suman sus rutas al lote
+            self._tarea_lote = bucle.create_task(self._guardar_lote())
+        self._rutas_pendientes.append((origen, destino, distancia, futuro))
+        return await futuro
+
+    async def _guardar_lote(self):
+        """
+        Guarda las rutas pendientes con un solo agregar_rutas.
+
+        Si la transacción del lote falla, las rutas se reintentan de a una para que cada
+        llamada reciba su propio resultado.
+        """
+        lote, self._rutas_pendientes = self._rutas_pendientes, []
+        rutas = [ruta[:3] for ruta in lote]
+        try:
+            if await self._ejecutar(self.db.agregar_rutas, rutas):
+                resultados = [True] * len(lote)
+            else:
+                resultados = [await self._ejecutar(self.db.agregar_ruta, *ruta) for ruta in rutas]
+        except Exception as e:
+            for *_, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+        for (*_, futuro), resultado in zip(lote, resultados):
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+    async def agregar_rutas(self, rutas):
+        """Versión asíncrona de BaseDatosRutas.agregar_rutas (una sola transacción)."""
+        return await self._ejecutar(self.db.agregar_rutas, list(rutas))
+
+    async def eliminar_ruta(self, origen, destino):
+        """Versión asíncrona de BaseDatosRutas.eliminar_ruta."""
+        return await self._ejecutar(self.db.eliminar_ruta, origen, destino)
+
+    async def eliminar_ciudad(self, nombre):
+        """Versión asíncrona de BaseDatosRutas.eliminar_ciudad."""
+        return await self._ejecutar(self.db.eliminar_ciudad, nombre)
+
+    async def importar_grafo_masivo(self, grafo_dict, coords_dict=None):
+        """Versión asíncrona de BaseDatosRutas.importar_grafo_masivo."""
+        return await self._ejecutar(self.db.importar_grafo_masivo, grafo_dict, coords_dict)
+
+    async def importar_desde_json(self, ruta_archivo, masivo=True):
+        """Versión asíncrona de BaseDatosRutas.importar_desde_json (masiva por defecto)."""
+        return await self._ejecutar(self.db.importar_desde_json, ruta_archivo, masivo=masivo)
+
+    async def cerrar(self):
+        """
+        Espera las escrituras pendientes, detiene el ejecutor y cierra las conexiones.
+        """
+        if self._tarea_lote is not None:
+            await self._tarea_lote
+        self._ejecutor.shutdown(wait=True)
+        self.db.cerrar()
+
+
+if __name__ == "__main__":
+    """
+    Ejemplo de uso: muchas consultas y escrituras concurrentes sobre una base de datos de prueba.
+    """
+    # Importación de time para medir las consultas concurrentes
+    import time
+
+    async def ejemplo():
+        async with BaseDatosAsincrona('rutas_ecuador_test.db') as db:
+            # 200 rutas agregadas a la vez: se guardan en un solo lote
+            inicio = time.perf_counter()
+            resultados = await asyncio.gather(*(
+                db.agregar_ruta(f"Ciudad {i}", f"Ciudad {i + 1}", 10 + i % 7) for i in range(200)
+            ))
+            print(f"{sum(resultados)} rutas agregadas en {time.perf_counter() - inicio:.3f} s")
+
+            # 200 consultas concurrentes, repartidas entre los hilos del ejecutor
+            inicio = time.perf_counter()
+            conexiones = await asyncio.gather(*(db.listar_conexiones(f"Ciudad {i}") for i in range(200)))
+            print(f"{len(conexiones)} consultas en {time.perf_counter() - inicio:.3f} s")
+            print("Conexiones de Ciudad 1:", conexiones[1])
+
+            grafo, _ = await db.obtener_grafo_completo_con_coords()
+            print(f"Grafo con {len(grafo)} ciudades")
+
+    asyncio.run(ejemplo())
@@ -6,28 +6,249 @@ import sqlite3
 # Se utiliza para importar/exportar datos en formato JSON
 import json
 
+# Importación de time para medir la velocidad de la importación masiva
+import time
+
+# Importación de threading, contextlib y functools para el modo con varias conexiones
+# (una por hilo) y los administradores de contexto de las transacciones
+import contextlib
+import functools
+import threading
+
+# Importación del lector y escritor NDJSON para importar y exportar grafos grandes por partes
+from formato_ndjson import es_ndjson, escribir_ndjson, leer_ndjson
+
+# Importación del hilo escritor, por el que pasan todas las escrituras en el modo pool
+from hilo_escritor import HiloEscritor
+
+# Cantidad de filas que se leen por cada llamada a fetchmany al cargar el grafo completo
+TAMANO_LOTE = 5000
+
+# Pragmas que se aplican a cada conexión:
+# - WAL permite leer mientras se escribe y evita reescribir el archivo en cada commit
+# - synchronous=NORMAL es seguro con WAL y solo sincroniza el disco en los checkpoints
+# - cache_size negativo se expresa en KiB (64 MiB) y mmap_size en bytes (256 MiB)
+# - temp_store=MEMORY mantiene en memoria las tablas temporales (importación masiva)
+PRAGMAS_CONEXION = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Registro de cambios: cada fila insertada, modificada o eliminada en 'ciudades' o 'rutas'
+# agrega una fila con un número de secuencia creciente (AUTOINCREMENT nunca reutiliza un
+# número). Se guardan los nombres y no los IDs, para poder aplicar la eliminación de una
+# ciudad aunque ya no exista. tipo es 'ciudad', 'ruta' o 'grafo'; operacion es 'insertar',
+# 'actualizar', 'eliminar' o 'reiniciar' (el grafo se reemplazó por completo)
+SQL_TABLA_CAMBIOS = '''
+CREATE TABLE IF NOT EXISTS cambios (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo TEXT NOT NULL,
+    operacion TEXT NOT NULL,
+    origen TEXT,
+    destino TEXT,
+    distancia INTEGER,
+    latitud REAL,
+    longitud REAL
+)
+'''
+
+# Disparadores que llenan la tabla cambios, por nombre (importar_grafo_masivo los quita
+# durante la importación y deja un solo cambio 'reiniciar')
+DISPARADORES_CAMBIOS = {
+    nombre: f"CREATE TRIGGER IF NOT EXISTS {nombre} AFTER {evento} ON {tabla} BEGIN "
+            f"INSERT INTO cambios (tipo, operacion, origen, destino, distancia, latitud, longitud) "
+            f"VALUES ({valores}); END"
+    for nombre, evento, tabla, valores in (
+        ("cambios_ciudad_insertar", "INSERT", "ciudades",
+         "'ciudad', 'insertar', NEW.nombre, NULL, NULL, NEW.latitud, NEW.longitud"),
+        ("cambios_ciudad_actualizar", "UPDATE", "ciudades",
+         "'ciudad', 'actualizar', NEW.nombre, NULL, NULL, NEW.latitud, NEW.longitud"),
+        ("cambios_ciudad_eliminar", "DELETE", "ciudades",
+         "'ciudad', 'eliminar', OLD.nombre, NULL, NULL, NULL, NULL"),
+        ("cambios_ruta_insertar", "INSERT", "rutas",
+         "'ruta', 'insertar', (SELECT nombre FROM ciudades WHERE id = NEW.origen_id), "
+         "(SELECT nombre FROM ciudades WHERE id = NEW.destino_id), NEW.distancia, NULL, NULL"),
+        ("cambios_ruta_actualizar", "UPDATE", "rutas",
+         "'ruta', 'actualizar', (SELECT nombre FROM ciudades WHERE id = NEW.origen_id), "
+         "(SELECT nombre FROM ciudades WHERE id = NEW.destino_id), NEW.distancia, NULL, NULL"),
+        ("cambios_ruta_eliminar", "DELETE", "rutas",
+         "'ruta', 'eliminar', (SELECT nombre FROM ciudades WHERE id = OLD.origen_id), "
+         "(SELECT nombre FROM ciudades WHERE id = OLD.destino_id), NULL, NULL, NULL"),
+    )
+}
+
+# Índices de cobertura de la tabla rutas, por nombre. Las importaciones que reemplazan
+# todo el grafo los quitan y los vuelven a crear al final: construir un índice de una vez
+# ordenando las filas es más rápido que actualizarlo con cada inserción
+INDICES_RUTAS = {
+    # Índice de cobertura para buscar por origen (obtener_distancia, listar_conexiones,
+    # carga del grafo) sin leer la tabla
+    "idx_rutas_origen": "CREATE INDEX IF NOT EXISTS idx_rutas_origen ON rutas (origen_id, destino_id, distancia)",
+    # Índice para las búsquedas por destino (rutas que llegan a una ciudad, eliminar_ciudad)
+    "idx_rutas_destino": "CREATE INDEX IF NOT EXISTS idx_rutas_destino ON rutas (destino_id, origen_id, distancia)",
+}
+
+# Migraciones del esquema: (versión, sentencias). PRAGMA user_version guarda la última
+# versión aplicada; para cambiar el esquema se agrega una entrada con la versión siguiente
+MIGRACIONES = (
+    # Índices de cobertura por origen y por destino (ver INDICES_RUTAS)
+    (1, tuple(INDICES_RUTAS.values())),
+    # Registro de cambios para sincronizar grafos en memoria (ver aplicar_cambios_desde)
+    (2, (SQL_TABLA_CAMBIOS, *DISPARADORES_CAMBIOS.values())),
+)
+
+# Sentencias parametrizadas de uso frecuente. Se usa siempre el mismo texto para que
+# sqlite3 reutilice la sentencia ya compilada de su caché en lugar de volver a prepararla
+SQL_ID_CIUDAD = "SELECT id FROM ciudades WHERE nombre = ?"
+SQL_INSERTAR_CIUDAD = "INSERT OR IGNORE INTO ciudades (nombre, latitud, longitud) VALUES (?, ?, ?)"
+SQL_COMPLETAR_COORDENADAS = ("UPDATE ciudades SET latitud = ?, longitud = ? "
+                             "WHERE nombre = ? AND (latitud IS NULL OR longitud IS NULL)")
+SQL_INSERTAR_RUTA = "INSERT OR REPLACE INTO rutas (origen_id, destino_id, distancia) VALUES (?, ?, ?)"
+SQL_ELIMINAR_RUTA = "DELETE FROM rutas WHERE origen_id = ? AND destino_id = ?"
+
+# Sentencias de la importación por flujo (ver importar_registros): la ciudad con
+# coordenadas reemplaza las de una ciudad ya creada por una ruta, y cada bloque de rutas
+# traduce los nombres a IDs con un solo JOIN contra la tabla temporal rutas_bloque
+SQL_GUARDAR_CIUDAD = ("INSERT INTO ciudades (nombre, latitud, longitud) VALUES (?, ?, ?) "
+                      "ON CONFLICT (nombre) DO UPDATE SET latitud = excluded.latitud, "
+                      "longitud = excluded.longitud")
+SQL_INSERTAR_RUTAS_BLOQUE = (
+    "INSERT INTO rutas (origen_id, destino_id, distancia) "
+    "SELECT c_origen.id, c_destino.id, b.distancia FROM rutas_bloque b "
+    "JOIN ciudades c_origen ON c_origen.nombre = b.origen "
+    "JOIN ciudades c_destino ON c_destino.nombre = b.destino "
+    # WHERE true evita que SQLite confunda ON CONFLICT con la condición del JOIN
+    "WHERE true ON CONFLICT (origen_id, destino_id) DO UPDATE SET distancia = excluded.distancia"
+)
+
+# Búsqueda acotada dentro de SQLite (ver ciudades_alcanzables y ruta_mas_corta). La
+# consulta recursiva recorre los caminos desde el origen con una cola ordenada por
+# distancia, descartando los que superan :limite. UNION (y no UNION ALL) deja una sola
+# fila por cada par (ciudad, distancia): como las distancias son enteras, cada ciudad
+# aparece a lo sumo :limite + 1 veces, en lugar de una vez por cada camino que llega a ella
+SQL_CTE_ALCANCE = (
+    "WITH RECURSIVE alcance (id, distancia) AS ("
+    "SELECT id, 0 FROM ciudades WHERE nombre = :origen "
+    "UNION "
+    "SELECT r.destino_id, a.distancia + r.distancia FROM alcance a "
+    "JOIN rutas r ON r.origen_id = a.id "
+    "WHERE a.distancia + r.distancia <= :limite "
+    "ORDER BY 2) "
+)
+# Menor distancia de cada ciudad alcanzada y su predecesor: una ciudad desde la que se
+# llega con una sola ruta sumando exactamente esa distancia (índice idx_rutas_destino)
+SQL_CIUDADES_ALCANZABLES = SQL_CTE_ALCANCE + (
+    ", mejores (id, distancia) AS (SELECT id, MIN(distancia) FROM alcance GROUP BY id) "
+    "SELECT c.nombre, m.distancia, "
+    "(SELECT c_anterior.nombre FROM rutas r "
+    "JOIN mejores p ON p.id = r.origen_id "
+    "JOIN ciudades c_anterior ON c_anterior.id = p.id "
+    "WHERE r.destino_id = m.id AND p.distancia + r.distancia = m.distancia "
+    "AND c.nombre <> :origen LIMIT 1) "
+    "FROM mejores m JOIN ciudades c ON c.id = m.id "
+    "ORDER BY m.distancia, c.nombre"
+)
+# Como la cola sale en orden de distancia, la primera fila del destino es la más corta y
+# LIMIT 1 detiene la consulta recursiva ahí, sin recorrer el resto del radio
+SQL_DISTANCIA_MINIMA = SQL_CTE_ALCANCE + (
+    "SELECT distancia FROM alcance "
+    "WHERE id = (SELECT id FROM ciudades WHERE nombre = :destino) LIMIT 1"
+)
+
+# Máximo de nombres por consulta "WHERE nombre IN (...)", por debajo del límite de
+# parámetros de SQLite
+LIMITE_PARAMETROS = 500
+
+
+def escritura(metodo):
+    """
+    Decorador para los métodos de BaseDatosRutas que modifican la base de datos.
+    
+    Args:
+        metodo (callable): Método que escribe en la base de datos.
+    
+    Returns:
+        callable: En el modo pool, el método se ejecuta en el hilo escritor (con su
+        conexión) y el hilo que lo llamó espera el resultado. Sin pool, se llama directamente.
+    """
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        if self.pool and not self._escritor.es_propietario():
+            return self._escritor.ejecutar(metodo, self, *args, **kwargs)
+        return metodo(self, *args, **kwargs)
+    
+    return envoltura
+
 class BaseDatosRutas:
     """
     Clase que maneja la base de datos de rutas entre ciudades del Ecuador.
     Permite almacenar ciudades con sus coordenadas geográficas y las rutas
     que las conectan, incluyendo la distancia entre ellas.
+    
+    Con pool=True la misma instancia se puede usar desde varios hilos (por ejemplo, la
+    interfaz y un trabajador en segundo plano): cada hilo lee con su propia conexión, de
+    modo que las lecturas se ejecutan en paralelo gracias al modo WAL, y todas las
+    escrituras pasan por un único hilo escritor (ver HiloEscritor).
     """
-
-    def __init__(self, ruta_db='rutas_ecuador.db'):
+    
+    def __init__(self, ruta_db='rutas_ecuador.db', pool=False):
         """
         Constructor de la clase BaseDatosRutas.
-
+        
         Args:
             ruta_db (str): Ruta del archivo de la base de datos. Por defecto es 'rutas_ecuador.db'
-
+            pool (bool, optional): Si es True, usa una conexión por hilo y un hilo escritor
+        
         Inicializa la conexión a la base de datos y crea las tablas necesarias
         si no existen.
         """
         self.ruta_db = ruta_db
-        self.conexion = None
-        self.cursor = None
+        self.pool = pool
+        # Conexión y cursor del modo sin pool; en el modo pool cada hilo tiene los suyos
+        self._conexion = None
+        self._cursor = None
+        # Datos propios de cada hilo: conexión, cursor y profundidad de transacciones anidadas
+        self._local = threading.local()
+        # Todas las conexiones abiertas, para cerrarlas desde cerrar()
+        self._conexiones = []
+        self._bloqueo_conexiones = threading.Lock()
+        self._escritor = HiloEscritor() if pool else None
+        # Caché nombre -> id de las ciudades ya consultadas o insertadas por esta instancia
+        self._ids_ciudades = {}
         self.conectar()
         self.crear_tablas()
+    
+    @property
+    def conexion(self):
+        """
+        Conexión a la base de datos del hilo actual.
+        
+        Returns:
+            sqlite3.Connection: La conexión única sin pool; en el modo pool, la conexión del
+            hilo actual, que se abre la primera vez que el hilo la necesita
+        """
+        if not self.pool:
+            return self._conexion
+        if getattr(self._local, "conexion", None) is None:
+            self.conectar()
+        return self._local.conexion
+    
+    @property
+    def cursor(self):
+        """
+        Cursor de la conexión del hilo actual.
+        
+        Returns:
+            sqlite3.Cursor: Cursor para ejecutar consultas (ver conexion)
+        """
+        if not self.pool:
+            return self._cursor
+        if getattr(self._local, "cursor", None) is None:
+            self.conectar()
+        return self._local.cursor
 
     def conectar(self):
     
@@ -37,16 +258,107 @@ class BaseDatosRutas:
         Establece una conexión con la base de datos SQLite especificada en self.ruta_db.
         Inicializa tanto la conexión como el cursor que se usará para ejecutar consultas.
         Si hay algún error durante la conexión, lo captura y muestra un mensaje.
+        
+        La conexión queda en modo autocommit (isolation_level=None): las transacciones se
+        abren y cierran explícitamente con transaccion() y lectura(). En el modo pool, la
+        conexión pertenece al hilo actual.
         """
         try:
-            # Establece la conexión con la base de datos
-            self.conexion = sqlite3.connect(self.ruta_db)
+            # Establece la conexión con la base de datos. En el modo pool, cerrar() cierra
+            # las conexiones de todos los hilos, por eso no se restringen al hilo que las creó
+            conexion = sqlite3.connect(self.ruta_db, isolation_level=None, check_same_thread=not self.pool)
             # Crea un cursor para ejecutar consultas SQL
-            self.cursor = self.conexion.cursor()
+            cursor = conexion.cursor()
+            # Configura el diario WAL, la sincronización y las cachés (ver PRAGMAS_CONEXION)
+            for pragma in PRAGMAS_CONEXION:
+                cursor.execute(pragma)
+            
+            if self.pool:
+                self._local.conexion, self._local.cursor = conexion, cursor
+            else:
+                self._conexion, self._cursor = conexion, cursor
+            with self._bloqueo_conexiones:
+                self._conexiones.append(conexion)
             print(f"Conexión establecida con {self.ruta_db}")
         except sqlite3.Error as e:
             print(f"Error al conectar a la base de datos: {e}")
+    
+    @contextlib.contextmanager
+    def transaccion(self):
+        """
+        Administrador de contexto para ejecutar varias escrituras como una sola transacción.
+        
+        Yields:
+            sqlite3.Cursor: Cursor de la conexión que escribe
+        
+        Al salir del bloque se confirman los cambios; si ocurre una excepción, se revierten
+        y la excepción se propaga. Las transacciones se pueden anidar: las internas usan
+        SAVEPOINT, de modo que un error interno revierte solo su parte.
+        
+        En el modo pool, el hilo actual toma prestado el hilo escritor durante el bloque:
+        los métodos de escritura que se llamen dentro se ejecutan en este hilo y en esta
+        transacción, y las escrituras de los demás hilos esperan a que termine.
+        
+        Ejemplo:
+            with db.transaccion():
+                db.eliminar_ruta("Quito", "Ambato")
+                db.agregar_ruta("Quito", "Ambato", 115)
+        """
+        if self.pool and not self._escritor.es_propietario():
+            with self._escritor.prestar():
+                with self.transaccion() as cursor:
+                    yield cursor
+            return
+        
+        cursor = self.cursor
+        profundidad = getattr(self._local, "profundidad", 0)
+        punto = f"nivel_{profundidad}"
+        cursor.execute("BEGIN IMMEDIATE" if profundidad == 0 else f"SAVEPOINT {punto}")
+        self._local.profundidad = profundidad + 1
+        if profundidad == 0:
+            # Con el bloqueo de escritura tomado ninguna otra conexión puede cambiar los IDs
+            self._validar_ids_ciudades()
+        try:
+            yield cursor
+            cursor.execute("COMMIT" if profundidad == 0 else f"RELEASE {punto}")
+        except BaseException:
+            if profundidad == 0:
+                cursor.execute("ROLLBACK")
+            else:
+                cursor.execute(f"ROLLBACK TO {punto}")
+                cursor.execute(f"RELEASE {punto}")
+            # Las ciudades insertadas en la parte revertida ya no existen
+            self._ids_ciudades.clear()
+            raise
+        finally:
+            self._local.profundidad = profundidad
+    
+    @contextlib.contextmanager
+    def lectura(self):
+        """
+        Administrador de contexto para varias consultas que deben ver el mismo estado.
+        
+        Yields:
+            sqlite3.Cursor: Cursor de la conexión del hilo actual
+        
+        Abre una transacción de lectura: todas las consultas del bloque ven la base de datos
+        tal como estaba al empezar, aunque otro hilo escriba mientras tanto (en modo WAL
+        las escrituras no bloquean a los lectores ni los lectores a las escrituras).
+        """
+        if getattr(self._local, "profundidad", 0) > 0:
+            yield self.cursor
+            return
+        
+        cursor = self.cursor
+        cursor.execute("BEGIN")
+        self._local.profundidad = 1
+        try:
+            yield cursor
+        finally:
+            self._local.profundidad = 0
+            cursor.execute("COMMIT")
 
+    @escritura
     def crear_tablas(self):
     
         """
@@ -56,47 +368,145 @@ class BaseDatosRutas:
         1. 'ciudades': Almacena información de cada ciudad incluyendo sus coordenadas
         2. 'rutas': Almacena las conexiones entre ciudades y sus distancias
         
-        También verifica y agrega las columnas de coordenadas si no existen.
+        También verifica y agrega las columnas de coordenadas si no existen, y aplica
+        las migraciones pendientes del esquema (ver migrar_esquema).
         """
         try:
-            # Crear tabla de ciudades con sus coordenadas
-            self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS ciudades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT UNIQUE NOT NULL,
-                latitud REAL DEFAULT NULL,
-                longitud REAL DEFAULT NULL
-            )
-            ''')
-            
-            # Crear tabla de rutas con referencias a las ciudades
-            self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS rutas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                origen_id INTEGER NOT NULL,
-                destino_id INTEGER NOT NULL,
-                distancia INTEGER NOT NULL,
-                FOREIGN KEY (origen_id) REFERENCES ciudades (id),
-                FOREIGN KEY (destino_id) REFERENCES ciudades (id),
-                UNIQUE (origen_id, destino_id)
-            )
-            ''')
-            
-            # Verificar si las columnas de coordenadas existen, si no, agregarlas
-            try:
-                self.cursor.execute("SELECT latitud, longitud FROM ciudades LIMIT 1")
-            except sqlite3.OperationalError:
-                # Agregar columnas de coordenadas si no existen
-                self.cursor.execute("ALTER TABLE ciudades ADD COLUMN latitud REAL DEFAULT NULL")
-                self.cursor.execute("ALTER TABLE ciudades ADD COLUMN longitud REAL DEFAULT NULL")
-                print("Columnas de coordenadas agregadas a la tabla ciudades")
-            
-            # Guardar los cambios en la base de datos
-            self.conexion.commit()
+            with self.transaccion():
+                # Crear tabla de ciudades con sus coordenadas
+                self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS ciudades (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    nombre TEXT UNIQUE NOT NULL,
+                    latitud REAL DEFAULT NULL,
+                    longitud REAL DEFAULT NULL
+                )
+                ''')
+                
+                # Crear tabla de rutas con referencias a las ciudades
+                self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS rutas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    origen_id INTEGER NOT NULL,
+                    destino_id INTEGER NOT NULL,
+                    distancia INTEGER NOT NULL,
+                    FOREIGN KEY (origen_id) REFERENCES ciudades (id),
+                    FOREIGN KEY (destino_id) REFERENCES ciudades (id),
+                    UNIQUE (origen_id, destino_id)
+                )
+                ''')
+                
+                # Verificar si las columnas de coordenadas existen, si no, agregarlas
+                try:
+                    self.cursor.execute("SELECT latitud, longitud FROM ciudades LIMIT 1")
+                except sqlite3.OperationalError:
+                    # Agregar columnas de coordenadas si no existen
+                    self.cursor.execute("ALTER TABLE ciudades ADD COLUMN latitud REAL DEFAULT NULL")
+                    self.cursor.execute("ALTER TABLE ciudades ADD COLUMN longitud REAL DEFAULT NULL")
+                    print("Columnas de coordenadas agregadas a la tabla ciudades")
+            
+            self.migrar_esquema()
             print("Tablas creadas correctamente")
         except sqlite3.Error as e:
             print(f"Error al crear las tablas: {e}")
     
+    @escritura
+    def migrar_esquema(self):
+        """
+        Método para aplicar las migraciones del esquema que aún no se aplicaron.
+        
+        Returns:
+            int: Versión del esquema después de migrar
+            
+        Lee PRAGMA user_version y ejecuta, en orden, las migraciones de MIGRACIONES con
+        una versión mayor. Cada migración se aplica en su propia transacción junto con la
+        actualización de user_version, de modo que un error deja la base de datos en la
+        última versión completa.
+        """
+        self.cursor.execute("PRAGMA user_version")
+        version = self.cursor.fetchone()[0]
+        
+        for version_migracion, sentencias in MIGRACIONES:
+            if version_migracion <= version:
+                continue
+            with self.transaccion():
+                for sentencia in sentencias:
+                    self.cursor.execute(sentencia)
+                # PRAGMA no admite parámetros; la versión es un entero de MIGRACIONES
+                self.cursor.execute(f"PRAGMA user_version = {version_migracion}")
+            version = version_migracion
+            print(f"Esquema de la base de datos migrado a la versión {version}")
+        
+        return version
+    
+    def _validar_ids_ciudades(self):
+        """
+        Método auxiliar que vacía la caché nombre -> id si otra conexión escribió en la base de datos.
+        
+        La caché solo es válida mientras nadie más modifique la tabla ciudades: si otra
+        conexión (de otro proceso, de otra instancia o de otro hilo en el modo pool) elimina
+        una ciudad y la vuelve a agregar, la ciudad recibe un ID nuevo. PRAGMA data_version
+        cambia cuando otra conexión confirma una transacción, así que se compara con el valor
+        visto la última vez por la conexión del hilo actual; la primera vez que una conexión
+        lo consulta, la caché también se vacía.
+        
+        Se llama al empezar cada transacción de escritura, que es donde se usa la caché.
+        """
+        self.cursor.execute("PRAGMA data_version")
+        version = self.cursor.fetchone()[0]
+        if getattr(self._local, "version_datos", None) != version:
+            self._ids_ciudades.clear()
+            self._local.version_datos = version
+    
+    def _obtener_id_ciudad(self, nombre):
+        """
+        Método auxiliar para obtener el ID de una ciudad usando la caché nombre -> id.
+        
+        Args:
+            nombre (str): Nombre de la ciudad
+        
+        Returns:
+            int or None: ID de la ciudad, None si no existe
+        
+        Solo se consulta la base de datos la primera vez que se pide cada ciudad. Las
+        ciudades inexistentes no se guardan en la caché. Debe llamarse dentro de una
+        transacción de escritura (ver _validar_ids_ciudades).
+        """
+        ciudad_id = self._ids_ciudades.get(nombre)
+        if ciudad_id is None:
+            self.cursor.execute(SQL_ID_CIUDAD, (nombre,))
+            resultado = self.cursor.fetchone()
+            if resultado:
+                ciudad_id = self._ids_ciudades[nombre] = resultado[0]
+        return ciudad_id
+    
+    def _insertar_ciudad(self, nombre, latitud=None, longitud=None):
+        """
+        Método auxiliar que inserta una ciudad sin confirmar la transacción.
+        
+        Args:
+            nombre (str): Nombre de la ciudad a agregar
+            latitud (float, optional): Latitud geográfica de la ciudad
+            longitud (float, optional): Longitud geográfica de la ciudad
+        
+        Returns:
+            int: ID de la ciudad (recién insertada o existente)
+        """
+        # Intentar insertar la ciudad, ignorando si ya existe
+        self.cursor.execute(SQL_INSERTAR_CIUDAD, (nombre, latitud, longitud))
+        
+        # Si se insertó, su ID es el de la fila nueva y reemplaza al que hubiera en la caché
+        if self.cursor.rowcount == 1:
+            self._ids_ciudades[nombre] = self.cursor.lastrowid
+        
+        # Si la ciudad ya existía pero sin coordenadas, actualizamos
+        if latitud is not None and longitud is not None:
+            self.cursor.execute(SQL_COMPLETAR_COORDENADAS, (latitud, longitud, nombre))
+        
+        # Obtener el ID de la ciudad (sea recién insertada o existente)
+        return self._obtener_id_ciudad(nombre)
+    
+    @escritura
     def agregar_ciudad(self, nombre, latitud=None, longitud=None):
         """
         Método para agregar una nueva ciudad a la base de datos.
@@ -110,29 +520,14 @@ class BaseDatosRutas:
             int or None: ID de la ciudad si se agregó correctamente, None si hubo error
         """
         try:
-            # Intentar insertar la ciudad, ignorando si ya existe
-            self.cursor.execute(
-                "INSERT OR IGNORE INTO ciudades (nombre, latitud, longitud) VALUES (?, ?, ?)", 
-                (nombre, latitud, longitud)
-            )
-            self.conexion.commit()
-            
-            # Si la ciudad ya existía pero sin coordenadas, actualizamos
-            if latitud is not None and longitud is not None:
-                self.cursor.execute(
-                    "UPDATE ciudades SET latitud = ?, longitud = ? WHERE nombre = ? AND (latitud IS NULL OR longitud IS NULL)",
-                    (latitud, longitud, nombre)
-                )
-                self.conexion.commit()
-            
-            # Obtener el ID de la ciudad (sea recién insertada o existente)
-            self.cursor.execute("SELECT id FROM ciudades WHERE nombre = ?", (nombre,))
-            ciudad_id = self.cursor.fetchone()[0]
+            with self.transaccion():
+                ciudad_id = self._insertar_ciudad(nombre, latitud, longitud)
             return ciudad_id
         except sqlite3.Error as e:
             print(f"Error al agregar ciudad {nombre}: {e}")
             return None
     
+    @escritura
     def actualizar_coordenadas(self, nombre, latitud, longitud):
         """
         Método para actualizar las coordenadas geográficas de una ciudad existente.
@@ -147,11 +542,11 @@ class BaseDatosRutas:
         """
         try:
             # Actualizar las coordenadas de la ciudad especificada
-            self.cursor.execute(
-                "UPDATE ciudades SET latitud = ?, longitud = ? WHERE nombre = ?",
-                (latitud, longitud, nombre)
-            )
-            self.conexion.commit()
+            with self.transaccion():
+                self.cursor.execute(
+                    "UPDATE ciudades SET latitud = ?, longitud = ? WHERE nombre = ?",
+                    (latitud, longitud, nombre)
+                )
             return True
         except sqlite3.Error as e:
             print(f"Error al actualizar coordenadas de {nombre}: {e}")
@@ -176,6 +571,7 @@ class BaseDatosRutas:
             print(f"Error al obtener coordenadas de {nombre}: {e}")
             return (None, None)
             
+    @escritura
     def agregar_ruta(self, origen, destino, distancia, origen_lat=None, origen_lng=None, destino_lat=None, destino_lng=None):
         """
         Método para agregar una nueva ruta entre dos ciudades.
@@ -193,28 +589,90 @@ class BaseDatosRutas:
             bool: True si la ruta se agregó correctamente, False si hubo error
         """
         try:
-            # Agregar o actualizar las ciudades con sus coordenadas
-            origen_id = self.agregar_ciudad(origen, origen_lat, origen_lng)
-            destino_id = self.agregar_ciudad(destino, destino_lat, destino_lng)
-            
-            # Insertar la ruta de ida (origen -> destino)
-            self.cursor.execute("""
-            INSERT OR REPLACE INTO rutas (origen_id, destino_id, distancia)
-            VALUES (?, ?, ?)
-            """, (origen_id, destino_id, distancia))
-            
-            # Insertar la ruta de vuelta (destino -> origen)
-            self.cursor.execute("""
-            INSERT OR REPLACE INTO rutas (origen_id, destino_id, distancia)
-            VALUES (?, ?, ?)
-            """, (destino_id, origen_id, distancia))
-            
-            self.conexion.commit()
+            # Una sola transacción para las ciudades y las dos rutas
+            with self.transaccion():
+                # Agregar o actualizar las ciudades con sus coordenadas
+                origen_id = self._insertar_ciudad(origen, origen_lat, origen_lng)
+                destino_id = self._insertar_ciudad(destino, destino_lat, destino_lng)
+                
+                # Insertar la ruta de ida (origen -> destino) y la de vuelta (destino -> origen)
+                self.cursor.execute(SQL_INSERTAR_RUTA, (origen_id, destino_id, distancia))
+                self.cursor.execute(SQL_INSERTAR_RUTA, (destino_id, origen_id, distancia))
             return True
         except sqlite3.Error as e:
             print(f"Error al agregar ruta {origen}-{destino}: {e}")
             return False
     
+    @escritura
+    def agregar_rutas(self, rutas):
+        """
+        Método para agregar muchas rutas en una sola transacción.
+        
+        Args:
+            rutas (iterable): Tuplas (origen, destino, distancia)
+        
+        Returns:
+            bool: True si todas las rutas se agregaron correctamente, False si hubo error
+                  (en ese caso no se agrega ninguna)
+        
+        Equivale a llamar a agregar_ruta por cada tupla (cada ruta se guarda en ambos
+        sentidos y, si se repite, prevalece la última), pero resuelve los IDs de todas las
+        ciudades de una vez: las que no están en la caché se consultan en bloques con
+        "WHERE nombre IN (...)" y las que no existen se insertan con un solo executemany.
+        """
+        rutas = list(rutas)
+        try:
+            # El bloque with confirma la transacción al final o la revierte si hay un error
+            with self.transaccion():
+                ids = self._resolver_ids_ciudades({nombre for ruta in rutas for nombre in ruta[:2]})
+                self.cursor.executemany(SQL_INSERTAR_RUTA, (
+                    fila
+                    for origen, destino, distancia in rutas
+                    for fila in ((ids[origen], ids[destino], distancia),
+                                 (ids[destino], ids[origen], distancia))
+                ))
+            return True
+        except sqlite3.Error as e:
+            print(f"Error al agregar {len(rutas)} rutas: {e}")
+            return False
+    
+    def _resolver_ids_ciudades(self, nombres):
+        """
+        Método auxiliar que obtiene los IDs de muchas ciudades, insertando las que faltan.
+        
+        Args:
+            nombres (iterable): Nombres de las ciudades
+        
+        Returns:
+            dict: Diccionario {nombre: id} con todas las ciudades pedidas
+        
+        No confirma la transacción; lo hace el método que lo llama.
+        """
+        ids = {}
+        pendientes = []
+        for nombre in nombres:
+            ciudad_id = self._ids_ciudades.get(nombre)
+            if ciudad_id is None:
+                pendientes.append(nombre)
+            else:
+                ids[nombre] = ciudad_id
+        
+        def consultar(nombres_consulta):
+            for inicio in range(0, len(nombres_consulta), LIMITE_PARAMETROS):
+                bloque = nombres_consulta[inicio:inicio + LIMITE_PARAMETROS]
+                marcadores = ", ".join("?" * len(bloque))
+                self.cursor.execute(f"SELECT nombre, id FROM ciudades WHERE nombre IN ({marcadores})", bloque)
+                for nombre, ciudad_id in self.cursor.fetchall():
+                    ids[nombre] = self._ids_ciudades[nombre] = ciudad_id
+        
+        consultar(pendientes)
+        nuevas = [nombre for nombre in pendientes if nombre not in ids]
+        if nuevas:
+            self.cursor.executemany("INSERT INTO ciudades (nombre) VALUES (?)", ((nombre,) for nombre in nuevas))
+            consultar(nuevas)
+        return ids
+    
+    @escritura
     def eliminar_ruta(self, origen, destino):
         """
         Método para eliminar una ruta entre dos ciudades.
@@ -227,34 +685,25 @@ class BaseDatosRutas:
             bool: True si la ruta se eliminó correctamente, False si hubo error
         """
         try:
-            # Obtener los IDs de las ciudades
-            self.cursor.execute("SELECT id FROM ciudades WHERE nombre = ?", (origen,))
-            origen_id = self.cursor.fetchone()
-            
-            self.cursor.execute("SELECT id FROM ciudades WHERE nombre = ?", (destino,))
-            destino_id = self.cursor.fetchone()
-            
-            # Verificar que ambas ciudades existan
-            if not origen_id or not destino_id:
-                print("Ciudad de origen o destino no encontrada")
-                return False
-            
-            # Eliminar la ruta de ida (origen -> destino)
-            self.cursor.execute("""
-            DELETE FROM rutas WHERE origen_id = ? AND destino_id = ?
-            """, (origen_id[0], destino_id[0]))
-            
-            # Eliminar la ruta de vuelta (destino -> origen)
-            self.cursor.execute("""
-            DELETE FROM rutas WHERE origen_id = ? AND destino_id = ?
-            """, (destino_id[0], origen_id[0]))
-            
-            self.conexion.commit()
+            with self.transaccion():
+                # Obtener los IDs de las ciudades (desde la caché si ya se consultaron)
+                origen_id = self._obtener_id_ciudad(origen)
+                destino_id = self._obtener_id_ciudad(destino)
+                
+                # Verificar que ambas ciudades existan
+                if origen_id is None or destino_id is None:
+                    print("Ciudad de origen o destino no encontrada")
+                    return False
+                
+                # Eliminar la ruta de ida (origen -> destino) y la de vuelta (destino -> origen)
+                self.cursor.execute(SQL_ELIMINAR_RUTA, (origen_id, destino_id))
+                self.cursor.execute(SQL_ELIMINAR_RUTA, (destino_id, origen_id))
             return True
         except sqlite3.Error as e:
             print(f"Error al eliminar ruta {origen}-{destino}: {e}")
             return False
     
+    @escritura
     def eliminar_ciudad(self, nombre):
         """
         Método para eliminar una ciudad y todas sus rutas asociadas de la base de datos.
@@ -266,22 +715,20 @@ class BaseDatosRutas:
             bool: True si la ciudad se eliminó correctamente, False si hubo error o la ciudad no existe
         """
         try:
-            # Obtener el ID de la ciudad a eliminar
-            self.cursor.execute("SELECT id FROM ciudades WHERE nombre = ?", (nombre,))
-            resultado = self.cursor.fetchone()
-            if not resultado:
-                print(f"La ciudad {nombre} no existe")
-                return False
-            
-            ciudad_id = resultado[0]
-            
-            # Eliminar todas las rutas que involucran a esta ciudad (tanto como origen como destino)
-            self.cursor.execute("DELETE FROM rutas WHERE origen_id = ? OR destino_id = ?", (ciudad_id, ciudad_id))
-            
-            # Eliminar la ciudad de la tabla ciudades
-            self.cursor.execute("DELETE FROM ciudades WHERE id = ?", (ciudad_id,))
+            with self.transaccion():
+                # Obtener el ID de la ciudad a eliminar (desde la caché si ya se consultó)
+                ciudad_id = self._obtener_id_ciudad(nombre)
+                if ciudad_id is None:
+                    print(f"La ciudad {nombre} no existe")
+                    return False
+                
+                # Eliminar todas las rutas que involucran a esta ciudad (tanto como origen como destino)
+                self.cursor.execute("DELETE FROM rutas WHERE origen_id = ? OR destino_id = ?", (ciudad_id, ciudad_id))
+                
+                # Eliminar la ciudad de la tabla ciudades
+                self.cursor.execute("DELETE FROM ciudades WHERE id = ?", (ciudad_id,))
             
-            self.conexion.commit()
+            self._ids_ciudades.pop(nombre, None)
             return True
         except sqlite3.Error as e:
             print(f"Error al eliminar ciudad {nombre}: {e}")
@@ -372,6 +819,75 @@ class BaseDatosRutas:
             print(f"Error al listar conexiones de {ciudad}: {e}")
             return {}
     
+    def _leer_por_lotes(self, consulta, parametros=()):
+        """
+        Método auxiliar que recorre el resultado de una consulta por lotes.
+        
+        Args:
+            consulta (str): Consulta SQL a ejecutar
+            parametros (tuple, optional): Parámetros de la consulta
+            
+        Yields:
+            tuple: Cada fila del resultado, leída en lotes de TAMANO_LOTE filas con fetchmany
+            
+        Usa un cursor propio para no interferir con self.cursor mientras se recorre.
+        """
+        cursor = self.conexion.cursor()
+        try:
+            cursor.execute(consulta, parametros)
+            while True:
+                lote = cursor.fetchmany(TAMANO_LOTE)
+                if not lote:
+                    break
+                yield from lote
+        finally:
+            cursor.close()
+    
+    def _cargar_grafo(self, ordenar_por_nombre=False):
+        """
+        Método auxiliar que carga todas las ciudades y rutas con dos consultas en total.
+        
+        Args:
+            ordenar_por_nombre (bool, optional): Si es True, las ciudades quedan en orden
+                alfabético; si no, en el orden en que se agregaron a la base de datos
+            
+        Returns:
+            tuple: (grafo, coords) con el mismo formato que obtener_grafo_completo_con_coords
+            
+        Se llama dentro de lectura() para que ambas consultas vean el mismo estado.
+        Las rutas se leen en una única consulta ordenada por ciudad de origen, sin JOIN:
+        los IDs se traducen a nombres con un diccionario cargado desde la tabla ciudades
+        (las rutas huérfanas, cuyo origen o destino no está en ese diccionario, se omiten).
+        Así el tiempo de carga crece en forma lineal con el tamaño de la red, en lugar de
+        ejecutar una consulta por cada ciudad.
+        """
+        grafo = {}
+        coords = {}
+        nombres = {}
+        
+        orden = "nombre" if ordenar_por_nombre else "id"
+        for ciudad_id, nombre, lat, lon in self._leer_por_lotes(
+                f"SELECT id, nombre, latitud, longitud FROM ciudades ORDER BY {orden}"):
+            nombres[ciudad_id] = nombre
+            coords[nombre] = {"lat": lat, "lng": lon}
+            grafo[nombre] = {}
+        
+        # El índice UNIQUE (origen_id, destino_id) entrega las filas ya ordenadas
+        conexiones = None
+        origen_actual = None
+        for origen_id, destino_id, distancia in self._leer_por_lotes(
+                "SELECT origen_id, destino_id, distancia FROM rutas ORDER BY origen_id, destino_id"):
+            if origen_id != origen_actual:
+                origen_actual = origen_id
+                origen = nombres.get(origen_id)
+                conexiones = grafo[origen] if origen is not None else None
+            destino = nombres.get(destino_id)
+            # Las rutas que apuntan a una ciudad inexistente se omiten, como hacía el JOIN
+            if conexiones is not None and destino is not None:
+                conexiones[destino] = distancia
+        
+        return grafo, coords
+    
     def obtener_grafo_completo(self):
         """
         Método para obtener una representación completa del grafo de ciudades y rutas.
@@ -382,16 +898,10 @@ class BaseDatosRutas:
                     - Los valores son diccionarios con las ciudades conectadas y sus distancias
                     Ejemplo: {"Quito": {"Ambato": 111, "Latacunga": 89}, ...}
         """
-        grafo = {}
-        
         try:
-            # Obtener lista de todas las ciudades
-            ciudades = self.listar_ciudades()
-            
-            # Para cada ciudad, obtener sus conexiones
-            for ciudad in ciudades:
-                grafo[ciudad] = self.listar_conexiones(ciudad)
-            
+            # Una consulta para las ciudades y otra para todas las rutas (ver _cargar_grafo)
+            with self.lectura():
+                grafo, _ = self._cargar_grafo(ordenar_por_nombre=True)
             return grafo
         except sqlite3.Error as e:
             print(f"Error al obtener grafo completo: {e}")
@@ -407,33 +917,180 @@ class BaseDatosRutas:
                     - coords: Diccionario con las coordenadas de cada ciudad
                     Ejemplo: ({"Quito": {"Ambato": 111}}, {"Quito": {"lat": -0.18, "lng": -78.46}})
         """
-        grafo = {}
-        coords = {}
+        try:
+            # Una consulta para las ciudades y otra para todas las rutas (ver _cargar_grafo)
+            with self.lectura():
+                return self._cargar_grafo()
+        except sqlite3.Error as e:
+            print(f"Error al obtener grafo completo con coordenadas: {e}")
+            return {}, {}
+    
+    def ciudades_alcanzables(self, origen, distancia_maxima):
+        """
+        Método para obtener las ciudades a las que se llega desde una ciudad sin superar una distancia.
+        
+        Args:
+            origen (str): Nombre de la ciudad de origen
+            distancia_maxima (int): Distancia máxima en kilómetros
+            
+        Returns:
+            dict: Diccionario {ciudad: (distancia, anterior)} ordenado por distancia, donde
+                    distancia es la del camino más corto desde el origen y anterior la ciudad
+                    previa en ese camino (None para el origen). Vacío si el origen no existe
+                    o hay error
+                    Ejemplo: {"Quito": (0, None), "Aloag": (30, "Quito"), ...}
         
+        La búsqueda se resuelve dentro de SQLite con una consulta recursiva (ver
+        SQL_CTE_ALCANCE), sin cargar el grafo en Python. Conviene para radios chicos
+        respecto del grafo: el costo crece con la cantidad de pares (ciudad, distancia)
+        dentro del radio, no con el tamaño de la red.
+        """
         try:
-            # Obtener todas las ciudades con sus coordenadas
-            self.cursor.execute("SELECT nombre, latitud, longitud FROM ciudades")
-            for nombre, lat, lon in self.cursor.fetchall():
-                coords[nombre] = {"lat": lat, "lng": lon}
-                grafo[nombre] = {}
+            self.cursor.execute(SQL_CIUDADES_ALCANZABLES,
+                                {"origen": origen, "limite": distancia_maxima})
+            return {nombre: (distancia, anterior) for nombre, distancia, anterior in self.cursor.fetchall()}
+        except sqlite3.Error as e:
+            print(f"Error al buscar ciudades alcanzables desde {origen}: {e}")
+            return {}
+    
+    def ruta_mas_corta(self, origen, destino, distancia_maxima):
+        """
+        Método para obtener la ruta más corta entre dos ciudades sin cargar el grafo en Python.
+        
+        Args:
+            origen (str): Nombre de la ciudad de origen
+            destino (str): Nombre de la ciudad de destino
+            distancia_maxima (int): Distancia máxima en kilómetros; acota la búsqueda y es
+                obligatoria porque sin ella la consulta recursiva no termina si no hay ruta
             
-            # Obtener todas las conexiones entre ciudades
-            self.cursor.execute("""
-            SELECT c_origen.nombre, c_destino.nombre, r.distancia
-            FROM rutas r
-            JOIN ciudades c_origen ON r.origen_id = c_origen.id
-            JOIN ciudades c_destino ON r.destino_id = c_destino.id
-            """)
+        Returns:
+            tuple: (ruta, distancia) con el mismo formato que GrafoEcuador.busqueda_costo_uniforme.
+                    Si no hay ruta de a lo sumo distancia_maxima kilómetros, retorna (None, 0)
+        
+        Primero se obtiene la distancia con una consulta que se detiene al llegar al destino
+        (SQL_DISTANCIA_MINIMA); después se buscan los predecesores solo dentro de esa
+        distancia para reconstruir el camino. Ambas consultas ven el mismo estado de la base.
+        Si los predecesores no llevan de vuelta al origen (por ejemplo, forman un ciclo entre
+        rutas de distancia 0), también se retorna (None, 0).
+        """
+        try:
+            with self.lectura() as cursor:
+                cursor.execute(SQL_DISTANCIA_MINIMA,
+                               {"origen": origen, "destino": destino, "limite": distancia_maxima})
+                resultado = cursor.fetchone()
+                if resultado is None:
+                    return None, 0
+                distancia = resultado[0]
+                alcanzables = self.ciudades_alcanzables(origen, distancia)
             
-            # Construir el grafo con las conexiones
-            for origen, destino, distancia in self.cursor.fetchall():
-                grafo[origen][destino] = distancia
+            # Reconstruir el camino desde el destino siguiendo los predecesores. Un camino
+            # simple tiene a lo sumo una ciudad por cada alcanzable: con rutas de distancia 0
+            # los predecesores pueden formar un ciclo, y si la consulta de alcanzables falló
+            # el diccionario está vacío; en ambos casos no se puede armar la ruta
+            ruta = [destino]
+            for _ in range(len(alcanzables)):
+                if ruta[-1] == origen:
+                    break
+                anterior = alcanzables.get(ruta[-1], (None, None))[1]
+                if anterior is None:
+                    break
+                ruta.append(anterior)
+            if ruta[-1] != origen:
+                print(f"No se pudo reconstruir la ruta más corta {origen}-{destino}")
+                return None, 0
+            ruta.reverse()
+            return ruta, distancia
+        except sqlite3.Error as e:
+            print(f"Error al buscar la ruta más corta {origen}-{destino}: {e}")
+            return None, 0
+    
+    def ultimo_cambio(self):
+        """
+        Método para obtener el número de secuencia del último cambio registrado.
+        
+        Returns:
+            int: Número de secuencia, 0 si todavía no hubo cambios
             
-            return grafo, coords
+        Un proceso que acaba de cargar el grafo guarda este número y después lo pasa a
+        aplicar_cambios_desde para recibir solo lo que cambió desde entonces.
+        """
+        try:
+            self.cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'cambios'")
+            resultado = self.cursor.fetchone()
+            return resultado[0] if resultado else 0
         except sqlite3.Error as e:
-            print(f"Error al obtener grafo completo con coordenadas: {e}")
-            return {}, {}
+            print(f"Error al obtener el último cambio: {e}")
+            return 0
     
+    def aplicar_cambios_desde(self, seq, grafo):
+        """
+        Método para actualizar un GrafoEcuador con los cambios posteriores a seq.
+        
+        Args:
+            seq (int): Último cambio que el grafo ya tiene (ver ultimo_cambio)
+            grafo (GrafoEcuador): Grafo en memoria a actualizar
+            
+        Returns:
+            int: Número de secuencia del último cambio aplicado; se pasa en la siguiente
+                 llamada. Si hubo un error, retorna seq sin modificar el grafo.
+        
+        Los cambios se leen de la tabla cambios, que llenan los disparadores de 'ciudades'
+        y 'rutas', de modo que también se ven las modificaciones hechas por otros procesos
+        que comparten el archivo. Solo se recarga el grafo completo si entre los cambios
+        hay una importación masiva ('reiniciar') o si los cambios pedidos ya se purgaron.
+        """
+        try:
+            with self.lectura():
+                self.cursor.execute("SELECT MAX(seq) FROM cambios WHERE seq > ? AND operacion = 'reiniciar'", (seq,))
+                reinicio = self.cursor.fetchone()[0]
+                self.cursor.execute("SELECT MIN(seq) FROM cambios")
+                primero = self.cursor.fetchone()[0]
+                ultimo = self.ultimo_cambio()
+                if ultimo <= seq:
+                    return seq
+                
+                # Recarga completa si hubo un reinicio o si faltan cambios purgados
+                if reinicio is None and (primero is None or primero > seq + 1):
+                    reinicio = ultimo
+                if reinicio is not None:
+                    grafo_dict, coords_dict = self._cargar_grafo()
+                    grafo.reemplazar_grafo(grafo_dict, coords_dict)
+                    seq = reinicio
+                
+                cambios = self._leer_por_lotes(
+                    "SELECT seq, tipo, operacion, origen, destino, distancia, latitud, longitud "
+                    "FROM cambios WHERE seq > ? AND seq <= ? ORDER BY seq",
+                    (seq, ultimo)
+                )
+                grafo.aplicar_cambios(cambios)
+            return ultimo
+        except sqlite3.Error as e:
+            print(f"Error al aplicar cambios desde {seq}: {e}")
+            return seq
+    
+    @escritura
+    def purgar_cambios(self, hasta_seq):
+        """
+        Método para borrar del registro los cambios que ya no se necesitan.
+        
+        Args:
+            hasta_seq (int): Se borran los cambios con número de secuencia menor o igual
+            
+        Returns:
+            bool: True si se purgaron correctamente, False si hubo error
+            
+        Un grafo que todavía no aplicó los cambios purgados se recarga por completo en su
+        siguiente llamada a aplicar_cambios_desde.
+        """
+        try:
+            with self.transaccion():
+                self.cursor.execute("DELETE FROM cambios WHERE seq <= ?", (hasta_seq,))
+            return True
+        except sqlite3.Error as e:
+            print(f"Error al purgar cambios: {e}")
+            return False
+    
+    @escritura
     def importar_grafo(self, grafo_dict, coords_dict=None):
         """
         Método para importar un grafo completo a la base de datos.
@@ -446,10 +1103,11 @@ class BaseDatosRutas:
             bool: True si la importación fue exitosa, False si hubo error
         """
         try:
-            # Limpiar las tablas existentes
-            self.cursor.execute("DELETE FROM rutas")
-            self.cursor.execute("DELETE FROM ciudades")
-            self.conexion.commit()
+            # Limpiar las tablas existentes (y la caché de IDs, que dejan de ser válidos)
+            with self.transaccion():
+                self.cursor.execute("DELETE FROM rutas")
+                self.cursor.execute("DELETE FROM ciudades")
+            self._ids_ciudades.clear()
             
             # Importar cada ciudad y sus conexiones
             for origen, destinos in grafo_dict.items():
@@ -473,28 +1131,232 @@ class BaseDatosRutas:
             print(f"Error al importar grafo: {e}")
             return False
 
-    def importar_desde_json(self, ruta_archivo):
+    @contextlib.contextmanager
+    def _reemplazo_completo(self):
+        """
+        Administrador de contexto para las importaciones que reemplazan todo el grafo.
+        
+        Yields:
+            sqlite3.Cursor: Cursor de la transacción, con las tablas ya vaciadas
+            
+        Abre una transacción, quita los disparadores del registro de cambios y los índices
+        de INDICES_RUTAS y vacía las tablas. Al salir sin errores vuelve a crear los índices,
+        registra un único cambio 'reiniciar' en lugar de una fila por ciudad y por ruta,
+        vuelve a crear los disparadores y confirma; si hay un error, se revierte todo,
+        incluidos los disparadores y los índices.
+        """
+        # Los IDs de la caché dejan de ser válidos al vaciar la tabla ciudades
+        self._ids_ciudades.clear()
+        with self.transaccion() as cursor:
+            for nombre in DISPARADORES_CAMBIOS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+            for nombre in INDICES_RUTAS:
+                cursor.execute(f"DROP INDEX IF EXISTS {nombre}")
+            cursor.execute("DELETE FROM rutas")
+            cursor.execute("DELETE FROM ciudades")
+            
+            yield cursor
+            
+            for sentencia in INDICES_RUTAS.values():
+                cursor.execute(sentencia)
+            cursor.execute("INSERT INTO cambios (tipo, operacion) VALUES ('grafo', 'reiniciar')")
+            for sentencia in DISPARADORES_CAMBIOS.values():
+                cursor.execute(sentencia)
+    
+    @escritura
+    def importar_grafo_masivo(self, grafo_dict, coords_dict=None):
+        """
+        Método para importar un grafo completo en una sola transacción.
+        
+        Args:
+            grafo_dict (dict): Diccionario que representa el grafo a importar
+            coords_dict (dict, optional): Diccionario con las coordenadas de las ciudades
+            
+        Returns:
+            bool: True si la importación fue exitosa, False si hubo error (en ese caso la
+                  base de datos queda como estaba antes de la importación)
+        
+        Produce las mismas tablas que importar_grafo, pero en lugar de una llamada a
+        agregar_ruta (con su commit) por arista:
+        1. Inserta todas las ciudades con un solo executemany
+        2. Carga las aristas, en ambos sentidos, en una tabla temporal de preparación
+        3. Traduce los nombres a IDs con un único JOIN y copia el resultado a 'rutas'
+        Como en agregar_ruta, cada arista se guarda también en sentido contrario; si una
+        conexión aparece más de una vez, prevalece la última, igual que con INSERT OR REPLACE.
+        A diferencia de importar_grafo, también se guardan las ciudades sin conexiones.
+        En el registro de cambios la importación aparece como un solo cambio 'reiniciar'.
+        """
+        coords_dict = coords_dict or {}
+        inicio = time.perf_counter()
+        
+        def coordenadas(ciudad):
+            datos = coords_dict.get(ciudad) or {}
+            return datos.get("lat"), datos.get("lng")
+        
+        # Ciudades en el orden en que aparecen, igual que los IDs asignados por importar_grafo
+        ciudades = dict.fromkeys(grafo_dict)
+        for destinos in grafo_dict.values():
+            ciudades.update(dict.fromkeys(destinos))
+        
+        def filas_rutas():
+            for origen, destinos in grafo_dict.items():
+                for destino, distancia in destinos.items():
+                    yield origen, destino, distancia
+                    yield destino, origen, distancia
+        
+        try:
+            # Vacía las tablas y confirma al final, o revierte todo si hay un error
+            with self._reemplazo_completo():
+                self.cursor.executemany(
+                    "INSERT INTO ciudades (nombre, latitud, longitud) VALUES (?, ?, ?)",
+                    ((ciudad, *coordenadas(ciudad)) for ciudad in ciudades)
+                )
+                
+                # Tabla temporal con las aristas por nombre; 'orden' conserva el orden de llegada
+                self.cursor.execute('''
+                CREATE TEMP TABLE IF NOT EXISTS rutas_preparacion (
+                    orden INTEGER PRIMARY KEY,
+                    origen TEXT NOT NULL,
+                    destino TEXT NOT NULL,
+                    distancia INTEGER NOT NULL
+                )
+                ''')
+                self.cursor.execute("DELETE FROM rutas_preparacion")
+                self.cursor.executemany(
+                    "INSERT INTO rutas_preparacion (origen, destino, distancia) VALUES (?, ?, ?)",
+                    filas_rutas()
+                )
+                
+                # Resolver los IDs de todas las aristas con un solo JOIN, quedándose con la
+                # última aparición de cada par (origen, destino)
+                self.cursor.execute('''
+                INSERT INTO rutas (origen_id, destino_id, distancia)
+                SELECT c_origen.id, c_destino.id, p.distancia
+                FROM rutas_preparacion p
+                JOIN ciudades c_origen ON c_origen.nombre = p.origen
+                JOIN ciudades c_destino ON c_destino.nombre = p.destino
+                WHERE p.orden IN (SELECT MAX(orden) FROM rutas_preparacion GROUP BY origen, destino)
+                ORDER BY p.orden
+                ''')
+                filas = self.cursor.rowcount
+                self.cursor.execute("DROP TABLE rutas_preparacion")
+            
+            segundos = time.perf_counter() - inicio
+            print(f"Importación masiva: {len(ciudades)} ciudades y {filas} rutas en {segundos:.2f} s "
+                  f"({filas / segundos if segundos > 0 else 0:.0f} filas/s)")
+            return True
+        except sqlite3.Error as e:
+            print(f"Error al importar grafo de forma masiva: {e}")
+            return False
+
+    @escritura
+    def importar_registros(self, registros):
+        """
+        Método para importar un grafo completo a partir de un flujo de registros.
+        
+        Args:
+            registros (iterable): Tuplas ("ciudad", nombre, latitud, longitud),
+                ("coordenadas", nombre, latitud, longitud) o ("ruta", origen, destino,
+                distancia), por ejemplo de leer_ndjson
+            
+        Returns:
+            bool: True si la importación fue exitosa, False si hubo error (en ese caso la
+                  base de datos queda como estaba antes de la importación)
+        
+        Reemplaza el grafo en una sola transacción, como importar_grafo_masivo, pero sin
+        armar el diccionario del grafo: los registros se consumen en bloques de TAMANO_LOTE,
+        de modo que la memoria usada no depende del tamaño del archivo. Cada ruta se guarda
+        en ambos sentidos y, si se repite, prevalece la última. Las ciudades que solo
+        aparecen en rutas se crean sin coordenadas, y los registros "coordenadas" (ciudades
+        que no forman parte del grafo) se omiten, igual que en importar_grafo_masivo.
+        """
+        inicio = time.perf_counter()
+        total_ciudades = total_rutas = 0
+        
+        def guardar_bloque(ciudades, rutas):
+            # Ambos sentidos de cada ruta; el diccionario conserva la última aparición de
+            # cada par, de modo que una conexión que el archivo trae en los dos sentidos
+            # se escribe una sola vez por sentido
+            pares = {}
+            for origen, destino, distancia in rutas:
+                pares[origen, destino] = distancia
+                pares[destino, origen] = distancia
+            self.cursor.executemany(SQL_GUARDAR_CIUDAD, ciudades)
+            self.cursor.execute("DELETE FROM rutas_bloque")
+            self.cursor.executemany(
+                "INSERT INTO rutas_bloque (origen, destino, distancia) VALUES (?, ?, ?)",
+                ((origen, destino, distancia) for (origen, destino), distancia in pares.items())
+            )
+            # Las ciudades que solo aparecen en rutas se crean sin coordenadas
+            self.cursor.execute("INSERT OR IGNORE INTO ciudades (nombre) SELECT DISTINCT origen FROM rutas_bloque")
+            self.cursor.execute(SQL_INSERTAR_RUTAS_BLOQUE)
+        
+        try:
+            # Vacía las tablas y confirma al final, o revierte todo si hay un error
+            with self._reemplazo_completo():
+                # Tabla temporal con las rutas de un bloque, que se vacía antes de cada bloque
+                self.cursor.execute('''
+                CREATE TEMP TABLE IF NOT EXISTS rutas_bloque (
+                    origen TEXT NOT NULL,
+                    destino TEXT NOT NULL,
+                    distancia INTEGER NOT NULL
+                )
+                ''')
+                ciudades, rutas = [], []
+                for tipo, *datos in registros:
+                    if tipo == "coordenadas":
+                        continue
+                    (ciudades if tipo == "ciudad" else rutas).append(datos)
+                    if len(ciudades) + len(rutas) >= TAMANO_LOTE:
+                        guardar_bloque(ciudades, rutas)
+                        total_ciudades += len(ciudades)
+                        total_rutas += len(rutas)
+                        ciudades, rutas = [], []
+                guardar_bloque(ciudades, rutas)
+                total_ciudades += len(ciudades)
+                total_rutas += len(rutas)
+                self.cursor.execute("DROP TABLE rutas_bloque")
+            
+            segundos = time.perf_counter() - inicio
+            print(f"Importación por flujo: {total_ciudades} ciudades y {total_rutas} rutas en {segundos:.2f} s "
+                  f"({total_rutas / segundos if segundos > 0 else 0:.0f} rutas/s)")
+            return True
+        except (sqlite3.Error, OSError, ValueError) as e:
+            print(f"Error al importar registros: {e}")
+            return False
+    
+    def importar_desde_json(self, ruta_archivo, masivo=False):
         """
         Método para importar un grafo desde un archivo JSON.
         
         Args:
             ruta_archivo (str): Ruta del archivo JSON a importar
+            masivo (bool, optional): Si es True, usa importar_grafo_masivo (una sola
+                transacción), recomendado para archivos grandes
             
         Returns:
             bool: True si la importación fue exitosa, False si hubo error
+            
+        Los archivos .ndjson o .jsonl (ver formato_ndjson) se importan por flujo con
+        importar_registros, sin cargar el archivo completo en memoria.
         """
+        if es_ndjson(ruta_archivo):
+            return self.importar_registros(leer_ndjson(ruta_archivo))
+        
         try:
             # Leer el archivo JSON
             with open(ruta_archivo, 'r', encoding='utf-8') as f:
                 datos = json.load(f)
             
+            importar = self.importar_grafo_masivo if masivo else self.importar_grafo
+            
             # Verificar el formato del JSON y llamar al método de importación apropiado
             if isinstance(datos, dict) and not ("grafo" in datos and "coords" in datos):
                 # Formato antiguo: solo grafo sin coordenadas
-                return self.importar_grafo(datos)
+                return importar(datos)
             else:
                 # Formato nuevo: grafo con coordenadas
-                return self.importar_grafo(datos.get("grafo", {}), datos.get("coords", {}))
+                return importar(datos.get("grafo", {}), datos.get("coords", {}))
         except Exception as e:
             print(f"Error al importar desde JSON: {e}")
             return False
@@ -508,7 +1370,12 @@ class BaseDatosRutas:
             
         Returns:
             bool: True si la exportación fue exitosa, False si hubo error
+            
+        Si la ruta termina en .ndjson o .jsonl, se exporta por flujo con exportar_a_ndjson.
         """
+        if es_ndjson(ruta_archivo):
+            return self.exportar_a_ndjson(ruta_archivo)
+        
         try:
             # Obtener el grafo completo con coordenadas
             grafo_dict, coords_dict = self.obtener_grafo_completo_con_coords()
@@ -528,15 +1395,54 @@ class BaseDatosRutas:
             print(f"Error al exportar a JSON: {e}")
             return False
     
+    def exportar_a_ndjson(self, ruta_archivo):
+        """
+        Método para exportar el grafo completo en formato NDJSON, una ciudad o ruta por línea.
+        
+        Args:
+            ruta_archivo (str): Ruta donde se guardará el archivo
+            
+        Returns:
+            bool: True si la exportación fue exitosa, False si hubo error
+            
+        Las ciudades y las rutas se leen por lotes (ver _leer_por_lotes) y se escriben a
+        medida que llegan, dentro de una transacción de lectura para que el archivo refleje
+        un único estado de la base de datos. Cada conexión aparece en ambos sentidos, tal
+        como está guardada.
+        """
+        try:
+            with self.lectura():
+                ciudades = self._leer_por_lotes("SELECT nombre, latitud, longitud FROM ciudades ORDER BY id")
+                rutas = self._leer_por_lotes('''
+                SELECT c_origen.nombre, c_destino.nombre, r.distancia
+                FROM rutas r
+                JOIN ciudades c_origen ON c_origen.id = r.origen_id
+                JOIN ciudades c_destino ON c_destino.id = r.destino_id
+                ORDER BY r.origen_id
+                ''')
+                total_ciudades, total_rutas = escribir_ndjson(ruta_archivo, ciudades, rutas)
+            print(f"Exportadas {total_ciudades} ciudades y {total_rutas} rutas a {ruta_archivo}")
+            return True
+        except Exception as e:
+            print(f"Error al exportar a NDJSON: {e}")
+            return False
+    
     def cerrar(self):
         """
         Método para cerrar la conexión con la base de datos.
         
         Este método debe ser llamado cuando ya no se necesite la conexión
-        para liberar los recursos del sistema.
+        para liberar los recursos del sistema. En el modo pool, primero espera a que
+        terminen las escrituras pendientes y luego cierra las conexiones de todos los hilos.
         """
-        if self.conexion:
-            self.conexion.close()
+        if self._escritor:
+            self._escritor.detener()
+            self._escritor = None
+        with self._bloqueo_conexiones:
+            conexiones, self._conexiones = self._conexiones, []
+        for conexion in conexiones:
+            conexion.close()
+        if conexiones:
             print("Conexión a la base de datos cerrada")
 
 
@@ -551,7 +1457,27 @@ if __name__ == "__main__":
     3. Creación de rutas entre ciudades
     4. Consultas básicas
     5. Exportación a JSON
+    
+    Con --importar ARCHIVO.json|.ndjson [--bulk] [--db RUTA] importa un grafo en lugar de ejecutar
+    los ejemplos; --bulk usa la importación masiva en una sola transacción.
     """
+    # Importación de argparse para las opciones de importación desde la línea de comandos
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Base de datos de rutas del Ecuador")
+    parser.add_argument("--importar", metavar="ARCHIVO", help="Archivo JSON a importar")
+    parser.add_argument("--bulk", action="store_true", help="Importar en una sola transacción")
+    parser.add_argument("--db", default="rutas_ecuador.db", help="Base de datos de destino")
+    args = parser.parse_args()
+    
+    if args.importar:
+        db = BaseDatosRutas(args.db)
+        inicio = time.perf_counter()
+        if db.importar_desde_json(args.importar, masivo=args.bulk):
+            print(f"Importación completada en {time.perf_counter() - inicio:.2f} s")
+        db.cerrar()
+        raise SystemExit
+    
     # Crear una instancia de la base de datos de prueba
     db = BaseDatosRutas('rutas_ecuador_test.db')
     
@@ -0,0 +1,174 @@
+"""
+Benchmark de la búsqueda acotada dentro de SQLite frente a cargar el grafo en Python.
+
+Crea una base de datos temporal con una red geométrica aleatoria importada con
+importar_grafo_masivo y, para varios radios, elige pares de ciudades cuya ruta más
+corta mide cerca de ese radio. Para cada radio mide (p50 en milisegundos):
+- SQL ruta: BaseDatosRutas.ruta_mas_corta con el radio como distancia máxima
+- SQL alcance: BaseDatosRutas.ciudades_alcanzables con el mismo radio
+- Python: GrafoEcuador.busqueda_costo_uniforme con el grafo ya cargado
+
+La carga del grafo (obtener_grafo_completo_con_coords y la representación compacta) se
+mide aparte. La columna "Consultas" indica cuántas consultas hacen falta para que cargar
+el grafo una vez y buscar en Python cueste menos que resolver cada consulta en SQLite:
+SQLite gana en procesos que hacen pocas consultas de radio chico, y Python en cuanto el
+radio crece o el mismo proceso hace muchas consultas.
+
+Uso:
+    python benchmark_alcance_sql.py [--ciudades 20000] [--radios 25,50,100,200] [--consultas 20] [--semilla 7]
+"""
+# Importación de argparse para leer los parámetros de la línea de comandos
+import argparse
+
+# Importación de contextlib e io para silenciar los mensajes de la base de datos
+import contextlib
+import io
+
+# Importación de heapq para elegir destinos según su distancia real desde el origen
+import heapq
+
+# Importación de math para redondear hacia arriba la cantidad de consultas
+import math
+
+# Importación de os y tempfile para la base de datos temporal
+import os
+import tempfile
+
+# Importación de random y time para elegir consultas reproducibles y medirlas
+import random
+import time
+
+# Módulos locales
+from base_datos_rutas import BaseDatosRutas
+from grafo_ecuador import GrafoEcuador
+from grafos_sinteticos import generar_geometrico_aleatorio
+
+
+def distancias_desde(grafo, origen, limite):
+    """
+    Calcula las distancias más cortas desde una ciudad hasta un límite (Dijkstra simple).
+
+    Args:
+        grafo (dict): Grafo {ciudad: {vecino: distancia}}.
+        origen (str): Ciudad de origen.
+        limite (int): Distancia máxima a explorar.
+
+    Returns:
+        dict: {ciudad: distancia} de las ciudades a lo sumo a limite kilómetros.
+    """
+    distancias = {origen: 0}
+    cola = [(0, origen)]
+    while cola:
+        distancia, actual = heapq.heappop(cola)
+        if distancia > distancias[actual]:
+            continue
+        for vecino, peso in grafo[actual].items():
+            nueva = distancia + peso
+            if nueva <= limite and nueva < distancias.get(vecino, nueva + 1):
+                distancias[vecino] = nueva
+                heapq.heappush(cola, (nueva, vecino))
+    return distancias
+
+
+def elegir_pares(grafo, radio, cantidad, generador):
+    """
+    Elige pares (origen, destino) cuya ruta más corta mide entre el 80 % y el 100 % del radio.
+
+    Args:
+        grafo (dict): Grafo {ciudad: {vecino: distancia}}.
+        radio (int): Radio de la consulta en kilómetros.
+        cantidad (int): Cantidad de pares.
+        generador (random.Random): Generador para elegir los orígenes.
+
+    Returns:
+        list: Tuplas (origen, destino).
+    """
+    ciudades = list(grafo)
+    pares = []
+    while len(pares) < cantidad:
+        origen = generador.choice(ciudades)
+        candidatos = [ciudad for ciudad, distancia in distancias_desde(grafo, origen, radio).items()
+                      if distancia >= 0.8 * radio]
+        if candidatos:
+            pares.append((origen, generador.choice(candidatos)))
+    return pares
+
+
+def medir(operacion, argumentos):
+    """
+    Mide la mediana de la latencia de una operación.
+
+    Args:
+        operacion (callable): Operación a medir.
+        argumentos (list): Tuplas de argumentos, una por llamada.
+
+    Returns:
+        float: p50 en milisegundos.
+    """
+    latencias = []
+    for args in argumentos:
+        inicio = time.perf_counter()
+        operacion(*args)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    latencias.sort()
+    return latencias[len(latencias) // 2]
+
+
+def main():
+    """
+    Punto de entrada del benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark de la búsqueda acotada en SQLite")
+    parser.add_argument("--ciudades", type=int, default=20_000)
+    parser.add_argument("--radios", default="25,50,100,200")
+    parser.add_argument("--consultas", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+    radios = [int(radio) for radio in args.radios.split(",")]
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_db = os.path.join(carpeta, "benchmark.db")
+        print(f"Creando base de datos con {args.ciudades} ciudades...")
+        grafo, coordenadas = generar_geometrico_aleatorio(args.ciudades, semilla=args.semilla)
+        coords = {ciudad: {"lat": lat, "lng": lng} for ciudad, (lat, lng) in coordenadas.items()}
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = BaseDatosRutas(ruta_db)
+        db.importar_grafo_masivo(grafo, coords)
+
+        # Carga completa del grafo, como la haría un proceso que busca en Python
+        inicio = time.perf_counter()
+        grafo_db, coords_db = db.obtener_grafo_completo_con_coords()
+        with contextlib.redirect_stdout(io.StringIO()):
+            grafo_ecuador = GrafoEcuador({})
+        grafo_ecuador.reemplazar_grafo(grafo_db, coords_db)
+        grafo_ecuador.compacto
+        carga = (time.perf_counter() - inicio) * 1000
+        print(f"Carga del grafo en Python: {carga:.1f} ms")
+
+        generador = random.Random(args.semilla)
+        resultados = {}
+        for radio in radios:
+            pares = elegir_pares(grafo, radio, args.consultas, generador)
+            # Las dos búsquedas deben coincidir en la distancia
+            for origen, destino in pares:
+                _, distancia_sql = db.ruta_mas_corta(origen, destino, radio)
+                _, distancia_python = grafo_ecuador.busqueda_costo_uniforme(origen, destino)
+                assert distancia_sql == distancia_python, (origen, destino, distancia_sql, distancia_python)
+            resultados[radio] = (
+                medir(db.ruta_mas_corta, [(origen, destino, radio) for origen, destino in pares]),
+                medir(db.ciudades_alcanzables, [(origen, radio) for origen, _ in pares]),
+                medir(grafo_ecuador.busqueda_costo_uniforme, pares),
+            )
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.cerrar()
+
+    print(f"\n{'Radio':>8}{'SQL ruta':>12}{'SQL alcance':>14}{'Python':>12}{'Consultas':>12}")
+    for radio, (ruta_sql, alcance_sql, python) in resultados.items():
+        # Consultas a partir de las cuales cargar el grafo una vez y buscar en Python es más barato
+        consultas = str(math.ceil(carga / (ruta_sql - python))) if ruta_sql > python else "nunca"
+        print(f"{radio:>6}km{ruta_sql:>10.2f}ms{alcance_sql:>12.2f}ms{python:>10.2f}ms{consultas:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Benchmark de las consultas de BaseDatosRutas antes y después de la migración del esquema.
+
+Crea una base de datos temporal con una red geométrica aleatoria de unas 500.000 rutas
+(250.000 carreteras en ambos sentidos) importada con importar_grafo_masivo, y mide la
+latencia de las operaciones más frecuentes en dos configuraciones:
+- antes: sin los índices y el registro de cambios de las migraciones y con el diario y los pragmas por defecto de SQLite
+- después: esquema migrado (índices de cobertura, registro de cambios) y PRAGMAS_CONEXION
+
+Operaciones medidas (p50, p95 y media en microsegundos):
+- obtener_distancia entre dos ciudades conectadas
+- listar_conexiones de una ciudad
+- rutas que llegan o salen de una ciudad (la condición que usa eliminar_ciudad)
+- agregar_ruta, que confirma una transacción por llamada
+- carga del grafo completo con obtener_grafo_completo_con_coords
+
+Uso:
+    python benchmark_base_datos.py [--rutas 500000] [--consultas 2000] [--semilla 7]
+"""
+# Importación de argparse para leer los parámetros de la línea de comandos
+import argparse
+
+# Importación de contextlib e io para silenciar los mensajes de la base de datos
+import contextlib
+import io
+
+# Importación de os y tempfile para la base de datos temporal
+import os
+import tempfile
+
+# Importación de random y time para elegir consultas reproducibles y medirlas
+import random
+import time
+
+# Módulos locales
+from base_datos_rutas import BaseDatosRutas, MIGRACIONES
+from grafos_sinteticos import generar_geometrico_aleatorio
+
+
+# Pragmas por defecto de SQLite, para reproducir la configuración anterior a la migración
+PRAGMAS_ANTERIORES = (
+    "PRAGMA journal_mode = DELETE",
+    "PRAGMA synchronous = FULL",
+    "PRAGMA cache_size = -2000",
+    "PRAGMA mmap_size = 0",
+    "PRAGMA temp_store = DEFAULT",
+)
+
+
+def crear_base_datos(ruta_db, rutas, semilla):
+    """
+    Crea la base de datos de prueba con la cantidad de rutas pedida.
+
+    Args:
+        ruta_db (str): Ruta del archivo de la base de datos.
+        rutas (int): Cantidad aproximada de filas de la tabla rutas (ambos sentidos).
+        semilla (int): Semilla del generador de la red.
+
+    Returns:
+        dict: Grafo importado, para elegir las consultas.
+    """
+    # Con grado medio 6 cada ciudad aporta unas 3 carreteras, es decir 6 filas
+    grafo, coordenadas = generar_geometrico_aleatorio(max(2, rutas // 6), semilla=semilla)
+    coords = {ciudad: {"lat": lat, "lng": lng} for ciudad, (lat, lng) in coordenadas.items()}
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = BaseDatosRutas(ruta_db)
+    db.importar_grafo_masivo(grafo, coords)
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.cerrar()
+    return grafo
+
+
+def abrir(ruta_db, configuracion):
+    """
+    Abre la base de datos en la configuración indicada.
+
+    Args:
+        ruta_db (str): Ruta del archivo de la base de datos.
+        configuracion (str): 'antes' o 'despues'.
+
+    Returns:
+        BaseDatosRutas: Conexión lista para medir.
+
+    Para 'antes' se eliminan los índices de las migraciones, se reinicia user_version y se
+    restauran los pragmas por defecto; al abrir en 'despues', crear_tablas vuelve a migrar.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = BaseDatosRutas(ruta_db)
+    if configuracion == "antes":
+        # Se deshacen en orden inverso: primero los disparadores, después la tabla de cambios
+        for _, sentencias in reversed(MIGRACIONES):
+            for sentencia in reversed(sentencias):
+                tipo = sentencia.split()[1]
+                nombre = sentencia.split(" EXISTS ")[1].split()[0]
+                db.cursor.execute(f"DROP {tipo} IF EXISTS {nombre}")
+        db.cursor.execute("PRAGMA user_version = 0")
+        db.conexion.commit()
+        for pragma in PRAGMAS_ANTERIORES:
+            db.cursor.execute(pragma)
+    return db
+
+
+def medir(operacion, argumentos):
+    """
+    Mide la latencia de una operación para cada juego de argumentos.
+
+    Args:
+        operacion (callable): Operación a medir.
+        argumentos (list): Tuplas de argumentos, una por llamada.
+
+    Returns:
+        tuple: (p50, p95, media) en microsegundos.
+    """
+    latencias = []
+    for args in argumentos:
+        inicio = time.perf_counter_ns()
+        operacion(*args)
+        latencias.append((time.perf_counter_ns() - inicio) / 1000)
+    latencias.sort()
+    return (latencias[len(latencias) // 2], latencias[int(len(latencias) * 0.95)],
+            sum(latencias) / len(latencias))
+
+
+def main():
+    """
+    Punto de entrada del benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark de la base de datos de rutas")
+    parser.add_argument("--rutas", type=int, default=500_000)
+    parser.add_argument("--consultas", type=int, default=2000)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_db = os.path.join(carpeta, "benchmark.db")
+        print(f"Creando base de datos con unas {args.rutas} rutas...")
+        grafo = crear_base_datos(ruta_db, args.rutas, args.semilla)
+
+        generador = random.Random(args.semilla)
+        ciudades = list(grafo)
+        pares = []
+        while len(pares) < args.consultas:
+            origen = generador.choice(ciudades)
+            if grafo[origen]:
+                pares.append((origen, generador.choice(list(grafo[origen]))))
+        solas = [(generador.choice(ciudades),) for _ in range(args.consultas)]
+        # Rutas nuevas entre ciudades inexistentes, distintas en cada configuración
+        nuevas = {configuracion: [(f"{configuracion} A{i}", f"{configuracion} B{i}", i + 1)
+                                  for i in range(min(args.consultas, 200))]
+                  for configuracion in ("antes", "despues")}
+
+        resultados = {}
+        for configuracion in ("antes", "despues"):
+            db = abrir(ruta_db, configuracion)
+
+            def rutas_de_ciudad(nombre):
+                # Misma condición que usa eliminar_ciudad para borrar las rutas de una ciudad
+                db.cursor.execute("SELECT id FROM ciudades WHERE nombre = ?", (nombre,))
+                ciudad_id = db.cursor.fetchone()[0]
+                db.cursor.execute("SELECT COUNT(*) FROM rutas WHERE origen_id = ? OR destino_id = ?",
+                                  (ciudad_id, ciudad_id))
+                return db.cursor.fetchone()[0]
+
+            resultados[configuracion] = {
+                "obtener_distancia": medir(db.obtener_distancia, pares),
+                "listar_conexiones": medir(db.listar_conexiones, solas),
+                "rutas de una ciudad": medir(rutas_de_ciudad, solas[:200]),
+                "agregar_ruta": medir(db.agregar_ruta, nuevas[configuracion]),
+                "grafo completo": medir(db.obtener_grafo_completo_con_coords, [()] * 3),
+            }
+            with contextlib.redirect_stdout(io.StringIO()):
+                db.cerrar()
+
+    print(f"\n{'Operación':<22}{'p50 antes':>14}{'p50 después':>14}{'p95 antes':>14}{'p95 después':>14}"
+          f"{'Mejora p50':>12}")
+    for operacion, (p50_antes, p95_antes, _) in resultados["antes"].items():
+        p50_despues, p95_despues, _ = resultados["despues"][operacion]
+        print(f"{operacion:<22}{p50_antes:>12.1f}µs{p50_despues:>12.1f}µs{p95_antes:>12.1f}µs"
+              f"{p95_despues:>12.1f}µs{p50_antes / p50_despues:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Benchmark de memoria y velocidad de los algoritmos de búsqueda de GrafoEcuador.
+
+Compara la estrategia anterior, en la que cada entrada de la frontera llevaba una
+copia completa de la ruta (ruta + [vecino]), con la estrategia actual basada en un
+mapa de predecesores que reconstruye la ruta una sola vez al llegar al destino.
+
+Se ejecuta sobre una cuadrícula sintética de unos 50.000 nodos y reporta, para cada
+algoritmo y variante:
+- Tiempo total de las consultas
+- Pico de memoria asignada durante las consultas (tracemalloc)
+- Inserciones en la frontera y inserciones por segundo
+
+La versión anterior de la búsqueda en profundidad era recursiva, por lo que en una
+cuadrícula de este tamaño termina con RecursionError; se reporta así en la tabla.
+
+Uso:
+    python benchmark_busquedas.py [--filas 224] [--columnas 224] [--consultas 5] [--semilla 7]
+"""
+# Importación de argparse para leer los parámetros de la línea de comandos
+import argparse
+
+# Importación de heapq y deque para las versiones anteriores de los algoritmos
+import heapq
+from array import array
+from collections import deque
+
+# Importación de random para elegir consultas reproducibles
+import random
+
+# Importación de sys para contar inserciones con sys.setprofile
+import sys
+
+# Importación de time y tracemalloc para medir tiempo y pico de memoria
+import time
+import tracemalloc
+
+# Módulos locales
+from grafo_ecuador import GrafoEcuador
+from grafos_sinteticos import generar_cuadricula
+
+
+# Funciones de la frontera cuyas llamadas se cuentan como inserciones
+FUNCIONES_INSERCION = {"heappush", "append"}
+
+
+def amplitud_copiando_ruta(grafo, origen, destino):
+    """
+    Búsqueda en amplitud con la estrategia anterior: la ruta viaja copiada en la cola.
+    """
+    compacto = grafo.compacto
+    offsets, destinos, pesos = compacto.offsets, compacto.destinos, compacto.pesos
+    id_origen, id_destino = compacto.indices[origen], compacto.indices[destino]
+    cola = deque([(id_origen, [id_origen], 0)])
+    visitados = bytearray(compacto.num_nodos)
+    visitados[id_origen] = 1
+    while cola:
+        actual, ruta, distancia = cola.popleft()
+        if actual == id_destino:
+            return compacto.traducir_ruta(ruta), distancia
+        for k in range(offsets[actual], offsets[actual + 1]):
+            vecino = destinos[k]
+            if not visitados[vecino]:
+                visitados[vecino] = 1
+                cola.append((vecino, ruta + [vecino], distancia + pesos[k]))
+    return None, 0
+
+
+def profundidad_copiando_ruta(grafo, origen, destino):
+    """
+    Búsqueda en profundidad con la estrategia anterior: recursiva y copiando el camino.
+    """
+    visitados = set()
+    ruta = []
+
+    def dfs(actual, camino, distancia):
+        if actual == destino:
+            ruta.extend(camino)
+            return True, distancia
+        visitados.add(actual)
+        for vecino, dist in grafo.grafo[actual].items():
+            if vecino not in visitados:
+                resultado, distancia_total = dfs(vecino, camino + [vecino], distancia + dist)
+                if resultado:
+                    return True, distancia_total
+        return False, 0
+
+    resultado, distancia_total = dfs(origen, [origen], 0)
+    return (ruta, distancia_total) if resultado else (None, 0)
+
+
+def costo_uniforme_copiando_ruta(grafo, origen, destino):
+    """
+    Búsqueda de costo uniforme con la estrategia anterior: la ruta viaja copiada en el heap.
+    """
+    compacto = grafo.compacto
+    offsets, destinos, pesos = compacto.offsets, compacto.destinos, compacto.pesos
+    id_origen, id_destino = compacto.indices[origen], compacto.indices[destino]
+    cola_prioridad = [(0, id_origen, [id_origen])]
+    visitados = bytearray(compacto.num_nodos)
+    while cola_prioridad:
+        distancia, actual, ruta = heapq.heappop(cola_prioridad)
+        if actual == id_destino:
+            return compacto.traducir_ruta(ruta), distancia
+        if visitados[actual]:
+            continue
+        visitados[actual] = 1
+        for k in range(offsets[actual], offsets[actual + 1]):
+            vecino = destinos[k]
+            if not visitados[vecino]:
+                heapq.heappush(cola_prioridad, (distancia + pesos[k], vecino, ruta + [vecino]))
+    return None, 0
+
+
+def a_estrella_copiando_ruta(grafo, origen, destino):
+    """
+    Búsqueda A* con la estrategia anterior: la ruta viaja copiada en el heap.
+    """
+    compacto = grafo.compacto
+    offsets, destinos, pesos, nombres = compacto.offsets, compacto.destinos, compacto.pesos, compacto.nombres
+    id_origen, id_destino = compacto.indices[origen], compacto.indices[destino]
+    cola_prioridad = [(0, 0, id_origen, [id_origen])]
+    visitados = bytearray(compacto.num_nodos)
+    g_valores = {id_origen: 0}
+    while cola_prioridad:
+        _, g_actual, actual, ruta = heapq.heappop(cola_prioridad)
+        if actual == id_destino:
+            return compacto.traducir_ruta(ruta), g_actual
+        if visitados[actual]:
+            continue
+        visitados[actual] = 1
+        for k in range(offsets[actual], offsets[actual + 1]):
+            vecino = destinos[k]
+            nuevo_g = g_actual + pesos[k]
+            if vecino in g_valores and g_valores[vecino] <= nuevo_g:
+                continue
+            g_valores[vecino] = nuevo_g
+            h = grafo.obtener_distancia_linea_recta(nombres[vecino], destino) or 0
+            heapq.heappush(cola_prioridad, (nuevo_g + h, nuevo_g, vecino, ruta + [vecino]))
+    return None, 0
+
+
+def contar_inserciones(funcion, *args):
+    """
+    Cuenta las inserciones en la frontera que realiza una búsqueda.
+
+    Args:
+        funcion (callable): Función de búsqueda a ejecutar.
+        *args: Argumentos de la función.
+
+    Returns:
+        int: Número de llamadas a heappush/append realizadas dentro de la búsqueda.
+
+    Se usa sys.setprofile, que notifica cada llamada a una función de C, para no tener
+    que instrumentar el código de los algoritmos.
+    """
+    nombre_busqueda = getattr(funcion, "__name__", "")
+    contador = [0]
+
+    def perfil(frame, evento, arg):
+        if evento == "c_call" and getattr(arg, "__name__", "") in FUNCIONES_INSERCION \
+                and frame.f_code.co_name in (nombre_busqueda, "dfs", "_a_estrella_con_heuristica"):
+            # La pila de profundidad inserta en tres arreglos paralelos: solo se cuenta el de ciudades
+            receptor = getattr(arg, "__self__", None)
+            if isinstance(receptor, array) and receptor.typecode != 'i':
+                return
+            contador[0] += 1
+
+    sys.setprofile(perfil)
+    try:
+        funcion(*args)
+    finally:
+        sys.setprofile(None)
+    return contador[0]
+
+
+def medir(funcion, consultas):
+    """
+    Mide tiempo, pico de memoria e inserciones de una búsqueda sobre un conjunto de consultas.
+
+    Args:
+        funcion (callable): Función con firma (origen, destino) -> (ruta, distancia).
+        consultas (list): Lista de pares (origen, destino).
+
+    Returns:
+        dict: Resultados con las claves 'segundos', 'pico_mb', 'inserciones' y 'error'.
+    """
+    try:
+        inicio = time.perf_counter()
+        for origen, destino in consultas:
+            funcion(origen, destino)
+        segundos = time.perf_counter() - inicio
+
+        tracemalloc.start()
+        for origen, destino in consultas:
+            funcion(origen, destino)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        inserciones = sum(contar_inserciones(funcion, origen, destino) for origen, destino in consultas)
+    except RecursionError:
+        tracemalloc.stop()
+        return {"error": "RecursionError"}
+
+    return {"segundos": segundos, "pico_mb": pico / 2 ** 20, "inserciones": inserciones, "error": None}
+
+
+def main():
+    """
+    Punto de entrada del benchmark: genera la cuadrícula, ejecuta las consultas y muestra la tabla.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark de copia de ruta vs. mapa de predecesores")
+    parser.add_argument("--filas", type=int, default=224)
+    parser.add_argument("--columnas", type=int, default=224)
+    parser.add_argument("--consultas", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    grafo_dict, coordenadas = generar_cuadricula(args.filas, args.columnas)
+    grafo = GrafoEcuador(grafo_dict)
+    grafo.coordenadas = coordenadas
+    grafo.compacto  # Construir la representación compacta antes de medir
+
+    # Consultas reproducibles: la diagonal completa de la cuadrícula más pares aleatorios
+    generador = random.Random(args.semilla)
+    ciudades = grafo.ciudades
+    consultas = [(ciudades[0], ciudades[-1])]
+    consultas += [tuple(generador.sample(ciudades, 2)) for _ in range(args.consultas - 1)]
+
+    print(f"Cuadrícula de {len(ciudades)} nodos y {grafo.compacto.num_aristas} aristas dirigidas, "
+          f"{len(consultas)} consultas\n")
+
+    comparaciones = [
+        ("Amplitud", amplitud_copiando_ruta, grafo.busqueda_amplitud),
+        ("Profundidad", profundidad_copiando_ruta, grafo.busqueda_profundidad),
+        ("Costo uniforme", costo_uniforme_copiando_ruta, grafo.busqueda_costo_uniforme),
+        ("A*", a_estrella_copiando_ruta, grafo.busqueda_a_estrella),
+    ]
+
+    print(f"{'Algoritmo':<16}{'Variante':<14}{'Tiempo (s)':>12}{'Pico (MB)':>12}"
+          f"{'Inserciones':>14}{'Ins./s':>14}")
+    for nombre, anterior, actual in comparaciones:
+        for variante, funcion in (("antes", anterior), ("después", actual)):
+            if funcion is anterior:
+                # Las versiones anteriores reciben el grafo como primer argumento
+                busqueda = (lambda f: lambda o, d: f(grafo, o, d))(funcion)
+                busqueda.__name__ = funcion.__name__
+            else:
+                busqueda = funcion
+            r = medir(busqueda, consultas)
+            if r["error"]:
+                print(f"{nombre:<16}{variante:<14}{r['error']:>12}")
+                continue
+            por_segundo = r["inserciones"] / r["segundos"] if r["segundos"] > 0 else 0
+            print(f"{nombre:<16}{variante:<14}{r['segundos']:>12.3f}{r['pico_mb']:>12.2f}"
+                  f"{r['inserciones']:>14}{por_segundo:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
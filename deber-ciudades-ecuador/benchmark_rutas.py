@@ -0,0 +1,429 @@
+"""
+Banco de pruebas de rendimiento de todos los modos de búsqueda de rutas.
+
+Genera redes de carreteras sintéticas reproducibles de distintos tamaños y mide, sobre
+un conjunto fijo de consultas, cada modo de búsqueda de GrafoEcuador (incluidas las
+estructuras con preprocesamiento: landmarks, jerarquía de contracción y matriz de todos
+los pares) y las versiones didácticas de repaso-prueba/ y clase-4/.
+
+Tipos de red:
+- cuadricula: cuadrícula con vecinos arriba, abajo, izquierda y derecha
+- geometrico: ciudades al azar conectadas con las cercanas (red geométrica aleatoria)
+- ecuador: la red real de grafo_ecuador.json replicada con coordenadas desplazadas
+
+Para cada red y modo se registran las latencias p50/p95/p99 y media por consulta, el
+tiempo de preprocesamiento y el pico de memoria asignada durante una consulta
+(tracemalloc). Los resultados se guardan en JSON junto con el commit de git, para comparar
+el rendimiento entre versiones con --comparar.
+
+Los modos cuyo costo crece demasiado con el tamaño (matriz de todos los pares, jerarquía
+de contracción y versiones didácticas que copian la ruta completa en cada paso) se omiten
+por encima de un límite de aristas, y se reporta el motivo en los resultados. El tamaño de
+1.000.000 de carreteras no está entre los predeterminados porque cada red tarda varios
+minutos; se pide explícitamente con --aristas.
+
+Uso:
+    python benchmark_rutas.py [--tipos cuadricula geometrico ecuador]
+                              [--aristas 1000 10000 100000 1000000] [--consultas 50]
+                              [--semilla 7] [--modos ...] [--sin-memoria]
+                              [--salida resultados.json] [--comparar anterior.json]
+"""
+# Importación de argparse para leer los parámetros de la línea de comandos
+import argparse
+
+# Importación de contextlib e io para silenciar los prints de los scripts didácticos al cargarlos
+import contextlib
+import io
+
+# Importación de importlib.util para cargar los scripts didácticos por su ruta
+# (sus nombres, como "A*.py" o "costo-uniforme.py", no son nombres de módulo válidos)
+import importlib.util
+
+# Importación de json, os y tempfile para guardar resultados y cachés temporales
+import json
+import os
+import tempfile
+
+# Importación de math, random y time para las consultas y las mediciones
+import math
+import random
+import time
+import tracemalloc
+
+# Importación de platform, subprocess y datetime para los metadatos de cada ejecución
+import platform
+import subprocess
+from datetime import datetime
+
+# Importación de numpy para la heurística de las versiones didácticas
+import numpy as np
+
+# Módulos locales
+from grafo_ecuador import GrafoEcuador
+from grafos_sinteticos import generar_cuadricula, generar_geometrico_aleatorio, generar_ecuador_escalado
+
+
+# Carpeta raíz del repositorio, donde están repaso-prueba/ y clase-4/
+RAIZ_REPOSITORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Versiones didácticas: nombre del modo -> (archivo, función, usa heurística)
+VERSIONES_DIDACTICAS = {
+    "clase-4 BFS": ("clase-4/bfs.py", "bfs", False),
+    "clase-4 DFS": ("clase-4/dfs.py", "dfs", False),
+    "clase-4 UCS": ("clase-4/ucs.py", "ucs", False),
+    "repaso-prueba BFS": ("repaso-prueba/bfs.py", "bfs", False),
+    "repaso-prueba DFS": ("repaso-prueba/dfs.py", "bfs", False),  # El archivo llama bfs a su DFS
+    "repaso-prueba Costo Uniforme": ("repaso-prueba/costo-uniforme.py", "ucs", False),
+    "repaso-prueba A*": ("repaso-prueba/A*.py", "A", True),
+    "repaso-prueba Voraz": ("repaso-prueba/voraz.py", "voraz", True),
+}
+
+# Modos con preprocesamiento: nombre del modo -> método de preparación de GrafoEcuador
+PREPARACIONES = {
+    "A* con Landmarks (ALT)": "preparar_landmarks",
+    "Jerarquías de Contracción": "preparar_jerarquia",
+    "Todos los Pares (matriz)": "calcular_todos_los_pares",
+}
+
+# Máximo de aristas para los modos cuyo costo no escala a redes grandes
+LIMITES_ARISTAS = {
+    "Todos los Pares (matriz)": 10_000,  # Memoria n x n
+    "Jerarquías de Contracción": 20_000,  # Contracción en Python puro
+}
+LIMITE_ARISTAS_DIDACTICAS = 10_000  # Copian la ruta completa en cada inserción
+
+# Tamaño por encima del cual un p50 más lento se marca como regresión al comparar
+UMBRAL_REGRESION = 1.10
+
+
+def generar_red(tipo, aristas, semilla):
+    """
+    Genera una red sintética con aproximadamente la cantidad de carreteras pedida.
+
+    Args:
+        tipo (str): 'cuadricula', 'geometrico' o 'ecuador'.
+        aristas (int): Cantidad aproximada de carreteras (aristas no dirigidas).
+        semilla (int): Semilla del generador.
+
+    Returns:
+        tuple: (grafo, coordenadas) como los generadores de grafos_sinteticos.
+    """
+    if tipo == "cuadricula":
+        # Una cuadrícula de k x k tiene 2k(k-1) carreteras
+        lado = max(2, round(math.sqrt(aristas / 2)))
+        return generar_cuadricula(lado, lado, semilla)
+    if tipo == "geometrico":
+        # Con grado medio 6 hay unas 3 carreteras por ciudad
+        return generar_geometrico_aleatorio(max(2, aristas // 3), semilla=semilla)
+    if tipo == "ecuador":
+        # Cada réplica aporta unas 84 carreteras (50 propias de la red y 38 enlaces)
+        return generar_ecuador_escalado(max(1, round(aristas / 84)), semilla=semilla)
+    raise ValueError(f"Tipo de red desconocido: {tipo}")
+
+
+def elegir_consultas(grafo, cantidad, semilla):
+    """
+    Elige un conjunto reproducible de pares (origen, destino) conectados.
+
+    Args:
+        grafo (GrafoEcuador): Red sobre la que se harán las consultas.
+        cantidad (int): Número de consultas.
+        semilla (int): Semilla del generador.
+
+    Returns:
+        list: Pares (origen, destino) dentro de la componente alcanzable desde una ciudad
+        al azar, para que todas las consultas tengan ruta.
+    """
+    generador = random.Random(semilla)
+    compacto = grafo.compacto
+
+    # Ciudades alcanzables desde una ciudad al azar (recorrido en amplitud sobre el CSR)
+    inicio = generador.randrange(compacto.num_nodos)
+    alcanzadas = bytearray(compacto.num_nodos)
+    alcanzadas[inicio] = 1
+    pendientes = [inicio]
+    while pendientes:
+        actual = pendientes.pop()
+        for k in range(compacto.offsets[actual], compacto.offsets[actual + 1]):
+            vecino = compacto.destinos[k]
+            if not alcanzadas[vecino]:
+                alcanzadas[vecino] = 1
+                pendientes.append(vecino)
+    componente = [compacto.nombres[i] for i in range(compacto.num_nodos) if alcanzadas[i]]
+
+    return [tuple(generador.sample(componente, 2)) for _ in range(cantidad)]
+
+
+def cargar_versiones_didacticas():
+    """
+    Carga las funciones de búsqueda de los scripts didácticos.
+
+    Returns:
+        dict: Nombre del modo -> (función, usa heurística). Los scripts que no existen o
+        fallan al cargarse se omiten con un aviso.
+
+    Los scripts ejecutan un ejemplo al importarse; su salida se descarta.
+    """
+    funciones = {}
+    for modo, (archivo, nombre_funcion, usa_heuristica) in VERSIONES_DIDACTICAS.items():
+        ruta = os.path.join(RAIZ_REPOSITORIO, archivo)
+        try:
+            especificacion = importlib.util.spec_from_file_location(f"didactica_{len(funciones)}", ruta)
+            modulo = importlib.util.module_from_spec(especificacion)
+            with contextlib.redirect_stdout(io.StringIO()):
+                especificacion.loader.exec_module(modulo)
+            funciones[modo] = (getattr(modulo, nombre_funcion), usa_heuristica)
+        except Exception as e:
+            print(f"Aviso: no se pudo cargar {archivo}: {e}")
+    return funciones
+
+
+def percentil(valores_ordenados, p):
+    """
+    Calcula un percentil por el método del rango más cercano.
+
+    Args:
+        valores_ordenados (list): Valores ordenados de menor a mayor.
+        p (float): Percentil entre 0 y 100.
+
+    Returns:
+        float: El menor valor que deja al menos el p% de los valores por debajo o igual.
+    """
+    indice = max(0, math.ceil(p / 100 * len(valores_ordenados)) - 1)
+    return valores_ordenados[indice]
+
+
+def medir_modo(ejecutar, preparar_consulta, consultas, medir_memoria):
+    """
+    Mide un modo de búsqueda sobre todas las consultas.
+
+    Args:
+        ejecutar (callable): Función (origen, destino, *extra) -> resultado de la búsqueda.
+        preparar_consulta (callable): Función (origen, destino) -> tupla de argumentos extra,
+            que se ejecuta fuera de la medición (por ejemplo, armar una heurística).
+        consultas (list): Pares (origen, destino).
+        medir_memoria (bool): Si es True, hace una segunda pasada con tracemalloc.
+
+    Returns:
+        dict: Latencias en milisegundos (p50, p95, p99, media), pico de memoria en MB,
+        suma de las distancias encontradas y cantidad de consultas sin ruta.
+    """
+    latencias = []
+    suma_distancias = 0
+    sin_ruta = 0
+    for origen, destino in consultas:
+        extra = preparar_consulta(origen, destino)
+        inicio = time.perf_counter_ns()
+        resultado = ejecutar(origen, destino, *extra)
+        latencias.append((time.perf_counter_ns() - inicio) / 1e6)
+
+        distancia = distancia_del_resultado(resultado)
+        if distancia is None:
+            sin_ruta += 1
+        else:
+            suma_distancias += distancia
+
+    pico = None
+    if medir_memoria:
+        tracemalloc.start()
+        pico_bytes = 0
+        for origen, destino in consultas:
+            extra = preparar_consulta(origen, destino)
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            ejecutar(origen, destino, *extra)
+            _, maximo = tracemalloc.get_traced_memory()
+            pico_bytes = max(pico_bytes, maximo - base)
+        tracemalloc.stop()
+        pico = pico_bytes / 2 ** 20
+
+    latencias.sort()
+    return {
+        "p50_ms": percentil(latencias, 50),
+        "p95_ms": percentil(latencias, 95),
+        "p99_ms": percentil(latencias, 99),
+        "media_ms": sum(latencias) / len(latencias),
+        "pico_memoria_mb": pico,
+        "suma_distancias": suma_distancias,
+        "sin_ruta": sin_ruta,
+    }
+
+
+def distancia_del_resultado(resultado):
+    """
+    Extrae la distancia del resultado de cualquier modo de búsqueda.
+
+    Args:
+        resultado: (ruta, distancia) en GrafoEcuador, o el formato de cada script didáctico:
+            una ruta sola (BFS, DFS), (ruta, costo), (costo, ruta) o None.
+
+    Returns:
+        float or None: La distancia encontrada, 0 si el modo no calcula distancias, o None
+        si no se encontró ruta.
+    """
+    if resultado is None:
+        return None
+    if isinstance(resultado, list):
+        return 0
+    primero, segundo = resultado
+    if primero is None:
+        return None
+    return segundo if isinstance(primero, list) else primero
+
+
+def ejecutar_red(tipo, aristas_objetivo, args, didacticas):
+    """
+    Genera una red y mide todos los modos seleccionados sobre ella.
+
+    Args:
+        tipo (str): Tipo de red.
+        aristas_objetivo (int): Cantidad aproximada de carreteras.
+        args (argparse.Namespace): Parámetros de la línea de comandos.
+        didacticas (dict): Funciones didácticas cargadas con cargar_versiones_didacticas.
+
+    Returns:
+        list: Un diccionario de resultados por modo.
+    """
+    grafo_dict, coordenadas = generar_red(tipo, aristas_objetivo, args.semilla)
+    grafo = GrafoEcuador(grafo_dict)
+    grafo.coordenadas = coordenadas
+    aristas = grafo.compacto.num_aristas // 2
+    consultas = elegir_consultas(grafo, args.consultas, args.semilla)
+    print(f"\n{tipo}: {len(grafo.ciudades)} ciudades, {aristas} carreteras, {len(consultas)} consultas")
+
+    modos = dict(GrafoEcuador.ALGORITMOS)
+    modos["Todos los Pares (matriz)"] = "obtener_ruta"
+    modos.update({modo: None for modo in didacticas})
+    if args.modos:
+        modos = {modo: metodo for modo, metodo in modos.items() if modo in args.modos}
+
+    def heuristica_didactica(origen, destino):
+        # Diccionario {ciudad: distancia en línea recta al destino}, como el de los scripts
+        distancias = np.nan_to_num(grafo.distancias_linea_recta(destino), nan=0.0)
+        return (dict(zip(grafo.compacto.nombres, distancias.tolist())),)
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as carpeta_cache:
+        ruta_cache = os.path.join(carpeta_cache, f"{tipo}_{aristas_objetivo}.json")
+        for modo, metodo in modos.items():
+            resultado = {"red": tipo, "aristas_objetivo": aristas_objetivo, "ciudades": len(grafo.ciudades),
+                         "aristas": aristas, "modo": modo, "preparacion_s": 0.0, "omitido": None}
+            limite = LIMITE_ARISTAS_DIDACTICAS if metodo is None else LIMITES_ARISTAS.get(modo)
+            if limite is not None and aristas > limite:
+                resultado["omitido"] = f"más de {limite} carreteras"
+                print(f"  {modo:<32} omitido ({resultado['omitido']})")
+                resultados.append(resultado)
+                continue
+
+            if metodo is None:
+                funcion, usa_heuristica = didacticas[modo]
+                if usa_heuristica:
+                    ejecutar = lambda o, d, h, f=funcion: f(grafo.grafo, h, o, d)
+                    preparar_consulta = heuristica_didactica
+                else:
+                    ejecutar = lambda o, d, f=funcion: f(grafo.grafo, o, d)
+                    preparar_consulta = lambda o, d: ()
+            else:
+                if modo in PREPARACIONES:
+                    inicio = time.perf_counter()
+                    getattr(grafo, PREPARACIONES[modo])(ruta_json=ruta_cache)
+                    resultado["preparacion_s"] = time.perf_counter() - inicio
+                ejecutar = getattr(grafo, metodo)
+                preparar_consulta = lambda o, d: ()
+
+            resultado.update(medir_modo(ejecutar, preparar_consulta, consultas, not args.sin_memoria))
+            memoria = "-" if resultado["pico_memoria_mb"] is None else f"{resultado['pico_memoria_mb']:.2f}"
+            print(f"  {modo:<32} p50 {resultado['p50_ms']:>9.3f} ms  p95 {resultado['p95_ms']:>9.3f} ms  "
+                  f"p99 {resultado['p99_ms']:>9.3f} ms  memoria {memoria:>7} MB  "
+                  f"preparación {resultado['preparacion_s']:.2f} s")
+            resultados.append(resultado)
+
+    return resultados
+
+
+def obtener_commit():
+    """
+    Obtiene el commit actual de git, para identificar la versión medida.
+
+    Returns:
+        str or None: Hash del commit, o None si no se ejecuta dentro de un repositorio git.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=RAIZ_REPOSITORIO, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar_resultados(anteriores, actuales):
+    """
+    Compara dos ejecuciones del banco de pruebas y marca las regresiones.
+
+    Args:
+        anteriores (dict): Contenido del JSON de la ejecución de referencia.
+        actuales (dict): Contenido del JSON de la ejecución actual.
+    """
+    def clave(resultado):
+        return resultado["red"], resultado["aristas_objetivo"], resultado["modo"]
+
+    referencia = {clave(r): r for r in anteriores["resultados"] if not r.get("omitido")}
+    print(f"\nComparación con el commit {anteriores['metadatos'].get('commit') or 'desconocido'}:")
+    print(f"{'Red':<12}{'Aristas':>9}  {'Modo':<32}{'p50 antes':>11}{'p50 ahora':>11}{'Cambio':>9}")
+    for resultado in actuales["resultados"]:
+        anterior = referencia.get(clave(resultado))
+        if resultado.get("omitido") or anterior is None:
+            continue
+        cambio = resultado["p50_ms"] / anterior["p50_ms"] if anterior["p50_ms"] > 0 else float("inf")
+        marca = "  REGRESIÓN" if cambio > UMBRAL_REGRESION else ""
+        if resultado["suma_distancias"] != anterior["suma_distancias"]:
+            marca += "  DISTANCIAS DISTINTAS"
+        print(f"{resultado['red']:<12}{resultado['aristas_objetivo']:>9}  {resultado['modo']:<32}"
+              f"{anterior['p50_ms']:>11.3f}{resultado['p50_ms']:>11.3f}{cambio:>8.2f}x{marca}")
+
+
+def main():
+    """
+    Punto de entrada del banco de pruebas.
+    """
+    parser = argparse.ArgumentParser(description="Banco de pruebas de los modos de búsqueda de rutas")
+    parser.add_argument("--tipos", nargs="+", default=["cuadricula", "geometrico", "ecuador"],
+                        choices=["cuadricula", "geometrico", "ecuador"])
+    parser.add_argument("--aristas", nargs="+", type=int, default=[1_000, 10_000, 100_000],
+                        help="Tamaños de red en cantidad aproximada de carreteras (hasta 1000000)")
+    parser.add_argument("--consultas", type=int, default=50)
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--modos", nargs="+", help="Medir solo estos modos (por defecto, todos)")
+    parser.add_argument("--sin-memoria", action="store_true", help="No medir la memoria con tracemalloc")
+    parser.add_argument("--salida", default="resultados_benchmark.json")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior para detectar regresiones")
+    args = parser.parse_args()
+
+    didacticas = cargar_versiones_didacticas()
+
+    resultados = []
+    for tipo in args.tipos:
+        for aristas in args.aristas:
+            resultados.extend(ejecutar_red(tipo, aristas, args, didacticas))
+
+    salida = {
+        "metadatos": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "commit": obtener_commit(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "semilla": args.semilla,
+            "consultas": args.consultas,
+        },
+        "resultados": resultados,
+    }
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(salida, archivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as archivo:
+            comparar_resultados(json.load(archivo), salida)
+
+
+if __name__ == "__main__":
+    main()
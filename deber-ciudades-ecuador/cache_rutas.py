@@ -0,0 +1,102 @@
+# Importación de OrderedDict para mantener las entradas en orden de uso reciente
+from collections import OrderedDict
+
+
+# Cantidad de rutas guardadas por defecto
+CAPACIDAD_CACHE = 1024
+
+
+class CacheRutas:
+    """
+    Caché acotada de resultados de búsqueda con política LRU (se descarta la menos usada).
+
+    Cada entrada se identifica por (origen, destino, algoritmo) y guarda la versión del grafo
+    con la que se calculó. Una entrada de una versión anterior nunca se devuelve: cuenta como
+    fallo y se reemplaza con el resultado nuevo.
+
+    Atributos:
+        capacidad (int): Máximo de entradas guardadas.
+        aciertos (int): Consultas respondidas desde la caché.
+        fallos (int): Consultas que no estaban en la caché o estaban obsoletas.
+        desalojos (int): Entradas descartadas por falta de espacio.
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_CACHE):
+        """
+        Crea una caché vacía.
+
+        Args:
+            capacidad (int, optional): Máximo de entradas guardadas.
+        """
+        self.capacidad = capacidad
+        self._entradas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def __len__(self):
+        """
+        Cantidad de entradas guardadas, incluidas las obsoletas que aún no se reemplazaron.
+
+        Returns:
+            int: Número de entradas.
+        """
+        return len(self._entradas)
+
+    def obtener(self, clave, version):
+        """
+        Busca un resultado en la caché.
+
+        Args:
+            clave (tuple): (origen, destino, algoritmo).
+            version (int): Versión actual del grafo.
+
+        Returns:
+            tuple or None: (ruta, distancia) guardados, o None si la clave no está o se
+            calculó con otra versión del grafo.
+        """
+        entrada = self._entradas.get(clave)
+        if entrada is None or entrada[0] != version:
+            self.fallos += 1
+            return None
+
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        return entrada[1], entrada[2]
+
+    def guardar(self, clave, version, ruta, distancia):
+        """
+        Guarda un resultado y descarta la entrada menos usada si se supera la capacidad.
+
+        Args:
+            clave (tuple): (origen, destino, algoritmo).
+            version (int): Versión del grafo con la que se calculó el resultado.
+            ruta (list or None): Ruta encontrada.
+            distancia (float or None): Distancia de la ruta.
+        """
+        self._entradas[clave] = (version, ruta, distancia)
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.capacidad:
+            self._entradas.popitem(last=False)
+            self.desalojos += 1
+
+    def limpiar(self):
+        """
+        Descarta todas las entradas y reinicia los contadores.
+        """
+        self._entradas.clear()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def resumen(self):
+        """
+        Genera una línea de texto con el estado de la caché.
+
+        Returns:
+            str: Entradas, aciertos, fallos, desalojos y tasa de aciertos.
+        """
+        consultas = self.aciertos + self.fallos
+        tasa = self.aciertos / consultas if consultas else 0
+        return (f"Caché de rutas: {len(self)}/{self.capacidad} entradas, {self.aciertos} aciertos, "
+                f"{self.fallos} fallos, {self.desalojos} desalojos ({tasa:.0%} de aciertos)")
@@ -0,0 +1,508 @@
+# Importación de math para el ángulo de las distancias y el tamaño de las celdas de agregación
+import math
+
+# Importación de numpy para seleccionar ciudades y aristas de la vista sin recorrerlas en Python
+import numpy as np
+
+# Importación de Artist, LineCollection y Rectangle para las aristas, la ruta resaltada, el velo
+# y el artista que elige el nivel de detalle antes de cada dibujado
+from matplotlib.artist import Artist
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+from matplotlib.patches import Rectangle
+from matplotlib.transforms import Bbox
+
+# Importación del borde del mapa real, compartido con GrafoEcuador.visualizar_grafo
+from grafo_ecuador import BORDE_ECUADOR
+
+
+# Opacidad del velo que atenúa el resto del grafo mientras hay una ruta resaltada
+OPACIDAD_VELO = 0.6
+
+# Ancho de la ruta resaltada y ancho extra de cada ruta anterior cuando se superponen varias
+# (la primera es la más ancha, así las rutas que comparten tramos se ven como franjas)
+ANCHO_RUTA = 3
+ANCHO_EXTRA_RUTA = 1.2
+
+# Títulos del mapa según las rutas resaltadas
+TITULO = "Grafo de Distancias entre Ciudades de Ecuador"
+TITULO_RUTA = "Grafo de Distancias entre Ciudades de Ecuador - Ruta Encontrada"
+TITULO_COMPARACION = "Grafo de Distancias entre Ciudades de Ecuador - Comparación de Algoritmos"
+
+# Máximo de ciudades dibujadas; si hay más en la vista se dibujan solo las principales
+MAX_CIUDADES = 300
+
+# Máximo de nombres de ciudades y de distancias en las aristas que se muestran a la vez
+MAX_ETIQUETAS = 50
+MAX_ETIQUETAS_ARISTAS = 60
+
+# Celdas a lo ancho de la vista con las que se agregan las aristas en la vista general
+CELDAS_AGREGACION = 40
+
+# Tamaño de las ciudades (en puntos²): completo hasta CIUDADES_TAMANO_COMPLETO ciudades
+# dibujadas y luego proporcional, sin bajar de TAMANO_MINIMO
+TAMANO_CIUDAD = 500
+CIUDADES_TAMANO_COMPLETO = 60
+TAMANO_MINIMO = 20
+
+
+class _SelectorDetalle(Artist):
+    """
+    Artista sin contenido que se dibuja antes que el resto de los artistas de los ejes.
+
+    Al dibujarse, la capa elige qué ciudades, aristas y etiquetas corresponden a la vista
+    actual, de modo que el zoom y el desplazamiento de la barra de navegación no necesitan
+    un segundo dibujado.
+    """
+
+    def __init__(self, capa):
+        super().__init__()
+        self._capa = capa
+        self.set_zorder(-math.inf)
+
+    def draw(self, renderer):
+        self._capa._actualizar_detalle()
+
+
+class CapaMapa:
+    """
+    Capa de dibujo persistente del grafo en los ejes de la interfaz.
+
+    El dibujo se separa en dos partes:
+    - Parte fija: fondo, aristas, ciudades y etiquetas. Sus artistas se crean solo cuando
+      cambia el grafo (su versión) o el modo de visualización y se conservan entre dibujados.
+    - Parte dinámica: el título, el velo que atenúa el resto del grafo, las aristas de las
+      rutas resaltadas, sus ciudades y la leyenda de colores. Son artistas animados que no forman parte del dibujado
+      completo; se dibujan sobre una copia del fondo ya dibujado y se copian a la pantalla
+      con blitting.
+
+    Así, resaltar una ruta solo actualiza los segmentos de una colección de líneas y
+    mostrar la ciudad bajo el mouse solo actualiza el texto del título.
+
+    La parte fija tiene niveles de detalle según la vista actual de los ejes (la que cambian
+    el zoom y el desplazamiento de la barra de navegación):
+    - Vista general (más de MAX_CIUDADES ciudades en la vista): solo las MAX_CIUDADES
+      ciudades principales (las de más conexiones) y las aristas agregadas por celdas de
+      una cuadrícula, una línea entre los centros de cada par de celdas conectadas.
+    - Vista de detalle: todas las ciudades y aristas de la vista.
+    En ambas se nombran las MAX_ETIQUETAS ciudades principales de la vista, así que al
+    acercarse aparecen los nombres de ciudades menores; las distancias aparecen cuando la
+    vista tiene a lo sumo MAX_ETIQUETAS_ARISTAS aristas (en el mapa real, solo al acercarse).
+    Las ciudades de la vista se buscan con el índice espacial del grafo.
+
+    Atributos:
+        aristas (LineCollection): Aristas dibujadas en la vista actual.
+        nodos (PathCollection): Ciudades dibujadas en la vista actual.
+        etiquetas (dict): {ciudad: Text} con los nombres mostrados en la vista actual.
+        etiquetas_aristas (dict): {(u, v): Text} con las distancias mostradas en la vista actual.
+    """
+
+    def __init__(self, canvas, ax, grafo):
+        """
+        Crea la capa sobre unos ejes ya ubicados en un canvas.
+
+        Args:
+            canvas (FigureCanvasBase): Canvas de la figura (por ejemplo, FigureCanvasTkAgg).
+            ax (matplotlib.axes.Axes): Ejes donde se dibuja el grafo.
+            grafo (GrafoEcuador): Grafo a dibujar.
+        """
+        self.canvas = canvas
+        self.ax = ax
+        self.grafo = grafo
+        # (versión del grafo, modo pedido) con los que se construyó la parte fija
+        self._dibujado = None
+        self._usar_mapa_real = False
+        self._mapa_real = False
+        self._fondo = None
+        # Rutas resaltadas: [(etiqueta, ruta, color)]
+        self._rutas = []
+        # Vista (x_min, y_min, x_max, y_max) para la que se eligió el nivel de detalle
+        self._vista = None
+
+        # Ciudades en orden de importancia: posición i-ésima, nombre y orden de cada nombre
+        self._xy = None
+        self._nombres = []
+        self._orden = {}
+        # Aristas (i < j en orden de importancia), sus extremos y sus distancias
+        self._aristas_indices = None
+        self._extremos = None
+        self._distancias = []
+        # Aristas agregadas por tamaño de celda: {exponente: segmentos}
+        self._agregadas = {}
+
+        self.aristas = None
+        self.nodos = None
+        self.etiquetas = {}
+        self.etiquetas_aristas = {}
+        self._textos = []
+        self._textos_aristas = []
+
+        self._velo = None
+        self._aristas_ruta = None
+        self._nodos_ruta = None
+        self._textos_ruta = []
+        self._leyenda = None
+
+        # Después de cada dibujado completo (incluidos zoom, desplazamiento y cambio de tamaño)
+        # se guarda el fondo y se dibuja encima la parte dinámica
+        self.canvas.mpl_connect('draw_event', self._al_dibujar)
+
+    def dibujar(self, usar_mapa_real, ruta=None):
+        """
+        Muestra el grafo con una ruta resaltada opcional.
+
+        Args:
+            usar_mapa_real (bool): Modo de visualización (ver GrafoEcuador.posiciones).
+            ruta (list, optional): Ciudades de la ruta a resaltar.
+
+        Si el grafo o el modo cambiaron desde el último dibujado, se reconstruye la parte
+        fija y se redibuja el canvas completo; si no, solo se actualiza la ruta resaltada
+        con blitting.
+        """
+        self.dibujar_rutas(usar_mapa_real, [(None, ruta, 'r')] if ruta else [])
+
+    def dibujar_rutas(self, usar_mapa_real, rutas):
+        """
+        Muestra el grafo con varias rutas resaltadas a la vez, cada una con su color.
+
+        Args:
+            usar_mapa_real (bool): Modo de visualización (ver GrafoEcuador.posiciones).
+            rutas (list): Tuplas (etiqueta, ruta, color). Si alguna tiene etiqueta, se
+                muestra una leyenda con los colores. Las rutas vacías o de una sola ciudad
+                se omiten.
+
+        Como en dibujar, las rutas son parte de la capa dinámica: si el grafo y el modo no
+        cambiaron, todas se muestran con un solo blitting.
+        """
+        self._usar_mapa_real = usar_mapa_real
+        self._rutas = [(etiqueta, ruta, color) for etiqueta, ruta, color in rutas if ruta and len(ruta) > 1]
+        if self._dibujado != (self.grafo.version, usar_mapa_real) or self._fondo is None:
+            self._construir()
+            self.canvas.draw()
+        else:
+            self._actualizar_rutas()
+            self._mostrar(self.canvas.figure.bbox)
+
+    def restaurar_titulo(self):
+        """
+        Vuelve a mostrar el título que corresponde a las rutas resaltadas.
+        """
+        self.mostrar_titulo(self._titulo())
+
+    def _titulo(self):
+        """
+        Calcula el título según las rutas resaltadas.
+
+        Returns:
+            str: TITULO, TITULO_RUTA o TITULO_COMPARACION.
+        """
+        if len(self._rutas) > 1:
+            return TITULO_COMPARACION
+        return TITULO_RUTA if self._rutas else TITULO
+
+    def mostrar_titulo(self, texto):
+        """
+        Cambia el título del mapa sin redibujar el grafo.
+
+        Args:
+            texto (str): Nuevo título.
+
+        Solo se restaura, se dibuja y se copia a la pantalla la franja de la figura que
+        está sobre los ejes, donde está el título; la ruta resaltada no se toca.
+        """
+        self.ax.title.set_text(texto)
+        if self._fondo is None:
+            return
+        figura = self.canvas.figure.bbox
+        franja = Bbox.from_extents(figura.x0, self.ax.bbox.y1, figura.x1, figura.y1)
+        # restore_region recibe la región con el origen arriba a la izquierda, como el búfer
+        self.canvas.restore_region(self._fondo, bbox=(figura.x0, 0, figura.x1, figura.y1 - self.ax.bbox.y1),
+                                   xy=(figura.x0, 0))
+        self.ax.draw_artist(self.ax.title)
+        self.canvas.blit(franja)
+
+    def _construir(self):
+        """
+        Reconstruye los artistas de la parte fija y crea los de la parte dinámica.
+
+        Los artistas de la parte fija se crean vacíos: su contenido lo elige
+        _actualizar_detalle en cada dibujado según la vista.
+        """
+        ax = self.ax
+        ax.clear()
+        self._fondo = None
+        self._vista = None
+        self._agregadas = {}
+        grafo = self.grafo.grafo
+        pos = self.grafo.posiciones(self._usar_mapa_real)
+        self._mapa_real = self.grafo.usa_coordenadas_reales(self._usar_mapa_real)
+
+        # Las ciudades se ordenan por cantidad de conexiones; ese orden define las principales
+        self._nombres = sorted(pos, key=lambda ciudad: (-len(grafo[ciudad]), ciudad))
+        self._orden = dict(zip(self._nombres, range(len(self._nombres))))
+        self._xy = np.array([pos[ciudad] for ciudad in self._nombres], dtype=float).reshape(-1, 2)
+        aristas = []
+        self._distancias = []
+        for origen, destinos in grafo.items():
+            i = self._orden[origen]
+            for destino, distancia in destinos.items():
+                j = self._orden[destino]
+                if i < j:
+                    aristas.append((i, j))
+                    self._distancias.append(distancia)
+        self._aristas_indices = np.array(aristas, dtype=np.int64).reshape(-1, 2)
+        self._extremos = self._xy[self._aristas_indices]
+
+        if self._mapa_real:
+            # Fondo del mapa de Ecuador (simplificado)
+            ax.set_facecolor('#e6f7ff')
+            lons, lats = zip(*BORDE_ECUADOR)
+            ax.fill(lons, lats, alpha=0.2, color='green')
+        # La vista inicial abarca todas las ciudades aunque se dibujen solo algunas
+        ax.update_datalim(self._xy)
+        ax.autoscale_view()
+
+        ax.add_artist(_SelectorDetalle(self))
+        self.aristas = LineCollection([], colors='k', linewidths=1, zorder=1)
+        ax.add_collection(self.aristas, autolim=False)
+        self.nodos = ax.scatter([], [], s=TAMANO_CIUDAD, c='lightblue', edgecolors='black', zorder=2)
+        self._textos = [ax.text(0, 0, '', fontsize=8, family='sans-serif', ha='center', va='center',
+                                clip_on=True, visible=False)
+                        for _ in range(MAX_ETIQUETAS)]
+        self._textos_aristas = [ax.text(0, 0, '', fontsize=7, ha='center', va='center', rotation_mode='anchor',
+                                        bbox=dict(boxstyle='round', ec=(1.0, 1.0, 1.0), fc=(1.0, 1.0, 1.0)),
+                                        zorder=1, clip_on=True, visible=False)
+                                for _ in range(MAX_ETIQUETAS_ARISTAS)]
+        self.etiquetas = {}
+        self.etiquetas_aristas = {}
+        ax.axis('off')
+
+        # Parte dinámica: se dibuja solo sobre el fondo guardado (ver _dibujar_dinamicos)
+        self._velo = Rectangle((0, 0), 1, 1, transform=ax.transAxes, animated=True,
+                               facecolor=self.canvas.figure.get_facecolor(), alpha=OPACIDAD_VELO)
+        ax.add_patch(self._velo)
+        self._aristas_ruta = LineCollection([], colors='r', linewidths=ANCHO_RUTA, animated=True)
+        ax.add_collection(self._aristas_ruta, autolim=False)
+        self._nodos_ruta = ax.scatter([], [], s=TAMANO_CIUDAD, c='lightblue', edgecolors='black', animated=True)
+        self._textos_ruta = [ax.text(0, 0, '', fontsize=8, family='sans-serif', ha='center', va='center',
+                                     clip_on=True, animated=True, visible=False)
+                             for _ in range(MAX_ETIQUETAS)]
+        self._leyenda = None
+        ax.title.set_animated(True)
+        self._actualizar_rutas()
+
+        self._dibujado = (self.grafo.version, self._usar_mapa_real)
+
+    def _actualizar_detalle(self):
+        """
+        Elige las ciudades, aristas y etiquetas de la parte fija para la vista actual.
+
+        Se llama al comienzo de cada dibujado completo (ver _SelectorDetalle) y no hace
+        nada si la vista no cambió desde la última vez.
+        """
+        x_min, x_max = sorted(self.ax.get_xlim())
+        y_min, y_max = sorted(self.ax.get_ylim())
+        vista = (x_min, y_min, x_max, y_max)
+        if vista == self._vista:
+            return
+        self._vista = vista
+
+        # En la vista general basta con recorrer las primeras ciudades en orden de importancia
+        candidatas = self._xy[:MAX_CIUDADES * 8]
+        dentro = np.flatnonzero((candidatas[:, 0] >= x_min) & (candidatas[:, 0] <= x_max)
+                                & (candidatas[:, 1] >= y_min) & (candidatas[:, 1] <= y_max))
+        if len(dentro) >= MAX_CIUDADES or len(candidatas) == len(self._xy):
+            visibles = dentro
+        else:
+            ciudades = self.grafo.ciudades_en_rectangulo(x_min, y_min, x_max, y_max, self._usar_mapa_real)
+            visibles = np.sort(np.fromiter((self._orden[ciudad] for ciudad in ciudades),
+                                           dtype=np.int64, count=len(ciudades)))
+        general = len(visibles) > MAX_CIUDADES
+        elegidas = visibles[:MAX_CIUDADES]
+
+        tamano = TAMANO_CIUDAD
+        if len(elegidas) > CIUDADES_TAMANO_COMPLETO:
+            tamano = max(TAMANO_MINIMO, TAMANO_CIUDAD * CIUDADES_TAMANO_COMPLETO / len(elegidas))
+        self.nodos.set_offsets(self._xy[elegidas].reshape(-1, 2))
+        self.nodos.set_sizes([tamano])
+        self._nodos_ruta.set_sizes([tamano])
+
+        self.etiquetas = {}
+        for texto, i in zip(self._textos, elegidas[:MAX_ETIQUETAS]):
+            texto.set_text(self._nombres[i])
+            texto.set_position(self._xy[i])
+            self.etiquetas[self._nombres[i]] = texto
+        for texto in self._textos[len(self.etiquetas):]:
+            texto.set_visible(False)
+        for texto in self.etiquetas.values():
+            texto.set_visible(True)
+
+        indices_aristas = []
+        if general:
+            segmentos = self._aristas_agregadas(max(x_max - x_min, y_max - y_min) / CELDAS_AGREGACION)
+            segmentos = segmentos[self._en_vista(segmentos, vista)]
+        else:
+            indices_aristas = np.flatnonzero(self._en_vista(self._extremos, vista))
+            segmentos = self._extremos[indices_aristas]
+            # En el mapa real las distancias se muestran solo al acercarse
+            if len(indices_aristas) > MAX_ETIQUETAS_ARISTAS or (self._mapa_real and len(visibles) == len(self._xy)):
+                indices_aristas = []
+        self.aristas.set_segments(segmentos)
+        self._mostrar_distancias(indices_aristas)
+
+    def _mostrar_distancias(self, indices_aristas):
+        """
+        Muestra las distancias de unas aristas en su punto medio, alineadas con la arista.
+
+        Args:
+            indices_aristas (sequence): Índices de las aristas (a lo sumo MAX_ETIQUETAS_ARISTAS).
+        """
+        self.etiquetas_aristas = {}
+        for texto, k in zip(self._textos_aristas, indices_aristas):
+            (x1, y1), (x2, y2) = self.ax.transData.transform(self._extremos[k])
+            angulo = math.degrees(math.atan2(y2 - y1, x2 - x1))
+            if angulo > 90:
+                angulo -= 180
+            elif angulo < -90:
+                angulo += 180
+            texto.set_text(str(self._distancias[k]))
+            texto.set_position(self._extremos[k].mean(axis=0))
+            texto.set_rotation(angulo)
+            texto.set_visible(True)
+            i, j = self._aristas_indices[k]
+            self.etiquetas_aristas[(self._nombres[i], self._nombres[j])] = texto
+        for texto in self._textos_aristas[len(self.etiquetas_aristas):]:
+            texto.set_visible(False)
+
+    def _aristas_agregadas(self, tamano):
+        """
+        Agrega las aristas por celdas de una cuadrícula.
+
+        Args:
+            tamano (float): Tamaño deseado de las celdas; se redondea a una potencia de 2
+                para reutilizar la agregación entre vistas parecidas.
+
+        Returns:
+            numpy.ndarray: Segmentos (k, 2, 2) entre los centros (promedio de las posiciones
+            de sus ciudades) de cada par de celdas unidas por al menos una arista.
+        """
+        exponente = math.ceil(math.log2(max(tamano, 1e-12)))
+        segmentos = self._agregadas.get(exponente)
+        if segmentos is None:
+            celdas = np.floor(self._xy / 2.0 ** exponente).astype(np.int64)
+            # Una clave entera por celda: np.unique en una dimensión es mucho más rápido que por filas
+            _, celda_de = np.unique(celdas[:, 0] * 2 ** 32 + celdas[:, 1], return_inverse=True)
+            celda_de = celda_de.ravel()
+            cantidad = int(celda_de.max()) + 1 if len(celda_de) else 0
+            ciudades = np.bincount(celda_de, minlength=cantidad)
+            centros = np.column_stack([np.bincount(celda_de, self._xy[:, 0], cantidad),
+                                       np.bincount(celda_de, self._xy[:, 1], cantidad)]) / ciudades[:, None]
+            a = celda_de[self._aristas_indices[:, 0]]
+            b = celda_de[self._aristas_indices[:, 1]]
+            distintas = a != b
+            claves = np.unique(np.minimum(a, b)[distintas] * cantidad + np.maximum(a, b)[distintas])
+            segmentos = centros[np.column_stack([claves // cantidad, claves % cantidad])].reshape(-1, 2, 2)
+            self._agregadas[exponente] = segmentos
+        return segmentos
+
+    @staticmethod
+    def _en_vista(segmentos, vista):
+        """
+        Indica qué segmentos tienen su rectángulo contenedor dentro de la vista o cruzándola.
+
+        Args:
+            segmentos (numpy.ndarray): Segmentos (k, 2, 2).
+            vista (tuple): (x_min, y_min, x_max, y_max).
+
+        Returns:
+            numpy.ndarray: Máscara booleana de largo k.
+        """
+        x_min, y_min, x_max, y_max = vista
+        x, y = segmentos[:, :, 0], segmentos[:, :, 1]
+        return ((x.max(axis=1) >= x_min) & (x.min(axis=1) <= x_max)
+                & (y.max(axis=1) >= y_min) & (y.min(axis=1) <= y_max))
+
+    def _actualizar_rutas(self):
+        """
+        Actualiza los segmentos, ciudades, nombres y leyenda de las rutas resaltadas.
+
+        Los segmentos de todas las rutas van en una sola colección de líneas, con el color
+        de su ruta; cuando hay varias, las primeras son más anchas para que los tramos
+        compartidos sigan mostrando todos los colores. Se nombran los extremos de las rutas
+        y las ciudades principales por las que pasan, hasta MAX_ETIQUETAS.
+        """
+        pos = self.grafo.posiciones(self._usar_mapa_real)
+        segmentos, colores, anchos = [], [], []
+        for k, (_, ruta, color) in enumerate(self._rutas):
+            ancho = ANCHO_RUTA + ANCHO_EXTRA_RUTA * (len(self._rutas) - 1 - k)
+            for u, v in zip(ruta, ruta[1:]):
+                segmentos.append((pos[u], pos[v]))
+                colores.append(color)
+                anchos.append(ancho)
+        self._aristas_ruta.set_segments(segmentos)
+        if segmentos:
+            self._aristas_ruta.set_color(colores)
+            self._aristas_ruta.set_linewidth(anchos)
+
+        extremos = [ciudad for _, ruta, _ in self._rutas for ciudad in (ruta[0], ruta[-1])]
+        ciudades = list(dict.fromkeys(ciudad for _, ruta, _ in self._rutas for ciudad in ruta))
+        self._nodos_ruta.set_offsets([pos[ciudad] for ciudad in ciudades] or np.empty((0, 2)))
+        intermedias = sorted(set(ciudades) - set(extremos), key=self._orden.get)
+        nombradas = list(dict.fromkeys(extremos + intermedias))[:MAX_ETIQUETAS]
+        for texto, ciudad in zip(self._textos_ruta, nombradas):
+            texto.set_text(ciudad)
+            texto.set_position(pos[ciudad])
+            texto.set_visible(True)
+        for texto in self._textos_ruta[len(nombradas):]:
+            texto.set_visible(False)
+
+        if self._leyenda is not None:
+            self._leyenda.remove()
+            self._leyenda = None
+        manijas = [Line2D([], [], color=color, linewidth=ANCHO_RUTA, label=etiqueta)
+                   for etiqueta, _, color in self._rutas if etiqueta]
+        if manijas:
+            self._leyenda = self.ax.legend(handles=manijas, loc='best', fontsize=7)
+            self._leyenda.set_animated(True)
+        self.ax.title.set_text(self._titulo())
+
+    def _dibujar_dinamicos(self):
+        """
+        Dibuja la parte dinámica sobre el contenido actual del canvas.
+
+        El velo atenúa el resto del grafo; encima van las aristas de las rutas, sus
+        ciudades, sus nombres y la leyenda, y por último el título.
+        """
+        if self._rutas:
+            self.ax.draw_artist(self._velo)
+            self.ax.draw_artist(self._aristas_ruta)
+            self.ax.draw_artist(self._nodos_ruta)
+            for texto in self._textos_ruta:
+                if texto.get_visible():
+                    self.ax.draw_artist(texto)
+            if self._leyenda is not None:
+                self.ax.draw_artist(self._leyenda)
+        self.ax.draw_artist(self.ax.title)
+
+    def _al_dibujar(self, event):
+        """
+        Guarda el fondo después de un dibujado completo y dibuja la parte dinámica encima.
+
+        Args:
+            event (matplotlib.backend_bases.DrawEvent): Evento de dibujado del canvas.
+        """
+        if self._dibujado is None:
+            return
+        self._fondo = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._dibujar_dinamicos()
+
+    def _mostrar(self, bbox):
+        """
+        Restaura el fondo, dibuja la parte dinámica y copia a la pantalla una región.
+
+        Args:
+            bbox (matplotlib.transforms.Bbox): Región de la figura que cambió.
+        """
+        self.canvas.restore_region(self._fondo)
+        self._dibujar_dinamicos()
+        self.canvas.blit(bbox)
@@ -0,0 +1,163 @@
+# Importación de os y tempfile para la instantánea temporal del grafo que abren los procesos
+import os
+import tempfile
+
+# Importación de time para medir el tiempo real de cada búsqueda
+import time
+
+# Importación de multiprocessing y concurrent.futures para el grupo de procesos que
+# ejecuta los algoritmos a la vez
+import multiprocessing
+import concurrent.futures
+
+# Módulos locales
+from grafo_ecuador import GrafoEcuador
+
+
+# Cada cuántos segundos se revisa si la comparación fue cancelada mientras se esperan resultados
+INTERVALO_CANCELACION_S = 0.1
+
+# Grafo de cada proceso trabajador y ruta del JSON junto al cual se guardan los landmarks y
+# la jerarquía (se asignan en _inicializar_trabajador)
+_grafo = None
+_ruta_json = None
+
+
+def _inicializar_trabajador(ruta_instantanea, ruta_json):
+    """
+    Inicializa un proceso trabajador abriendo la instantánea del grafo.
+
+    Args:
+        ruta_instantanea (str): Ruta de la instantánea guardada por el proceso principal.
+        ruta_json (str): Ruta absoluta del JSON del grafo del proceso principal, para leer y
+            guardar los landmarks y la jerarquía en la misma carpeta que él.
+    """
+    global _grafo, _ruta_json
+    _grafo = GrafoEcuador.desde_instantanea(ruta_instantanea)
+    _ruta_json = ruta_json
+
+
+def _buscar(algoritmo, origen, destino):
+    """
+    Ejecuta un algoritmo en el proceso trabajador.
+
+    Args:
+        algoritmo (str): Nombre del algoritmo, una de las claves de GrafoEcuador.ALGORITMOS.
+        origen (str): Ciudad de origen.
+        destino (str): Ciudad de destino.
+
+    Returns:
+        dict: Resultado con las claves algoritmo, ruta, distancia, expandidos, segundos
+        (tiempo real de la llamada, incluida la preparación perezosa de landmarks o de la
+        jerarquía la primera vez) y estadisticas (ver EstadisticasBusqueda.como_diccionario).
+
+    Se llama al método de búsqueda directamente, sin la caché de rutas, para que los
+    contadores correspondan a una búsqueda real.
+    """
+    inicio = time.perf_counter()
+    _grafo.preparar_algoritmo(algoritmo, ruta_json=_ruta_json)
+    ruta, distancia = getattr(_grafo, GrafoEcuador.ALGORITMOS[algoritmo])(origen, destino)
+    segundos = time.perf_counter() - inicio
+    estadisticas = _grafo.ultimas_estadisticas
+    return {
+        "algoritmo": algoritmo,
+        "ruta": ruta,
+        "distancia": distancia,
+        "expandidos": estadisticas.expandidos,
+        "segundos": segundos,
+        "estadisticas": estadisticas.como_diccionario(),
+    }
+
+
+class ComparadorAlgoritmos:
+    """
+    Ejecuta todos los algoritmos de búsqueda de GrafoEcuador a la vez en un grupo de procesos.
+
+    Cada proceso abre la misma instantánea del grafo (ver GrafoEcuador.desde_instantanea),
+    que se guarda en un archivo temporal: abrirla con mapeo de memoria es mucho más rápido
+    que enviar el grafo a cada proceso. El grupo y la instantánea se conservan entre
+    comparaciones mientras el grafo no cambie (según su versión), de modo que los procesos
+    reutilizan también los landmarks y la jerarquía de contracción que ya prepararon.
+
+    Los procesos se crean con el método "spawn": el proceso principal tiene hilos (la
+    interfaz y los trabajadores en segundo plano) y copiarlo con fork podría dejar
+    bloqueos tomados en los procesos hijos.
+    """
+
+    def __init__(self, grafo, procesos=None, ruta_json='grafo_ecuador.json'):
+        """
+        Crea el comparador; el grupo de procesos se inicia en la primera comparación.
+
+        Args:
+            grafo (GrafoEcuador): Grafo a comparar.
+            procesos (int, optional): Número de procesos. Por defecto, uno por algoritmo
+                sin superar la cantidad de CPUs.
+            ruta_json (str, optional): Ruta del JSON del grafo junto al cual se guardan los
+                landmarks y la jerarquía (ver GrafoEcuador.preparar_landmarks). Se resuelve
+                ahora a una ruta absoluta, de modo que los procesos usan la misma carpeta que
+                este proceso sin importar su directorio de trabajo.
+        """
+        self.grafo = grafo
+        self.ruta_json = os.path.abspath(ruta_json)
+        self.procesos = procesos or min(len(GrafoEcuador.ALGORITMOS), os.cpu_count() or 1)
+        self._grupo = None
+        self._version = None
+        self._ruta_instantanea = None
+
+    def _preparar(self):
+        """
+        Inicia el grupo de procesos, o lo reinicia si el grafo cambió desde la última comparación.
+        """
+        if self._grupo is not None and self._version == self.grafo.version:
+            return
+        self.cerrar()
+        descriptor, self._ruta_instantanea = tempfile.mkstemp(prefix="comparacion_", suffix=".snap")
+        os.close(descriptor)
+        self._version = self.grafo.version
+        self.grafo.guardar_instantanea(self._ruta_instantanea)
+        self._grupo = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.procesos, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_inicializar_trabajador, initargs=(self._ruta_instantanea, self.ruta_json))
+
+    def comparar(self, origen, destino, tarea=None):
+        """
+        Busca una ruta con cada algoritmo, en paralelo.
+
+        Args:
+            origen (str): Ciudad de origen.
+            destino (str): Ciudad de destino.
+            tarea (Tarea, optional): Tarea en segundo plano (ver trabajador_segundo_plano):
+                recibe el progreso (algoritmos terminados, total) y, si se cancela, la
+                comparación se interrumpe y los algoritmos que no empezaron se descartan.
+
+        Returns:
+            list: Un resultado por algoritmo (ver _buscar), en el orden de GrafoEcuador.ALGORITMOS.
+        """
+        self._preparar()
+        futuros = [self._grupo.submit(_buscar, algoritmo, origen, destino)
+                   for algoritmo in GrafoEcuador.ALGORITMOS]
+        try:
+            pendientes = set(futuros)
+            while pendientes:
+                _, pendientes = concurrent.futures.wait(pendientes, timeout=INTERVALO_CANCELACION_S,
+                                                        return_when=concurrent.futures.FIRST_COMPLETED)
+                if tarea is not None:
+                    tarea.informar(len(futuros) - len(pendientes), len(futuros))
+        finally:
+            for futuro in futuros:
+                futuro.cancel()
+        return [futuro.result() for futuro in futuros]
+
+    def cerrar(self):
+        """
+        Detiene el grupo de procesos y elimina la instantánea temporal.
+        """
+        if self._grupo is not None:
+            self._grupo.shutdown(wait=False, cancel_futures=True)
+            self._grupo = None
+        if self._ruta_instantanea is not None:
+            try:
+                os.remove(self._ruta_instantanea)
+            except OSError as e:
+                print(f"No se pudo eliminar la instantánea temporal: {e}")
+            self._ruta_instantanea = None
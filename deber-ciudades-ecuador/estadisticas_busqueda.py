@@ -0,0 +1,124 @@
+# Importación de functools para conservar el nombre y la documentación de los métodos medidos
+import functools
+
+# Importación de sys para medir el tamaño en memoria de las estructuras de cada búsqueda
+import sys
+
+# Importación de time para medir la duración de cada búsqueda en nanosegundos
+import time
+
+
+class EstadisticasBusqueda:
+    """
+    Contadores de una búsqueda de ruta, para entender por qué una consulta es lenta.
+
+    Atributos:
+        algoritmo (str): Nombre del método de búsqueda que produjo las estadísticas.
+        expandidos (int): Ciudades expandidas (cuyos vecinos se exploraron).
+        inserciones (int): Inserciones en la frontera (heap, cola o pila).
+        extracciones (int): Extracciones de la frontera, incluidas las obsoletas.
+        extracciones_obsoletas (int): Extracciones descartadas porque la ciudad ya estaba
+            expandida (entradas viejas del heap que quedaron tras mejorar una distancia).
+        frontera_maxima (int): Mayor tamaño que alcanzó la frontera.
+        memoria_ruta_bytes (int): Pico de memoria de las estructuras que permiten reconstruir
+            la ruta (predecesores, distancias, pila del recorrido).
+        nanosegundos (int): Duración total de la búsqueda.
+        asentados_adelante (int): En búsquedas bidireccionales, ciudades asentadas desde el origen.
+        asentados_atras (int): En búsquedas bidireccionales, ciudades asentadas desde el destino.
+        desde_cache (bool): True si el resultado se tomó de la caché de rutas sin buscar.
+    """
+
+    def __init__(self, algoritmo=""):
+        """
+        Crea un juego de contadores en cero.
+
+        Args:
+            algoritmo (str, optional): Nombre del método de búsqueda.
+        """
+        self.algoritmo = algoritmo
+        self.expandidos = 0
+        self.inserciones = 0
+        self.extracciones = 0
+        self.extracciones_obsoletas = 0
+        self.frontera_maxima = 0
+        self.memoria_ruta_bytes = 0
+        self.nanosegundos = 0
+        self.asentados_adelante = 0
+        self.asentados_atras = 0
+        self.desde_cache = False
+
+    def registrar_memoria(self, *estructuras):
+        """
+        Actualiza el pico de memoria con el tamaño actual de las estructuras de la ruta.
+
+        Args:
+            *estructuras: Arreglos, listas o diccionarios usados para reconstruir la ruta.
+        """
+        memoria = sum(sys.getsizeof(estructura) for estructura in estructuras)
+        if memoria > self.memoria_ruta_bytes:
+            self.memoria_ruta_bytes = memoria
+
+    def como_diccionario(self):
+        """
+        Convierte las estadísticas en un diccionario, por ejemplo para guardarlas en JSON.
+
+        Returns:
+            dict: Un elemento por atributo.
+        """
+        return dict(vars(self))
+
+    def resumen(self):
+        """
+        Genera las líneas de texto que se muestran en el panel de información de la ruta.
+
+        Returns:
+            list: Líneas "Etiqueta: valor" con los contadores de la búsqueda.
+        """
+        if self.desde_cache:
+            return ["Resultado tomado de la caché de rutas (sin búsqueda)"]
+
+        lineas = [
+            f"Ciudades expandidas: {self.expandidos}",
+            f"Inserciones en la frontera: {self.inserciones}",
+            f"Extracciones: {self.extracciones} ({self.extracciones_obsoletas} obsoletas)",
+            f"Tamaño máximo de la frontera: {self.frontera_maxima}",
+            f"Memoria para la ruta: {self.memoria_ruta_bytes / 1024:.1f} KB",
+            f"Tiempo: {self.nanosegundos / 1e6:.3f} ms",
+        ]
+        if self.asentados_adelante or self.asentados_atras:
+            lineas.append(f"Ciudades asentadas desde el origen: {self.asentados_adelante}")
+            lineas.append(f"Ciudades asentadas desde el destino: {self.asentados_atras}")
+        return lineas
+
+
+def medir_busqueda(metodo):
+    """
+    Decorador para los métodos de búsqueda de GrafoEcuador.
+
+    Args:
+        metodo (callable): Método con firma (self, origen, destino) -> (ruta, distancia).
+
+    Returns:
+        callable: Método que antes de buscar deja un EstadisticasBusqueda nuevo en
+        self.ultimas_estadisticas (para que el método lo complete con sus contadores) y al
+        terminar registra la duración total en nanosegundos.
+
+    Si una búsqueda llama a otra (por ejemplo, A* sin coordenadas recurre a Dijkstra), la
+    llamada interna completa las mismas estadísticas en lugar de crear otras.
+    """
+    @functools.wraps(metodo)
+    def envoltura(self, origen, destino):
+        if getattr(self, "_midiendo", False):
+            return metodo(self, origen, destino)
+
+        estadisticas = EstadisticasBusqueda(metodo.__name__)
+        self.ultimas_estadisticas = estadisticas
+        self._midiendo = True
+        inicio = time.perf_counter_ns()
+        try:
+            return metodo(self, origen, destino)
+        finally:
+            estadisticas.nanosegundos = time.perf_counter_ns() - inicio
+            self._midiendo = False
+
+    return envoltura
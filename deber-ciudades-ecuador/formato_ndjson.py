@@ -0,0 +1,94 @@
+# Importación de json para codificar y decodificar cada línea del archivo
+# Se utiliza línea por línea, nunca con el documento completo en memoria
+import json
+
+# Importación de os para reconocer el formato por la extensión del archivo
+import os
+
+
+# Extensiones de archivo que se leen y escriben en formato NDJSON (un objeto JSON por línea)
+EXTENSIONES_NDJSON = (".ndjson", ".jsonl")
+
+
+def es_ndjson(ruta_archivo):
+    """
+    Indica si un archivo usa el formato NDJSON según su extensión.
+
+    Args:
+        ruta_archivo (str): Ruta del archivo.
+
+    Returns:
+        bool: True si la extensión es .ndjson o .jsonl.
+    """
+    return os.path.splitext(ruta_archivo)[1].lower() in EXTENSIONES_NDJSON
+
+
+def escribir_ndjson(ruta_archivo, ciudades, rutas, solo_coordenadas=()):
+    """
+    Escribe un grafo en formato NDJSON, una ciudad o una ruta por línea.
+
+    Args:
+        ruta_archivo (str): Ruta del archivo de salida.
+        ciudades (iterable): Tuplas (nombre, latitud, longitud); las coordenadas pueden ser None.
+        rutas (iterable): Tuplas (origen, destino, distancia), una por sentido de la
+            conexión, igual que en el diccionario {ciudad: {vecino: distancia}}.
+        solo_coordenadas (iterable, optional): Tuplas (nombre, latitud, longitud) de ciudades
+            que tienen coordenadas pero no forman parte del grafo.
+
+    Returns:
+        tuple: (ciudades, rutas) escritas, sin contar las de solo_coordenadas.
+
+    Formato de cada línea:
+        {"tipo": "ciudad", "nombre": "Quito", "lat": -0.1807, "lng": -78.4678}
+        {"tipo": "coordenadas", "nombre": "San Lorenzo", "lat": 1.2864, "lng": -78.8353}
+        {"tipo": "ruta", "origen": "Quito", "destino": "Aloag", "distancia": 30}
+
+    Las ciudades (y después las de solo_coordenadas) se escriben antes que las rutas. Como ciudades y rutas pueden ser
+    generadores, nunca se arma el grafo completo en memoria.
+    """
+    total_ciudades = total_rutas = 0
+    with open(ruta_archivo, 'w', encoding='utf-8') as f:
+        for nombre, latitud, longitud in ciudades:
+            registro = {"tipo": "ciudad", "nombre": nombre, "lat": latitud, "lng": longitud}
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            total_ciudades += 1
+        for nombre, latitud, longitud in solo_coordenadas:
+            registro = {"tipo": "coordenadas", "nombre": nombre, "lat": latitud, "lng": longitud}
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        for origen, destino, distancia in rutas:
+            registro = {"tipo": "ruta", "origen": origen, "destino": destino, "distancia": distancia}
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            total_rutas += 1
+    return total_ciudades, total_rutas
+
+
+def leer_ndjson(ruta_archivo):
+    """
+    Lee un archivo NDJSON de a una línea.
+
+    Args:
+        ruta_archivo (str): Ruta del archivo a leer.
+
+    Yields:
+        tuple: ("ciudad", nombre, latitud, longitud), ("coordenadas", nombre, latitud, longitud)
+        o ("ruta", origen, destino, distancia), en el orden del archivo. Las líneas vacías
+        se omiten.
+
+    Raises:
+        ValueError: Si una línea no es JSON válido o tiene un tipo desconocido; el mensaje
+        indica el número de línea.
+    """
+    with open(ruta_archivo, 'r', encoding='utf-8') as f:
+        for numero, linea in enumerate(f, start=1):
+            if not linea.strip():
+                continue
+            try:
+                registro = json.loads(linea)
+                if registro["tipo"] in ("ciudad", "coordenadas"):
+                    yield registro["tipo"], registro["nombre"], registro.get("lat"), registro.get("lng")
+                elif registro["tipo"] == "ruta":
+                    yield "ruta", registro["origen"], registro["destino"], registro["distancia"]
+                else:
+                    raise ValueError(f"tipo desconocido {registro['tipo']!r}")
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{ruta_archivo}, línea {numero}: {e}") from e
@@ -0,0 +1,262 @@
+# Importación de array para almacenar la adyacencia en arreglos compactos
+# Se utiliza para guardar desplazamientos, destinos y pesos sin objetos por arista
+from array import array
+
+
+class GrafoCompacto:
+    """
+    Representación compacta del grafo de ciudades en formato CSR (Compressed Sparse Row).
+
+    Cada ciudad recibe un identificador entero consecutivo y la adyacencia se guarda en
+    tres arreglos planos:
+    - offsets: para la ciudad i, sus aristas ocupan las posiciones offsets[i]..offsets[i+1]-1
+    - destinos: identificador de la ciudad destino de cada arista
+    - pesos: distancia en kilómetros de cada arista
+
+    Además mantiene la tabla de traducción nombre <-> identificador, de modo que los
+    algoritmos de búsqueda trabajan solo con enteros y las rutas se traducen a nombres
+    únicamente al final.
+    """
+
+    def __init__(self, grafo_dict):
+        """
+        Construye la representación compacta a partir de un grafo en forma de diccionario.
+
+        Args:
+            grafo_dict (dict): Diccionario {ciudad: {vecino: distancia}} como el que usa GrafoEcuador.
+
+        Las ciudades que solo aparecen como destino también reciben identificador (con una
+        fila vacía), y el orden de los vecinos de cada ciudad se conserva tal como está en
+        el diccionario para que los recorridos den los mismos resultados.
+        """
+        # Tabla de nombres: primero las ciudades con fila propia, luego las que solo son destino
+        self.nombres = list(grafo_dict.keys())
+        self.indices = {nombre: i for i, nombre in enumerate(self.nombres)}
+        for destinos in grafo_dict.values():
+            for destino in destinos:
+                if destino not in self.indices:
+                    self.indices[destino] = len(self.nombres)
+                    self.nombres.append(destino)
+
+        # Los pesos se guardan como enteros si todas las distancias lo son, para que las
+        # distancias devueltas por las búsquedas conserven el mismo tipo que el grafo original
+        enteros = all(isinstance(d, int) for destinos in grafo_dict.values() for d in destinos.values())
+        self.tipo_pesos = 'q' if enteros else 'd'
+
+        self.offsets = array('q', [0])
+        self.destinos = array('q')
+        self.pesos = array(self.tipo_pesos)
+
+        for nombre in self.nombres:
+            for destino, distancia in grafo_dict.get(nombre, {}).items():
+                self.destinos.append(self.indices[destino])
+                self.pesos.append(distancia)
+            self.offsets.append(len(self.destinos))
+
+        self._inversa = None
+
+    @classmethod
+    def desde_arreglos(cls, nombres, offsets, destinos, pesos, tipo_pesos):
+        """
+        Construye la representación compacta directamente a partir de arreglos CSR ya armados.
+
+        Args:
+            nombres (list): Nombres de las ciudades ordenados por identificador.
+            offsets (array): Desplazamientos de cada ciudad (longitud len(nombres) + 1).
+            destinos (array): Identificador del destino de cada arista.
+            pesos (array): Distancia de cada arista.
+            tipo_pesos (str): Código de tipo de los pesos ('q' enteros, 'd' reales).
+
+        Returns:
+            GrafoCompacto: Nueva representación que usa los arreglos recibidos sin copiarlos.
+        """
+        compacto = cls.__new__(cls)
+        compacto.nombres = nombres
+        compacto.indices = dict(zip(nombres, range(len(nombres))))
+        compacto.tipo_pesos = tipo_pesos
+        compacto.offsets = offsets
+        compacto.destinos = destinos
+        compacto.pesos = pesos
+        compacto._inversa = None
+        return compacto
+
+    def a_diccionario(self):
+        """
+        Arma el diccionario {ciudad: {vecino: distancia}} equivalente a esta representación.
+
+        Returns:
+            dict: Una entrada por ciudad (también las que no tienen aristas), con los vecinos
+            en el mismo orden que en los arreglos CSR.
+        """
+        nombres, offsets, destinos, pesos = self.nombres, self.offsets, self.destinos, self.pesos
+        return {nombre: {nombres[destinos[k]]: pesos[k] for k in range(offsets[i], offsets[i + 1])}
+                for i, nombre in enumerate(nombres)}
+
+    @property
+    def inversa(self):
+        """
+        Grafo con todas las aristas invertidas (destino -> origen) y los mismos identificadores.
+
+        Returns:
+            GrafoCompacto: Representación compacta del grafo transpuesto, construida la primera
+            vez que se necesita. La usan las búsquedas que avanzan desde el destino hacia atrás.
+        """
+        if self._inversa is None:
+            n = self.num_nodos
+
+            # Conteo de aristas entrantes por ciudad para armar los desplazamientos
+            offsets = array('q', [0]) * (n + 1)
+            for destino in self.destinos:
+                offsets[destino + 1] += 1
+            for i in range(n):
+                offsets[i + 1] += offsets[i]
+
+            # Ubicar cada arista invertida en la fila de su destino
+            siguiente = array('q', offsets[:n])
+            destinos = array('q', [0]) * self.num_aristas
+            pesos = array(self.tipo_pesos, [0]) * self.num_aristas
+            for origen in range(n):
+                for k in range(self.offsets[origen], self.offsets[origen + 1]):
+                    destino = self.destinos[k]
+                    posicion = siguiente[destino]
+                    destinos[posicion] = origen
+                    pesos[posicion] = self.pesos[k]
+                    siguiente[destino] = posicion + 1
+
+            self._inversa = GrafoCompacto.desde_arreglos(self.nombres, offsets, destinos, pesos, self.tipo_pesos)
+            self._inversa.indices = self.indices
+        return self._inversa
+
+    @property
+    def num_nodos(self):
+        """
+        Número de ciudades de la representación compacta.
+
+        Returns:
+            int: Cantidad de identificadores asignados.
+        """
+        return len(self.nombres)
+
+    @property
+    def num_aristas(self):
+        """
+        Número de aristas dirigidas almacenadas.
+
+        Returns:
+            int: Cantidad de entradas en los arreglos de destinos y pesos.
+        """
+        return len(self.destinos)
+
+    def indice(self, nombre):
+        """
+        Obtiene el identificador entero de una ciudad.
+
+        Args:
+            nombre (str): Nombre de la ciudad.
+
+        Returns:
+            int or None: Identificador de la ciudad, None si no existe.
+        """
+        return self.indices.get(nombre)
+
+    def traducir_ruta(self, ruta_ids):
+        """
+        Convierte una ruta de identificadores en una ruta de nombres de ciudades.
+
+        Args:
+            ruta_ids (list): Lista de identificadores enteros.
+
+        Returns:
+            list: Lista con los nombres de las ciudades en el mismo orden.
+        """
+        nombres = self.nombres
+        return [nombres[i] for i in ruta_ids]
+
+    def arreglo_predecesores(self):
+        """
+        Crea el mapa de predecesores de una búsqueda como un arreglo compacto.
+
+        Returns:
+            array: Arreglo de enteros de 32 bits con una posición por ciudad, inicializado
+            en -1 (ciudad aún no alcanzada). El origen de la búsqueda se marca como su propio
+            predecesor.
+        """
+        return array('i', [-1]) * self.num_nodos
+
+    def arreglo_distancias(self):
+        """
+        Crea el arreglo de distancias acumuladas de una búsqueda.
+
+        Returns:
+            array: Arreglo del mismo tipo que los pesos con una posición por ciudad,
+            inicializado en -1 (distancia aún desconocida; las distancias reales nunca son negativas).
+        """
+        return array(self.tipo_pesos, [-1]) * self.num_nodos
+
+    def reconstruir_ruta(self, predecesores, destino):
+        """
+        Reconstruye la ruta hasta un destino siguiendo un mapa de predecesores.
+
+        Args:
+            predecesores (array): Arreglo creado con arreglo_predecesores(), donde el origen
+                de la búsqueda es su propio predecesor.
+            destino (int): Identificador de la ciudad donde termina la ruta.
+
+        Returns:
+            list: Nombres de las ciudades desde el origen hasta el destino.
+        """
+        nombres = self.nombres
+        ruta = [nombres[destino]]
+        actual = destino
+        while predecesores[actual] != actual:
+            actual = predecesores[actual]
+            ruta.append(nombres[actual])
+        ruta.reverse()
+        return ruta
+
+    def posicion_arista(self, origen, destino):
+        """
+        Busca la posición de la arista origen->destino dentro de los arreglos CSR.
+
+        Args:
+            origen (int): Identificador de la ciudad de origen.
+            destino (int): Identificador de la ciudad de destino.
+
+        Returns:
+            int or None: Posición de la arista en destinos/pesos, None si no existe.
+        """
+        for k in range(self.offsets[origen], self.offsets[origen + 1]):
+            if self.destinos[k] == destino:
+                return k
+        return None
+
+    def actualizar_peso(self, origen, destino, distancia):
+        """
+        Actualiza en el mismo lugar la distancia de una arista que ya existe.
+
+        Args:
+            origen (str): Nombre de la ciudad de origen.
+            destino (str): Nombre de la ciudad de destino.
+            distancia (float): Nueva distancia en kilómetros.
+
+        Returns:
+            bool: True si la arista existía y se actualizó, False si el cambio es estructural
+            (ciudad o arista nueva, o distancia no entera en un arreglo de enteros) y la
+            representación debe reconstruirse.
+        """
+        i = self.indices.get(origen)
+        j = self.indices.get(destino)
+        if i is None or j is None:
+            return False
+
+        if self.tipo_pesos == 'q' and not isinstance(distancia, int):
+            return False
+
+        k = self.posicion_arista(i, j)
+        if k is None:
+            return False
+
+        self.pesos[k] = distancia
+        if self._inversa is not None:
+            self._inversa.pesos[self._inversa.posicion_arista(j, i)] = distancia
+        return True
@@ -2,6 +2,10 @@
 # Se utiliza para cargar y guardar el grafo en formato JSON
 import json
 
+# Importación del lector y escritor NDJSON
+# Se utiliza para cargar y guardar grafos grandes de a una ciudad o ruta por línea
+from formato_ndjson import es_ndjson, escribir_ndjson, leer_ndjson
+
 # Importación de heapq para implementar colas de prioridad
 # Se utiliza en los algoritmos de búsqueda de rutas más cortas
 import heapq
@@ -14,6 +18,14 @@ import math
 # Se utiliza en los algoritmos de búsqueda en amplitud
 from collections import deque
 
+# Importación de array para las estructuras auxiliares de las búsquedas
+# Se utiliza para la pila de la búsqueda en profundidad sin crear una tupla por marco
+from array import array
+
+# Importación de numpy para operar con los arreglos de heurística
+# Se utiliza para reemplazar las distancias desconocidas (NaN) de la heurística
+import numpy as np
+
 # Importación de matplotlib.pyplot para visualización de gráficos
 # Se utiliza para dibujar el grafo y las rutas
 import matplotlib.pyplot as plt
@@ -26,6 +38,52 @@ import networkx as nx
 # Se utiliza para personalizar la visualización del grafo
 from matplotlib.colors import to_rgba
 
+# Importación de la representación compacta (CSR) del grafo
+# Se utiliza para que los algoritmos de búsqueda trabajen con identificadores enteros
+from grafo_compacto import GrafoCompacto
+
+# Importación del almacén de coordenadas precalculadas
+# Se utiliza para calcular la heurística de línea recta de forma vectorizada
+from almacen_coordenadas import AlmacenCoordenadas
+
+# Importación de la matriz de distancias entre todos los pares de ciudades
+# Se utiliza para responder consultas repetidas sin ejecutar una búsqueda
+from todos_los_pares import MatrizTodosLosPares
+
+# Importación de la jerarquía de contracción
+# Se utiliza para consultas de ruta más corta con preprocesamiento
+from jerarquia_contraccion import JerarquiaContraccion
+
+# Importación de la heurística de landmarks (ALT)
+# Se utiliza para una búsqueda A* con cotas basadas en distancias por carretera
+from heuristica_alt import LandmarksALT, NUM_LANDMARKS
+
+# Importación de las estadísticas de búsqueda
+# Se utiliza para registrar expansiones, operaciones de la frontera, memoria y tiempo de cada búsqueda
+from estadisticas_busqueda import EstadisticasBusqueda, medir_busqueda
+
+# Importación de la caché de rutas
+# Se utiliza para no repetir búsquedas ya resueltas mientras el grafo no cambie
+from cache_rutas import CacheRutas
+
+# Importación del formato binario de instantánea
+# Se utiliza para abrir grafos grandes con mapeo de memoria, sin leer JSON ni consultar SQLite
+from instantanea_grafo import guardar_instantanea, cargar_instantanea
+
+# Importación del índice espacial de cuadrícula
+# Se utiliza para encontrar la ciudad bajo el cursor sin recorrer todas las ciudades
+from indice_espacial import IndiceEspacial
+
+# Bordes aproximados de Ecuador (longitud, latitud) para el fondo del mapa real
+BORDE_ECUADOR = [
+    (-81.0, 1.5),  # Esquina noroeste
+    (-75.0, 1.5),  # Esquina noreste
+    (-75.0, -5.0),  # Esquina sureste
+    (-81.0, -5.0),  # Esquina suroeste
+    (-81.0, 1.5)    # Cerrar el polígono
+]
+
+
 class GrafoEcuador:
     """
     Clase que representa el grafo de ciudades del Ecuador y sus conexiones.
@@ -36,6 +94,19 @@ class GrafoEcuador:
     - Implementar algoritmos de búsqueda de rutas
     - Visualizar el grafo y las rutas encontradas
     """
+    
+    # Algoritmos de búsqueda disponibles: nombre mostrado en la interfaz -> método de la clase
+    ALGORITMOS = {
+        "Búsqueda en Amplitud": "busqueda_amplitud",
+        "Búsqueda en Profundidad": "busqueda_profundidad",
+        "Búsqueda de Costo Uniforme": "busqueda_costo_uniforme",
+        "Búsqueda A*": "busqueda_a_estrella",
+        "Dijkstra Bidireccional": "busqueda_dijkstra_bidireccional",
+        "A* Bidireccional": "busqueda_a_estrella_bidireccional",
+        "A* con Landmarks (ALT)": "busqueda_alt",
+        "Jerarquías de Contracción": "busqueda_jerarquia_contraccion",
+    }
+    
     def __init__(self, grafo_json=None):
         """
         Constructor de la clase GrafoEcuador.
@@ -43,10 +114,21 @@ class GrafoEcuador:
         Args:
             grafo_json (str or dict, optional): Ruta a un archivo JSON o diccionario con el grafo.
                 Si es None, se carga el grafo por defecto con las principales ciudades del Ecuador.
+                Los archivos .ndjson o .jsonl se leen línea por línea (ver cargar_registros).
         
         Inicializa el grafo con las coordenadas por defecto de las ciudades del Ecuador
         y carga el grafo desde el archivo JSON si se proporciona.
         """
+        # Versión del grafo: aumenta con cada cambio de ciudades, conexiones o coordenadas,
+        # de modo que la caché de rutas nunca devuelva un resultado calculado antes del cambio
+        self.version = 0
+        # Último cambio del registro de la base de datos incluido en la instantánea de la que
+        # se abrió el grafo (ver desde_instantanea); None si no se abrió de una instantánea
+        self.seq_instantanea = None
+        self.cache_rutas = CacheRutas()
+        # Posiciones del dibujo y su índice espacial por modo pedido (ver _dibujo)
+        self._posiciones = {}
+        
         # Coordenadas por defecto de ciudades del Ecuador (latitud, longitud)
         self.coordenadas = {
             "Ambato": (-1.2391, -78.6273),
@@ -101,6 +183,14 @@ class GrafoEcuador:
                                    if datos["lat"] is not None and datos["lng"] is not None}
             else:
                 self.grafo = grafo_json
+        elif es_ndjson(grafo_json):
+            self.grafo = {}
+            self.coordenadas = {}
+            try:
+                self.cargar_registros(leer_ndjson(grafo_json))
+            except (OSError, ValueError) as e:
+                print(f"Error al cargar el grafo desde NDJSON: {e}")
+                self.grafo = {}
         else:
             try:
                 with open(grafo_json, 'r', encoding='utf-8') as f:
@@ -119,6 +209,143 @@ class GrafoEcuador:
         
         # Lista de ciudades en el grafo
         self.ciudades = list(self.grafo.keys())
+        
+        # Estadísticas de la última búsqueda (ver EstadisticasBusqueda)
+        self.ultimas_estadisticas = EstadisticasBusqueda()
+        
+        # Función opcional observador(ciudad, distancia, tamaño_frontera) que las búsquedas
+        # llaman cada vez que expanden una ciudad, por ejemplo para enviar eventos a un perfilador
+        self.observador = None
+    
+    @property
+    def grafo(self):
+        """
+        Diccionario {ciudad: {vecino: distancia}} con las conexiones del grafo.
+        
+        Returns:
+            dict: El grafo en forma de diccionario de diccionarios. Si el grafo se abrió
+            desde una instantánea, el diccionario se arma la primera vez que se pide.
+        """
+        if self._grafo is None:
+            self._grafo = self._compacto.a_diccionario()
+        return self._grafo
+    
+    @grafo.setter
+    def grafo(self, valor):
+        """
+        Reemplaza el grafo completo e invalida la representación compacta derivada.
+        
+        Args:
+            valor (dict): Nuevo diccionario {ciudad: {vecino: distancia}}.
+        """
+        self._grafo = valor
+        self._invalidar_compacto()
+    
+    @property
+    def coordenadas(self):
+        """
+        Diccionario {ciudad: (latitud, longitud)} con las coordenadas geográficas de las ciudades.
+        
+        Returns:
+            dict: Coordenadas en grados decimales. Si el grafo se abrió desde una
+            instantánea, el diccionario se arma la primera vez que se pide.
+        """
+        if self._coordenadas is None:
+            nombres, latitudes, longitudes = self._coordenadas_instantanea
+            self._coordenadas = {nombre: (lat, lon)
+                                 for nombre, lat, lon in zip(nombres, latitudes.tolist(), longitudes.tolist())
+                                 if not (math.isnan(lat) or math.isnan(lon))}
+            self._coordenadas_instantanea = None
+        return self._coordenadas
+    
+    @coordenadas.setter
+    def coordenadas(self, valor):
+        """
+        Reemplaza todas las coordenadas e invalida el almacén de coordenadas precalculadas.
+        
+        Args:
+            valor (dict): Nuevo diccionario {ciudad: (latitud, longitud)}.
+        """
+        self._coordenadas = valor
+        self._invalidar_coordenadas()
+    
+    def _invalidar_coordenadas(self):
+        """
+        Descarta el almacén de coordenadas precalculadas y el factor de la heurística consistente.
+        
+        Se llama cuando cambian las coordenadas de alguna ciudad o la estructura del grafo,
+        por lo que también avanza la versión del grafo.
+        """
+        self._almacen = None
+        self._factor_potencial = None
+        self.version += 1
+    
+    @property
+    def almacen_coordenadas(self):
+        """
+        Coordenadas en radianes y cosenos de latitud precalculados, alineados con los
+        identificadores de la representación compacta.
+        
+        Returns:
+            AlmacenCoordenadas: Almacén construido la primera vez que se necesita y reutilizado
+            mientras no cambien las coordenadas ni la estructura del grafo.
+        """
+        if self._almacen is None:
+            self._almacen = AlmacenCoordenadas(self.compacto.nombres, self.coordenadas)
+        return self._almacen
+    
+    @property
+    def compacto(self):
+        """
+        Representación compacta (CSR) del grafo usada por los algoritmos de búsqueda.
+        
+        Returns:
+            GrafoCompacto: Adyacencia indexada por enteros, construida la primera vez que
+            se necesita y reutilizada mientras el grafo no cambie de estructura.
+        """
+        if self._compacto is None:
+            self._compacto = GrafoCompacto(self._grafo)
+        return self._compacto
+    
+    def _invalidar_compacto(self):
+        """
+        Descarta la representación compacta para que se reconstruya en la siguiente búsqueda.
+        
+        Se llama cuando cambia la estructura del grafo (ciudades o aristas nuevas o eliminadas).
+        El almacén de coordenadas, la matriz de todos los pares, la jerarquía de
+        contracción y los landmarks también se descartan porque dependen de los identificadores.
+        """
+        if self._grafo is None:
+            # Grafo abierto desde una instantánea: la representación compacta es la única
+            # copia de las aristas, así que se arma el diccionario antes de descartarla
+            self._grafo = self._compacto.a_diccionario()
+        self._compacto = None
+        self._invalidar_coordenadas()
+        self._todos_los_pares = None
+        self._jerarquia = None
+        self._landmarks = None
+    
+    def _sincronizar_peso(self, origen, destino, distancia):
+        """
+        Refleja en la representación compacta el cambio de distancia de una arista.
+        
+        Args:
+            origen (str): Nombre de la ciudad de origen.
+            destino (str): Nombre de la ciudad de destino.
+            distancia (float): Distancia en kilómetros de la arista.
+            
+        Si la arista ya existía se actualiza su peso en el mismo lugar; si es una arista
+        o ciudad nueva, la representación compacta se invalida. En ambos casos la matriz
+        de todos los pares, la jerarquía de contracción, los landmarks y el factor de la
+        heurística consistente dejan de ser válidos, y la versión del grafo avanza.
+        """
+        self.version += 1
+        self._todos_los_pares = None
+        self._jerarquia = None
+        self._landmarks = None
+        self._factor_potencial = None
+        if self._compacto is not None and not self._compacto.actualizar_peso(origen, destino, distancia):
+            self._invalidar_compacto()
     
     def cargar_grafo_completo(self):
         """
@@ -181,8 +408,23 @@ class GrafoEcuador:
             ruta_archivo (str): Ruta del archivo donde se guardará el grafo.
             
         El archivo JSON contendrá tanto el grafo como las coordenadas de las ciudades,
-        permitiendo su posterior carga y reconstrucción.
+        permitiendo su posterior carga y reconstrucción. Si la ruta termina en .ndjson o
+        .jsonl, se escribe una ciudad o conexión por línea sin armar el documento completo;
+        las ciudades que tienen coordenadas pero no están en el grafo se marcan como
+        registros "coordenadas", para que cargar_registros no las agregue como nodos.
         """
+        if es_ndjson(ruta_archivo):
+            escribir_ndjson(
+                ruta_archivo,
+                ((ciudad, *self.coordenadas.get(ciudad, (None, None))) for ciudad in self.grafo),
+                ((origen, destino, distancia)
+                 for origen, vecinos in self.grafo.items() for destino, distancia in vecinos.items()),
+                solo_coordenadas=((ciudad, lat, lng) for ciudad, (lat, lng) in self.coordenadas.items()
+                                  if ciudad not in self.grafo)
+            )
+            print(f"Grafo guardado en {ruta_archivo}")
+            return
+        
         datos = {
             "grafo": self.grafo,
             "coords": {ciudad: {"lat": lat, "lng": lng} for ciudad, (lat, lng) in self.coordenadas.items()}
@@ -192,6 +434,108 @@ class GrafoEcuador:
             json.dump(datos, f, ensure_ascii=False, indent=2)
         print(f"Grafo guardado en {ruta_archivo}")
     
+    def contiene_ciudad(self, nombre):
+        """
+        Indica si una ciudad tiene fila propia en el grafo (es decir, si es una clave del diccionario).
+        
+        Args:
+            nombre (str): Nombre de la ciudad.
+            
+        Returns:
+            bool: True si la ciudad está en el grafo.
+            
+        Si el grafo se abrió desde una instantánea y el diccionario todavía no se armó, se
+        responde con la tabla de nombres de la representación compacta, sin armarlo.
+        """
+        if self._grafo is None:
+            return self._compacto.indice(nombre) is not None
+        return nombre in self._grafo
+    
+    @classmethod
+    def desde_instantanea(cls, ruta_archivo):
+        """
+        Abre un grafo guardado con guardar_instantanea.
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo de instantánea.
+            
+        Returns:
+            GrafoEcuador: Grafo listo para buscar rutas.
+            
+        Raises:
+            ValueError: Si el archivo no es una instantánea o es de otra versión del formato.
+            
+        La adyacencia CSR y las coordenadas se usan directamente sobre el archivo mapeado en
+        memoria (ver instantanea_grafo.cargar_instantanea); solo se decodifica la tabla de
+        nombres. Las búsquedas trabajan con la representación compacta y el almacén de
+        coordenadas, y los diccionarios del grafo y de las coordenadas se arman recién
+        cuando algo los pide (por ejemplo, al visualizar o editar).
+        
+        El número de secuencia guardado con la instantánea queda en seq_instantanea, para
+        aplicar después los cambios de la base de datos que no incluye
+        (ver BaseDatosRutas.aplicar_cambios_desde).
+        """
+        compacto, latitudes, longitudes, seq_cambios = cargar_instantanea(ruta_archivo)
+        grafo = cls({})
+        grafo._grafo = None
+        grafo._compacto = compacto
+        # Las coordenadas (NaN si la ciudad no tiene) se pasan a diccionario recién cuando se piden
+        grafo._coordenadas = None
+        grafo._coordenadas_instantanea = (compacto.nombres, latitudes, longitudes)
+        grafo._almacen = AlmacenCoordenadas.desde_grados(latitudes, longitudes)
+        grafo.ciudades = list(compacto.nombres)
+        grafo.seq_instantanea = seq_cambios
+        grafo.version += 1
+        return grafo
+    
+    def guardar_instantanea(self, ruta_archivo, seq_cambios=0):
+        """
+        Guarda el grafo en el formato binario de instantánea (ver instantanea_grafo).
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo de salida.
+            seq_cambios (int, optional): Último cambio del registro de la base de datos que
+                el grafo ya tiene; se guarda en la instantánea (ver desde_instantanea).
+            
+        Returns:
+            int: Tamaño del archivo en bytes.
+            
+        Se guarda la representación compacta tal como la usan las búsquedas, de modo que
+        desde_instantanea no necesita reconstruirla. Solo se guardan las coordenadas de las
+        ciudades que están en el grafo.
+        """
+        tamano = guardar_instantanea(ruta_archivo, self.compacto, self.coordenadas, seq_cambios)
+        print(f"Instantánea del grafo guardada en {ruta_archivo} ({tamano} bytes)")
+        return tamano
+    
+    def cargar_registros(self, registros):
+        """
+        Agrega al grafo las ciudades y conexiones de un flujo de registros.
+        
+        Args:
+            registros (iterable): Tuplas ("ciudad", nombre, latitud, longitud),
+                ("coordenadas", nombre, latitud, longitud) o ("ruta", origen, destino, distancia),
+                por ejemplo de leer_ndjson.
+                
+        Cada ruta se agrega en el sentido indicado, como en el diccionario del grafo, y
+        los registros se consumen de a uno, sin guardar el archivo en memoria. Las ciudades
+        sin coordenadas se agregan al grafo pero no a las coordenadas, y los registros
+        "coordenadas" solo agregan coordenadas, sin crear un nodo en el grafo.
+        """
+        grafo = self.grafo
+        coordenadas = self.coordenadas
+        for tipo, nombre, segundo, tercero in registros:
+            if tipo != "ruta":
+                if tipo == "ciudad":
+                    grafo.setdefault(nombre, {})
+                if segundo is not None and tercero is not None:
+                    coordenadas[nombre] = (segundo, tercero)
+            else:
+                grafo.setdefault(nombre, {})[segundo] = tercero
+                grafo.setdefault(segundo, {})
+        self.ciudades = list(grafo.keys())
+        self._invalidar_compacto()
+    
     def agregar_conexion(self, origen, destino, distancia):
         """
         Agrega una nueva conexión entre dos ciudades en el grafo.
@@ -214,6 +558,8 @@ class GrafoEcuador:
         
         self.grafo[origen][destino] = distancia
         self.grafo[destino][origen] = distancia
+        self._sincronizar_peso(origen, destino, distancia)
+        self._sincronizar_peso(destino, origen, distancia)
         
         print(f"Conexión agregada: {origen} - {destino} = {distancia} km")
     
@@ -230,14 +576,30 @@ class GrafoEcuador:
         """
         if nombre not in self.coordenadas:
             self.coordenadas[nombre] = (latitud, longitud)
+            self._invalidar_coordenadas()
             
         if nombre not in self.grafo:
             self.grafo[nombre] = {}
             self.ciudades.append(nombre)
+            self._invalidar_compacto()
             print(f"Ciudad agregada: {nombre} en ({latitud}, {longitud})")
         else:
             print(f"Ciudad {nombre} actualizada con coordenadas ({latitud}, {longitud})")
     
+    def actualizar_coordenadas(self, nombre, latitud, longitud):
+        """
+        Actualiza las coordenadas geográficas de una ciudad.
+        
+        Args:
+            nombre (str): Nombre de la ciudad.
+            latitud (float): Nueva latitud en grados decimales.
+            longitud (float): Nueva longitud en grados decimales.
+            
+        A diferencia de agregar_ciudad, sobrescribe las coordenadas si ya existían.
+        """
+        self.coordenadas[nombre] = (latitud, longitud)
+        self._invalidar_coordenadas()
+    
     def eliminar_conexion(self, origen, destino):
         """
         Elimina una conexión entre dos ciudades del grafo.
@@ -250,10 +612,12 @@ class GrafoEcuador:
         """
         if origen in self.grafo and destino in self.grafo[origen]:
             del self.grafo[origen][destino]
+            self._invalidar_compacto()
             print(f"Conexión eliminada: {origen} - {destino}")
         
         if destino in self.grafo and origen in self.grafo[destino]:
             del self.grafo[destino][origen]
+            self._invalidar_compacto()
     
     def eliminar_ciudad(self, nombre):
         """
@@ -278,11 +642,87 @@ class GrafoEcuador:
             del self.grafo[nombre]
             if nombre in self.coordenadas:
                 del self.coordenadas[nombre]
+                self._invalidar_coordenadas()
             self.ciudades.remove(nombre)
+            self._invalidar_compacto()
             print(f"Ciudad eliminada: {nombre}")
             return True
         return False
     
+    def reemplazar_grafo(self, grafo_dict, coords_dict):
+        """
+        Reemplaza el grafo y las coordenadas con los datos leídos de la base de datos.
+        
+        Args:
+            grafo_dict (dict): Grafo {ciudad: {vecino: distancia}}.
+            coords_dict (dict): Coordenadas {ciudad: {"lat": latitud, "lng": longitud}};
+                las ciudades sin coordenadas se omiten.
+        """
+        self.grafo = grafo_dict
+        self.coordenadas = {ciudad: (datos["lat"], datos["lng"])
+                            for ciudad, datos in coords_dict.items()
+                            if datos["lat"] is not None and datos["lng"] is not None}
+        self.ciudades = list(self.grafo.keys())
+    
+    def aplicar_cambios(self, cambios):
+        """
+        Aplica al grafo los cambios del registro de la base de datos.
+        
+        Args:
+            cambios (iterable): Filas (seq, tipo, operacion, origen, destino, distancia,
+                latitud, longitud) de la tabla cambios, en orden (ver
+                BaseDatosRutas.aplicar_cambios_desde).
+                
+        Returns:
+            int: Cantidad de cambios que modificaron el grafo.
+            
+        Las rutas se aplican en un solo sentido, tal como se guardan en la base de datos.
+        Los cambios que el grafo ya tiene (por ejemplo, los que hizo este mismo proceso)
+        se omiten, de modo que no avanzan la versión ni invalidan las cachés.
+        """
+        aplicados = 0
+        for _, tipo, operacion, origen, destino, distancia, latitud, longitud in cambios:
+            if tipo == "ciudad" and operacion == "eliminar":
+                if origen not in self.grafo and origen not in self.coordenadas:
+                    continue
+                for vecinos in self.grafo.values():
+                    vecinos.pop(origen, None)
+                self.grafo.pop(origen, None)
+                self.coordenadas.pop(origen, None)
+                if origen in self.ciudades:
+                    self.ciudades.remove(origen)
+                self._invalidar_compacto()
+            elif tipo == "ciudad":
+                if origen in self.grafo and self.coordenadas.get(origen) == (latitud, longitud):
+                    continue
+                if origen not in self.grafo:
+                    self.grafo[origen] = {}
+                    self.ciudades.append(origen)
+                    self._invalidar_compacto()
+                if latitud is not None and longitud is not None:
+                    self.coordenadas[origen] = (latitud, longitud)
+                    self._invalidar_coordenadas()
+                elif self.coordenadas.pop(origen, None) is not None:
+                    self._invalidar_coordenadas()
+            elif tipo == "ruta" and operacion == "eliminar":
+                if destino not in self.grafo.get(origen, {}):
+                    continue
+                del self.grafo[origen][destino]
+                self._invalidar_compacto()
+            elif tipo == "ruta":
+                if self.grafo.get(origen, {}).get(destino) == distancia:
+                    continue
+                for ciudad in (origen, destino):
+                    if ciudad not in self.grafo:
+                        self.grafo[ciudad] = {}
+                        self.ciudades.append(ciudad)
+                self.grafo[origen][destino] = distancia
+                self._sincronizar_peso(origen, destino, distancia)
+            else:
+                continue
+            aplicados += 1
+        return aplicados
+    
     def obtener_distancia(self, origen, destino):
         """
         Obtiene la distancia en kilómetros entre dos ciudades conectadas directamente.
@@ -332,6 +772,26 @@ class GrafoEcuador:
         
         return c * r
     
+    def distancias_linea_recta(self, destino):
+        """
+        Calcula en una sola operación la distancia en línea recta de todas las ciudades a un destino.
+        
+        Args:
+            destino (str): Nombre de la ciudad de destino.
+            
+        Returns:
+            numpy.ndarray or None: Distancias en kilómetros indexadas por el identificador de
+            cada ciudad en la representación compacta (self.compacto.indices). Vale NaN para
+            las ciudades sin coordenadas. Retorna None si el destino no está en el grafo.
+            
+        Es la heurística de A* para todas las ciudades a la vez: como el destino es fijo
+        durante toda la búsqueda, se calcula una vez en lugar de una vez por vecino.
+        """
+        indice = self.compacto.indice(destino)
+        if indice is None:
+            return None
+        return self.almacen_coordenadas.distancias_desde(indice)
+    
     def listar_ciudades(self):
         """
         Obtiene una lista ordenada de todas las ciudades en el grafo.
@@ -368,6 +828,7 @@ class GrafoEcuador:
             return self.grafo[ciudad]
         return {}
     
+    @medir_busqueda
     def busqueda_amplitud(self, origen, destino):
         """
         Implementa el algoritmo de búsqueda en amplitud (BFS) para encontrar una ruta entre dos ciudades.
@@ -392,29 +853,58 @@ class GrafoEcuador:
         - Garantiza encontrar el camino con menos ciudades intermedias
         - No es óptimo en términos de distancia total
         """
-        if origen not in self.grafo or destino not in self.grafo:
+        if not self.contiene_ciudad(origen) or not self.contiene_ciudad(destino):
             return None, 0
         
-        # Cola para BFS: almacena (ciudad_actual, ruta_hasta_ahora, distancia_total)
-        cola = deque([(origen, [origen], 0)])
-        visitados = set([origen])
+        # La búsqueda trabaja sobre la representación compacta con identificadores enteros
+        compacto = self.compacto
+        offsets, destinos, pesos = compacto.offsets, compacto.destinos, compacto.pesos
+        id_origen = compacto.indices[origen]
+        id_destino = compacto.indices[destino]
         
-        while cola:
-            actual, ruta, distancia = cola.popleft()
-            
-            if actual == destino:
-                return ruta, distancia
-            
-            # Explorar todos los vecinos no visitados
-            for vecino, dist in self.grafo[actual].items():
-                if vecino not in visitados:
-                    visitados.add(vecino)
-                    nueva_ruta = ruta + [vecino]
-                    nueva_distancia = distancia + dist
-                    cola.append((vecino, nueva_ruta, nueva_distancia))
+        # Cola para BFS: almacena (ciudad_actual, distancia_total)
+        # La ruta no viaja en la cola: cada ciudad guarda su predecesor y la ruta se
+        # reconstruye una sola vez al llegar al destino
+        cola = deque([(id_origen, 0)])
+        predecesores = compacto.arreglo_predecesores()  # También marca las ciudades visitadas
+        predecesores[id_origen] = id_origen
+        
+        estadisticas = self.ultimas_estadisticas
+        estadisticas.registrar_memoria(predecesores)
+        observador = self.observador
+        expandidos, inserciones, extracciones, frontera_maxima = 0, 1, 0, 1
         
-        return None, 0
+        try:
+            while cola:
+                actual, distancia = cola.popleft()
+                extracciones += 1
+                
+                if actual == id_destino:
+                    return compacto.reconstruir_ruta(predecesores, actual), distancia
+                
+                expandidos += 1
+                # Explorar todos los vecinos no visitados
+                for k in range(offsets[actual], offsets[actual + 1]):
+                    vecino = destinos[k]
+                    if predecesores[vecino] == -1:
+                        predecesores[vecino] = actual
+                        cola.append((vecino, distancia + pesos[k]))
+                        inserciones += 1
+                
+                if len(cola) > frontera_maxima:
+                    frontera_maxima = len(cola)
+                if observador is not None:
+                    observador(compacto.nombres[actual], distancia, len(cola))
+            
+            return None, 0
+        finally:
+            # En amplitud cada ciudad entra una sola vez a la cola: no hay extracciones obsoletas
+            estadisticas.expandidos = expandidos
+            estadisticas.inserciones = inserciones
+            estadisticas.extracciones = extracciones
+            estadisticas.frontera_maxima = frontera_maxima
     
+    @medir_busqueda
     def busqueda_profundidad(self, origen, destino):
         """
         Implementa el algoritmo de búsqueda en profundidad (DFS) para encontrar una ruta entre dos ciudades.
@@ -439,34 +929,78 @@ class GrafoEcuador:
         - Puede encontrar una ruta más rápidamente que BFS en algunos casos
         - Útil para explorar todos los caminos posibles
         """
-        if origen not in self.grafo or destino not in self.grafo:
+        if not self.contiene_ciudad(origen) or not self.contiene_ciudad(destino):
             return None, 0
-    
-        visitados = set()
-        ruta = []
-    
-        def dfs(actual, camino, distancia):
-            if actual == destino:
-                ruta.extend(camino)
-                return True, distancia
-            
-            visitados.add(actual)
-            
-            for vecino, dist in self.grafo[actual].items():
-                if vecino not in visitados:
-                    resultado, distancia_total = dfs(vecino, camino + [vecino], distancia + dist)
-                    if resultado:
-                        return True, distancia_total
+        
+        if origen == destino:
+            return [origen], 0
+        
+        compacto = self.compacto
+        offsets, destinos, pesos = compacto.offsets, compacto.destinos, compacto.pesos
+        id_origen = compacto.indices[origen]
+        id_destino = compacto.indices[destino]
+        
+        # Pila explícita en lugar de recursión, guardada en tres arreglos paralelos:
+        # ciudad, siguiente arista por explorar y distancia acumulada de cada marco.
+        # Los marcos de la pila forman exactamente el camino actual, así que la ruta se
+        # reconstruye a partir de ella solo cuando se alcanza el destino
+        visitados = bytearray(compacto.num_nodos)
+        visitados[id_origen] = 1
+        pila_ciudades = array('i', [id_origen])
+        pila_aristas = array('q', [offsets[id_origen]])
+        pila_distancias = array(compacto.tipo_pesos, [0])
+        
+        estadisticas = self.ultimas_estadisticas
+        estadisticas.registrar_memoria(visitados, pila_ciudades, pila_aristas, pila_distancias)
+        observador = self.observador
+        if observador is not None:
+            observador(origen, 0, 1)
+        # En profundidad cada ciudad se expande al entrar a la pila y sale una sola vez
+        inserciones, extracciones, frontera_maxima = 1, 0, 1
+        
+        try:
+            while pila_ciudades:
+                actual = pila_ciudades[-1]
+                k = pila_aristas[-1]
+                
+                # Sin aristas pendientes: retroceder
+                if k == offsets[actual + 1]:
+                    pila_ciudades.pop()
+                    pila_aristas.pop()
+                    pila_distancias.pop()
+                    extracciones += 1
+                    continue
+                
+                pila_aristas[-1] = k + 1
+                vecino = destinos[k]
+                
+                if not visitados[vecino]:
+                    nueva_distancia = pila_distancias[-1] + pesos[k]
+                    if vecino == id_destino:
+                        ruta = compacto.traducir_ruta(pila_ciudades)
+                        ruta.append(destino)
+                        return ruta, nueva_distancia
+                    
+                    visitados[vecino] = 1
+                    pila_ciudades.append(vecino)
+                    pila_aristas.append(offsets[vecino])
+                    pila_distancias.append(nueva_distancia)
+                    inserciones += 1
+                    
+                    if len(pila_ciudades) > frontera_maxima:
+                        frontera_maxima = len(pila_ciudades)
+                        estadisticas.registrar_memoria(visitados, pila_ciudades, pila_aristas, pila_distancias)
+                    if observador is not None:
+                        observador(compacto.nombres[vecino], nueva_distancia, len(pila_ciudades))
             
-            return False, 0
-    
-        resultado, distancia_total = dfs(origen, [origen], 0)
-    
-        if resultado:
-            return ruta, distancia_total
-        else:
             return None, 0
+        finally:
+            estadisticas.expandidos = inserciones
+            estadisticas.inserciones = inserciones
+            estadisticas.extracciones = extracciones
+            estadisticas.frontera_maxima = frontera_maxima
     
+    @medir_busqueda
     def busqueda_costo_uniforme(self, origen, destino):
         """
         Implementa el algoritmo de búsqueda de costo uniforme (Dijkstra) para encontrar
@@ -492,33 +1026,69 @@ class GrafoEcuador:
         - No puede manejar aristas con pesos negativos
         - Es óptimo para grafos con pesos positivos
         """
-        if origen not in self.grafo or destino not in self.grafo:
+        if not self.contiene_ciudad(origen) or not self.contiene_ciudad(destino):
             return None, 0
         
-        # Cola de prioridad para Dijkstra: almacena (distancia_acumulada, ciudad_actual, ruta)
-        cola_prioridad = [(0, origen, [origen])]
-        visitados = set()
+        # La búsqueda trabaja sobre la representación compacta con identificadores enteros
+        compacto = self.compacto
+        offsets, destinos, pesos = compacto.offsets, compacto.destinos, compacto.pesos
+        id_origen = compacto.indices[origen]
+        id_destino = compacto.indices[destino]
         
-        while cola_prioridad:
-            distancia, actual, ruta = heapq.heappop(cola_prioridad)
-            
-            if actual == destino:
-                return ruta, distancia
-            
-            if actual in visitados:
-                continue
-            
-            visitados.add(actual)
-            
-            # Explorar vecinos no visitados
-            for vecino, dist in self.grafo[actual].items():
-                if vecino not in visitados:
-                    nueva_distancia = distancia + dist
-                    nueva_ruta = ruta + [vecino]
-                    heapq.heappush(cola_prioridad, (nueva_distancia, vecino, nueva_ruta))
+        # Cola de prioridad para Dijkstra: almacena (distancia_acumulada, ciudad_actual)
+        # La ruta se reconstruye con el mapa de predecesores al llegar al destino
+        cola_prioridad = [(0, id_origen)]
+        distancias = compacto.arreglo_distancias()  # -1 indica distancia aún desconocida
+        distancias[id_origen] = 0
+        predecesores = compacto.arreglo_predecesores()
+        predecesores[id_origen] = id_origen
+        visitados = bytearray(compacto.num_nodos)
         
-        return None, 0
+        estadisticas = self.ultimas_estadisticas
+        estadisticas.registrar_memoria(distancias, predecesores, visitados)
+        observador = self.observador
+        expandidos, inserciones, extracciones, obsoletas, frontera_maxima = 0, 1, 0, 0, 1
+        
+        try:
+            while cola_prioridad:
+                distancia, actual = heapq.heappop(cola_prioridad)
+                extracciones += 1
+                
+                if actual == id_destino:
+                    return compacto.reconstruir_ruta(predecesores, actual), distancia
+                
+                if visitados[actual]:
+                    obsoletas += 1
+                    continue
+                
+                visitados[actual] = 1
+                expandidos += 1
+                
+                # Explorar vecinos no visitados, guardando solo las mejoras de distancia
+                for k in range(offsets[actual], offsets[actual + 1]):
+                    vecino = destinos[k]
+                    if not visitados[vecino]:
+                        nueva_distancia = distancia + pesos[k]
+                        if distancias[vecino] == -1 or nueva_distancia < distancias[vecino]:
+                            distancias[vecino] = nueva_distancia
+                            predecesores[vecino] = actual
+                            heapq.heappush(cola_prioridad, (nueva_distancia, vecino))
+                            inserciones += 1
+                
+                if len(cola_prioridad) > frontera_maxima:
+                    frontera_maxima = len(cola_prioridad)
+                if observador is not None:
+                    observador(compacto.nombres[actual], distancia, len(cola_prioridad))
+            
+            return None, 0
+        finally:
+            estadisticas.expandidos = expandidos
+            estadisticas.inserciones = inserciones
+            estadisticas.extracciones = extracciones
+            estadisticas.extracciones_obsoletas = obsoletas
+            estadisticas.frontera_maxima = frontera_maxima
     
+    @medir_busqueda
     def busqueda_a_estrella(self, origen, destino):
         """
         Implementa el algoritmo de búsqueda A* para encontrar la ruta más corta entre dos ciudades.
@@ -547,7 +1117,7 @@ class GrafoEcuador:
         ya que nunca sobreestima la distancia real (la distancia real siempre es mayor o igual
         a la distancia en línea recta).
         """
-        if origen not in self.grafo or destino not in self.grafo:
+        if not self.contiene_ciudad(origen) or not self.contiene_ciudad(destino):
             return None, 0
         
         # Comprobar si tenemos coordenadas para ambas ciudades
@@ -555,43 +1125,608 @@ class GrafoEcuador:
             # Si no tenemos coordenadas, caemos en Dijkstra
             return self.busqueda_costo_uniforme(origen, destino)
         
-        # Cola de prioridad para A*: almacena (f, g, ciudad_actual, ruta)
+        # Heurística precalculada para todas las ciudades (0 si no hay coordenadas).
+        # Se convierte a lista porque indexar una lista es más rápido que un arreglo de numpy
+        heuristica = self.distancias_linea_recta(destino)
+        heuristica[np.isnan(heuristica)] = 0
+        
+        return self._a_estrella_con_heuristica(origen, destino, heuristica.tolist())
+    
+    def preparar_landmarks(self, ruta_json='grafo_ecuador.json', num_landmarks=NUM_LANDMARKS, forzar=False,
+                           verificar=None):
+        """
+        Elige los landmarks de la heurística ALT y calcula (o carga desde disco) sus distancias.
+        
+        Args:
+            ruta_json (str, optional): Ruta del archivo JSON del grafo. Las distancias se guardan
+                junto a él como un archivo .npz cuyo nombre incluye la huella del contenido del grafo.
+            num_landmarks (int, optional): Cantidad de landmarks a elegir.
+            forzar (bool, optional): Si es True, recalcula aunque exista un archivo válido.
+            verificar (callable, optional): Función que se llama durante el cálculo y puede
+                interrumpirlo lanzando una excepción (ver LandmarksALT.calcular).
+            
+        Returns:
+            LandmarksALT: Landmarks y distancias precalculadas.
+        """
+        self._landmarks = LandmarksALT.obtener(self.compacto, ruta_json, num_landmarks, forzar, verificar)
+        return self._landmarks
+    
+    @medir_busqueda
+    def busqueda_alt(self, origen, destino):
+        """
+        Implementa la búsqueda A* con la heurística ALT (landmarks y desigualdad triangular).
+        
+        Args:
+            origen (str): Nombre de la ciudad de origen.
+            destino (str): Nombre de la ciudad de destino.
+            
+        Returns:
+            tuple: (ruta, distancia) donde:
+                - ruta: Lista de ciudades que forman el camino más corto desde origen hasta destino
+                - distancia: Distancia total en kilómetros del camino más corto
+                Si no se encuentra ruta, retorna (None, 0)
+                
+        La heurística de cada ciudad es el máximo entre la cota de los landmarks y la
+        distancia en línea recta. En carreteras de montaña, donde la ruta real es mucho más
+        larga que la línea recta, la cota de los landmarks es más ajustada y A* expande
+        menos ciudades. La línea recta se escala con el factor de consistencia del grafo
+        (ver AlmacenCoordenadas.factor_consistencia) para que el máximo siga siendo una
+        heurística consistente y la ruta encontrada sea siempre la más corta.
+        
+        La primera llamada calcula o carga los landmarks (ver preparar_landmarks).
+        """
+        if not self.contiene_ciudad(origen) or not self.contiene_ciudad(destino):
+            return None, 0
+        
+        if self._landmarks is None:
+            self.preparar_landmarks()
+        
+        id_destino = self.compacto.indices[destino]
+        heuristica = self._landmarks.cotas_hacia(id_destino)
+        
+        linea_recta = self.distancias_linea_recta(destino)
+        if linea_recta is not None:
+            linea_recta[np.isnan(linea_recta)] = 0
+            heuristica = np.maximum(heuristica, self._factor_heuristica() * linea_recta)
+        
+        return self._a_estrella_con_heuristica(origen, destino, heuristica.tolist())
+    
+    def _a_estrella_con_heuristica(self, origen, destino, heuristica):
+        """
+        Núcleo de A* compartido por busqueda_a_estrella y busqueda_alt.
+        
+        Args:
+            origen (str): Nombre de la ciudad de origen.
+            destino (str): Nombre de la ciudad de destino.
+            heuristica (list): Estimación de la distancia al destino para cada identificador.
+            
+        Returns:
+            tuple: (ruta, distancia), o (None, 0) si no hay ruta.
+            
+        Los contadores quedan en self.ultimas_estadisticas; la cantidad de ciudades
+        expandidas permite comparar la calidad de distintas heurísticas.
+        """
+        # Cola de prioridad para A*: almacena (f, g, ciudad_actual)
         # donde f = g + h (costo total estimado)
         # g = costo real desde el origen
-        # h = heurística (distancia en línea recta al destino)
-        cola_prioridad = [(0, 0, origen, [origen])]
-        visitados = set()
-        g_valores = {origen: 0}  # Costo real desde el origen
+        # h = heurística (estimación de la distancia al destino)
+        compacto = self.compacto
+        offsets, destinos, pesos = compacto.offsets, compacto.destinos, compacto.pesos
+        id_origen = compacto.indices[origen]
+        id_destino = compacto.indices[destino]
+        
+        cola_prioridad = [(0, 0, id_origen)]
+        visitados = bytearray(compacto.num_nodos)
+        g_valores = compacto.arreglo_distancias()  # Costo real desde el origen (-1 = desconocido)
+        g_valores[id_origen] = 0
+        predecesores = compacto.arreglo_predecesores()  # Mejor predecesor conocido de cada ciudad
+        predecesores[id_origen] = id_origen
+        
+        estadisticas = self.ultimas_estadisticas
+        estadisticas.registrar_memoria(g_valores, predecesores, visitados)
+        observador = self.observador
+        expandidos, inserciones, extracciones, obsoletas, frontera_maxima = 0, 1, 0, 0, 1
+        
+        try:
+            while cola_prioridad:
+                _, g_actual, actual = heapq.heappop(cola_prioridad)
+                extracciones += 1
+                
+                if actual == id_destino:
+                    return compacto.reconstruir_ruta(predecesores, actual), g_actual
+                
+                if visitados[actual]:
+                    obsoletas += 1
+                    continue
+                
+                visitados[actual] = 1
+                expandidos += 1
+                
+                for k in range(offsets[actual], offsets[actual + 1]):
+                    vecino = destinos[k]
+                    # Una ciudad ya expandida no se vuelve a abrir, así que su predecesor no
+                    # puede cambiar: con una heurística inconsistente la ruta reconstruida
+                    # dejaría de sumar la distancia que se retorna
+                    if visitados[vecino]:
+                        continue
+                    nuevo_g = g_actual + pesos[k]
+                    
+                    # Si ya hemos encontrado un camino mejor a este nodo, continuamos
+                    if g_valores[vecino] != -1 and g_valores[vecino] <= nuevo_g:
+                        continue
+                    
+                    g_valores[vecino] = nuevo_g
+                    predecesores[vecino] = actual
+                    f = nuevo_g + heuristica[vecino]
+                    heapq.heappush(cola_prioridad, (f, nuevo_g, vecino))
+                    inserciones += 1
+                
+                if len(cola_prioridad) > frontera_maxima:
+                    frontera_maxima = len(cola_prioridad)
+                if observador is not None:
+                    observador(compacto.nombres[actual], g_actual, len(cola_prioridad))
+            
+            return None, 0
+        finally:
+            estadisticas.expandidos = expandidos
+            estadisticas.inserciones = inserciones
+            estadisticas.extracciones = extracciones
+            estadisticas.extracciones_obsoletas = obsoletas
+            estadisticas.frontera_maxima = frontera_maxima
+    
+    @medir_busqueda
+    def busqueda_dijkstra_bidireccional(self, origen, destino):
+        """
+        Implementa el algoritmo de Dijkstra bidireccional para encontrar la ruta más corta entre dos ciudades.
+        
+        Args:
+            origen (str): Nombre de la ciudad de origen.
+            destino (str): Nombre de la ciudad de destino.
+            
+        Returns:
+            tuple: (ruta, distancia) donde:
+                - ruta: Lista de ciudades que forman el camino más corto desde origen hasta destino
+                - distancia: Distancia total en kilómetros del camino más corto
+                Si no se encuentra ruta, retorna (None, 0)
+                
+        Ejecuta dos búsquedas de costo uniforme a la vez: una hacia adelante desde el origen
+        y otra hacia atrás desde el destino (sobre el grafo invertido), y se detiene cuando
+        ambas fronteras garantizan que ningún camino puede mejorar al mejor encontrado.
+        
+        Características:
+        - Garantiza encontrar el camino más corto, igual que busqueda_costo_uniforme
+        - En rutas largas asienta aproximadamente la mitad del radio de búsqueda en cada
+          dirección, en lugar de todo el radio desde el origen
+        - Las ciudades asentadas en cada dirección quedan en self.ultimas_estadisticas
+          (asentados_adelante y asentados_atras)
+        """
+        return self._busqueda_bidireccional(origen, destino, usar_potencial=False)
+    
+    @medir_busqueda
+    def busqueda_a_estrella_bidireccional(self, origen, destino):
+        """
+        Implementa el algoritmo A* bidireccional para encontrar la ruta más corta entre dos ciudades.
+        
+        Args:
+            origen (str): Nombre de la ciudad de origen.
+            destino (str): Nombre de la ciudad de destino.
+            
+        Returns:
+            tuple: (ruta, distancia) donde:
+                - ruta: Lista de ciudades que forman el camino más corto desde origen hasta destino
+                - distancia: Distancia total en kilómetros del camino más corto
+                Si no se encuentra ruta, retorna (None, 0)
+                
+        Igual que el Dijkstra bidireccional, pero cada dirección se guía con el potencial
+        promedio p(v) = (h_destino(v) - h_origen(v)) / 2, donde h es la distancia en línea
+        recta escalada para que sea consistente (ver AlmacenCoordenadas.factor_consistencia).
+        Con este potencial ambas direcciones usan costos reducidos compatibles y la ruta
+        encontrada sigue siendo la más corta.
+        
+        Si alguna ciudad no tiene coordenadas, se usa potencial cero (Dijkstra bidireccional).
+        """
+        return self._busqueda_bidireccional(origen, destino, usar_potencial=True)
+    
+    def _potencial_bidireccional(self, id_origen, id_destino):
+        """
+        Calcula el potencial promedio consistente para la búsqueda A* bidireccional.
+        
+        Args:
+            id_origen (int): Identificador de la ciudad de origen.
+            id_destino (int): Identificador de la ciudad de destino.
+            
+        Returns:
+            list or None: Potencial de avance p(v) para cada identificador, o None si hay
+            ciudades sin coordenadas y no se puede garantizar la consistencia.
+        """
+        almacen = self.almacen_coordenadas
+        if not almacen.completo():
+            return None
+        
+        hacia_destino = almacen.distancias_desde(id_destino)
+        desde_origen = almacen.distancias_desde(id_origen)
+        return (self._factor_heuristica() * (hacia_destino - desde_origen) / 2).tolist()
+    
+    def _factor_heuristica(self):
+        """
+        Obtiene el factor que hace consistente la distancia en línea recta en este grafo.
+        
+        Returns:
+            float: Factor calculado con AlmacenCoordenadas.factor_consistencia y guardado
+            hasta que cambien las coordenadas o alguna distancia del grafo.
+        """
+        if self._factor_potencial is None:
+            self._factor_potencial = self.almacen_coordenadas.factor_consistencia(self.compacto)
+        return self._factor_potencial
+    
+    def _busqueda_bidireccional(self, origen, destino, usar_potencial):
+        """
+        Núcleo común de las búsquedas bidireccionales (Dijkstra y A*).
         
-        while cola_prioridad:
-            _, g_actual, actual, ruta = heapq.heappop(cola_prioridad)
+        Args:
+            origen (str): Nombre de la ciudad de origen.
+            destino (str): Nombre de la ciudad de destino.
+            usar_potencial (bool): Si es True, guía ambas direcciones con el potencial de línea recta.
             
-            if actual == destino:
-                return ruta, g_actual
+        Returns:
+            tuple: (ruta, distancia), o (None, 0) si no hay ruta.
             
-            if actual in visitados:
+        La dirección 0 avanza desde el origen por el grafo y la dirección 1 avanza desde el
+        destino por el grafo invertido. En cada paso se expande la dirección cuya frontera
+        tiene la menor clave, y la búsqueda termina cuando la suma de las claves mínimas de
+        ambas fronteras alcanza la longitud del mejor camino encontrado.
+        """
+        if not self.contiene_ciudad(origen) or not self.contiene_ciudad(destino):
+            return None, 0
+        
+        if origen == destino:
+            return [origen], 0
+        
+        compacto = self.compacto
+        grafos = (compacto, compacto.inversa)
+        id_origen = compacto.indices[origen]
+        id_destino = compacto.indices[destino]
+        
+        potencial = self._potencial_bidireccional(id_origen, id_destino) if usar_potencial else None
+        if potencial is None:
+            potencial = [0] * compacto.num_nodos
+        # Hacia atrás se usa el potencial opuesto, para que los costos reducidos coincidan
+        signos = (1, -1)
+        
+        distancias = (compacto.arreglo_distancias(), compacto.arreglo_distancias())
+        predecesores = (compacto.arreglo_predecesores(), compacto.arreglo_predecesores())
+        asentados = (bytearray(compacto.num_nodos), bytearray(compacto.num_nodos))
+        conteo = [0, 0]
+        
+        estadisticas = self.ultimas_estadisticas
+        estadisticas.registrar_memoria(*distancias, *predecesores, *asentados)
+        observador = self.observador
+        inserciones, extracciones, obsoletas, frontera_maxima = 2, 0, 0, 2
+        
+        distancias[0][id_origen] = 0
+        distancias[1][id_destino] = 0
+        predecesores[0][id_origen] = id_origen
+        predecesores[1][id_destino] = id_destino
+        colas = ([(potencial[id_origen], id_origen)], [(-potencial[id_destino], id_destino)])
+        
+        mejor_distancia = math.inf
+        encuentro = -1  # Ciudad donde se unen las dos mitades del mejor camino
+        
+        while colas[0] and colas[1]:
+            # Ningún camino pendiente puede mejorar al mejor encontrado
+            if colas[0][0][0] + colas[1][0][0] >= mejor_distancia:
+                break
+            
+            lado = 0 if colas[0][0][0] <= colas[1][0][0] else 1
+            _, actual = heapq.heappop(colas[lado])
+            extracciones += 1
+            if asentados[lado][actual]:
+                obsoletas += 1
                 continue
+            asentados[lado][actual] = 1
+            conteo[lado] += 1
             
-            visitados.add(actual)
+            grafo = grafos[lado]
+            propias, opuestas = distancias[lado], distancias[1 - lado]
+            signo = signos[lado]
+            distancia_actual = propias[actual]
             
-            for vecino, dist in self.grafo[actual].items():
-                nuevo_g = g_actual + dist
+            for k in range(grafo.offsets[actual], grafo.offsets[actual + 1]):
+                vecino = grafo.destinos[k]
+                nueva_distancia = distancia_actual + grafo.pesos[k]
                 
-                # Si ya hemos encontrado un camino mejor a este nodo, continuamos
-                if vecino in g_valores and g_valores[vecino] <= nuevo_g:
-                    continue
+                if propias[vecino] == -1 or nueva_distancia < propias[vecino]:
+                    propias[vecino] = nueva_distancia
+                    predecesores[lado][vecino] = actual
+                    heapq.heappush(colas[lado], (nueva_distancia + signo * potencial[vecino], vecino))
+                    inserciones += 1
                 
-                g_valores[vecino] = nuevo_g
-                # Heurística: distancia en línea recta hasta el destino
-                h = self.obtener_distancia_linea_recta(vecino, destino)
-                if h is None:
-                    h = 0  # Si no podemos calcular la heurística, usamos 0
+                # Si la otra dirección ya alcanzó al vecino, hay un camino completo
+                if opuestas[vecino] != -1 and nueva_distancia + opuestas[vecino] < mejor_distancia:
+                    mejor_distancia = nueva_distancia + opuestas[vecino]
+                    encuentro = vecino
+            
+            frontera = len(colas[0]) + len(colas[1])
+            if frontera > frontera_maxima:
+                frontera_maxima = frontera
+            if observador is not None:
+                observador(compacto.nombres[actual], distancia_actual, frontera)
+        
+        estadisticas.expandidos = conteo[0] + conteo[1]
+        estadisticas.asentados_adelante, estadisticas.asentados_atras = conteo
+        estadisticas.inserciones = inserciones
+        estadisticas.extracciones = extracciones
+        estadisticas.extracciones_obsoletas = obsoletas
+        estadisticas.frontera_maxima = frontera_maxima
+        
+        if encuentro == -1:
+            return None, 0
+        
+        # Mitad de ida desde el origen hasta el encuentro, y mitad de vuelta hasta el destino
+        ruta = compacto.reconstruir_ruta(predecesores[0], encuentro)
+        actual = encuentro
+        while actual != id_destino:
+            actual = predecesores[1][actual]
+            ruta.append(compacto.nombres[actual])
+        
+        return ruta, mejor_distancia
+    
+    def calcular_todos_los_pares(self, ruta_json='grafo_ecuador.json', procesos=None, forzar=False):
+        """
+        Calcula (o carga desde disco) las distancias más cortas entre todos los pares de ciudades.
+        
+        Args:
+            ruta_json (str, optional): Ruta del archivo JSON del grafo. La caché se guarda junto
+                a él como archivos .npy cuyo nombre incluye la huella del contenido del grafo.
+            procesos (int, optional): Número de procesos para ejecutar Dijkstra desde cada ciudad.
+                Por defecto, uno por CPU.
+            forzar (bool, optional): Si es True, recalcula aunque exista una caché válida.
+            
+        Returns:
+            MatrizTodosLosPares: Matriz de distancias y de siguiente salto, mapeada en memoria.
+            
+        Si ya existe una caché para el contenido actual del grafo se abre directamente; si
+        el grafo cambió, la huella no coincide y se recalcula con un grupo de procesos.
+        """
+        matriz = None if forzar else MatrizTodosLosPares.cargar(self.compacto, ruta_json)
+        if matriz is None:
+            matriz = MatrizTodosLosPares.calcular(self.compacto, ruta_json, procesos)
+        self._todos_los_pares = matriz
+        return matriz
+    
+    @medir_busqueda
+    def obtener_ruta(self, origen, destino):
+        """
+        Obtiene la ruta más corta entre dos ciudades usando la matriz de todos los pares.
+        
+        Args:
+            origen (str): Nombre de la ciudad de origen.
+            destino (str): Nombre de la ciudad de destino.
+            
+        Returns:
+            tuple: (ruta, distancia) igual que busqueda_costo_uniforme.
+                Si no se encuentra ruta, retorna (None, 0)
                 
-                f = nuevo_g + h
-                nueva_ruta = ruta + [vecino]
-                heapq.heappush(cola_prioridad, (f, nuevo_g, vecino, nueva_ruta))
+        La primera llamada calcula o carga la matriz (ver calcular_todos_los_pares); las
+        siguientes solo siguen la tabla de siguiente salto, con un costo proporcional a la
+        longitud de la ruta. Cualquier cambio en el grafo invalida la matriz.
+        """
+        if not self.contiene_ciudad(origen) or not self.contiene_ciudad(destino):
+            return None, 0
+        
+        if self._todos_los_pares is None:
+            self.calcular_todos_los_pares()
+        return self._todos_los_pares.obtener_ruta(origen, destino)
+    
+    def preparar_jerarquia(self, ruta_json='grafo_ecuador.json', forzar=False, verificar=None):
+        """
+        Construye (o carga desde disco) la jerarquía de contracción del grafo.
+        
+        Args:
+            ruta_json (str, optional): Ruta del archivo JSON del grafo. La jerarquía se guarda
+                junto a él como un archivo .npz cuyo nombre incluye la huella del contenido del grafo.
+            forzar (bool, optional): Si es True, reconstruye aunque exista un archivo válido.
+            verificar (callable, optional): Función que se llama durante la construcción y
+                puede interrumpirla lanzando una excepción (ver JerarquiaContraccion.construir).
+            
+        Returns:
+            JerarquiaContraccion: Jerarquía lista para consultas.
+        """
+        self._jerarquia = JerarquiaContraccion.obtener(self.compacto, ruta_json, forzar, verificar)
+        return self._jerarquia
+    
+    def preparar_algoritmo(self, algoritmo, verificar=None, ruta_json='grafo_ecuador.json'):
+        """
+        Hace la preparación que necesita un algoritmo antes de su primera búsqueda.
         
-        return None, 0
+        Args:
+            algoritmo (str): Nombre del algoritmo, una de las claves de ALGORITMOS.
+            verificar (callable, optional): Función que se llama durante la preparación y
+                puede interrumpirla lanzando una excepción (por ejemplo, Tarea.verificar).
+            ruta_json (str, optional): Ruta del archivo JSON del grafo, junto al cual se
+                guardan los landmarks y la jerarquía (ver preparar_landmarks).
+            
+        ALT necesita los landmarks y Jerarquías de Contracción la jerarquía; los demás
+        algoritmos no necesitan nada. Si ya están preparados, no se hace nada. Las búsquedas
+        los preparan solas la primera vez, pero sin forma de interrumpirlas: quien las
+        ejecuta en segundo plano llama antes a este método para poder cancelarlas.
+        """
+        metodo = self.ALGORITMOS.get(algoritmo)
+        if metodo == "busqueda_alt" and self._landmarks is None:
+            self.preparar_landmarks(ruta_json, verificar=verificar)
+        elif metodo == "busqueda_jerarquia_contraccion" and self._jerarquia is None:
+            self.preparar_jerarquia(ruta_json, verificar=verificar)
+    
+    @medir_busqueda
+    def busqueda_jerarquia_contraccion(self, origen, destino):
+        """
+        Encuentra la ruta más corta entre dos ciudades usando la jerarquía de contracción.
+        
+        Args:
+            origen (str): Nombre de la ciudad de origen.
+            destino (str): Nombre de la ciudad de destino.
+            
+        Returns:
+            tuple: (ruta, distancia) igual que busqueda_costo_uniforme.
+                Si no se encuentra ruta, retorna (None, 0)
+                
+        La primera llamada construye o carga la jerarquía (ver preparar_jerarquia); las
+        siguientes solo recorren las pocas ciudades de mayor rango alrededor del origen y
+        del destino y desempaquetan los atajos del camino encontrado. Cualquier cambio en
+        el grafo invalida la jerarquía.
+        """
+        if not self.contiene_ciudad(origen) or not self.contiene_ciudad(destino):
+            return None, 0
+        
+        if self._jerarquia is None:
+            self.preparar_jerarquia()
+        return self._jerarquia.consultar(origen, destino, self.ultimas_estadisticas, self.observador)
+    
+    def buscar_ruta(self, origen, destino, algoritmo):
+        """
+        Busca una ruta con el algoritmo indicado, reutilizando el resultado si ya se calculó.
+        
+        Args:
+            origen (str): Nombre de la ciudad de origen.
+            destino (str): Nombre de la ciudad de destino.
+            algoritmo (str): Nombre del algoritmo, una de las claves de ALGORITMOS. Un nombre
+                desconocido usa la búsqueda de costo uniforme.
+            
+        Returns:
+            tuple: (ruta, distancia) igual que el método de búsqueda correspondiente.
+            
+        Los resultados se guardan en self.cache_rutas con la clave (origen, destino, algoritmo)
+        y la versión actual del grafo. Cualquier cambio de ciudades, conexiones o coordenadas
+        aumenta la versión, por lo que un resultado anterior al cambio no se vuelve a usar.
+        Cuando la respuesta sale de la caché, ultimas_estadisticas queda con la marca
+        desde_cache y sin contadores de búsqueda.
+        """
+        clave = (origen, destino, algoritmo)
+        metodo = self.ALGORITMOS.get(algoritmo, "busqueda_costo_uniforme")
+        
+        guardado = self.cache_rutas.obtener(clave, self.version)
+        if guardado is not None:
+            ruta, distancia = guardado
+            self.ultimas_estadisticas = EstadisticasBusqueda(metodo)
+            self.ultimas_estadisticas.desde_cache = True
+            return (list(ruta) if ruta is not None else None), distancia
+        
+        version = self.version
+        ruta, distancia = getattr(self, metodo)(origen, destino)
+        # Se copia la ruta para que modificar la lista devuelta no altere la caché
+        self.cache_rutas.guardar(clave, version, list(ruta) if ruta is not None else None, distancia)
+        return ruta, distancia
+    
+    def grafo_networkx(self):
+        """
+        Construye el grafo de NetworkX equivalente, con la distancia como peso de cada arista.
+        
+        Returns:
+            networkx.Graph: Grafo no dirigido con todas las ciudades y conexiones.
+        """
+        G = nx.Graph()
+        for origen, destinos in self.grafo.items():
+            G.add_node(origen)
+            for destino, distancia in destinos.items():
+                G.add_edge(origen, destino, weight=distancia)
+        return G
+    
+    def _dibujo(self, usar_mapa_real):
+        """
+        Calcula (o reutiliza) las posiciones del dibujo y su índice espacial.
+        
+        Args:
+            usar_mapa_real (bool): Modo pedido por el usuario.
+            
+        Returns:
+            tuple: (version, mapa_real, posiciones, indice) donde mapa_real indica si se
+            usan las coordenadas geográficas: solo si se pidió el mapa real y todas las
+            ciudades tienen coordenadas; en otro caso se usa el layout automático.
+            
+        Se guardan por modo junto con la versión del grafo: el layout automático
+        (nx.spring_layout) solo se vuelve a calcular si cambian las ciudades, las
+        conexiones, las distancias (que también influyen en el layout) o las coordenadas.
+        """
+        clave = bool(usar_mapa_real)
+        guardado = self._posiciones.get(clave)
+        if guardado is None or guardado[0] != self.version:
+            if clave and all(ciudad in self.coordenadas for ciudad in self.grafo):
+                posiciones = {ciudad: (lon, lat) for ciudad, (lat, lon) in self.coordenadas.items()
+                              if ciudad in self.grafo}
+                guardado = (self.version, True, posiciones, IndiceEspacial(posiciones))
+            elif clave:
+                # Sin coordenadas para todas las ciudades se dibuja como en el modo abstracto
+                guardado = self._dibujo(False)
+            else:
+                # El layout devuelve arreglos de numpy; con floats las consultas del índice son más rápidas
+                layout = nx.spring_layout(self.grafo_networkx(), seed=42)
+                posiciones = {ciudad: (float(x), float(y)) for ciudad, (x, y) in layout.items()}
+                guardado = (self.version, False, posiciones, IndiceEspacial(posiciones))
+            self._posiciones[clave] = guardado
+        return guardado
+    
+    def usa_coordenadas_reales(self, usar_mapa_real):
+        """
+        Indica si el dibujo se hace con las coordenadas geográficas de las ciudades.
+        
+        Args:
+            usar_mapa_real (bool): Modo pedido por el usuario.
+            
+        Returns:
+            bool: True si se pidió el mapa real y todas las ciudades tienen coordenadas;
+            en otro caso el dibujo usa un layout automático.
+        """
+        return self._dibujo(usar_mapa_real)[1]
+    
+    def posiciones(self, usar_mapa_real=False):
+        """
+        Posiciones de las ciudades en el dibujo del grafo.
+        
+        Args:
+            usar_mapa_real (bool, optional): Si es True, se usan las coordenadas reales
+                (longitud, latitud) cuando todas las ciudades las tienen.
+                
+        Returns:
+            dict: Diccionario {ciudad: (x, y)}, el mismo que usa visualizar_grafo.
+        """
+        return self._dibujo(usar_mapa_real)[2]
+    
+    def ciudad_en_posicion(self, x, y, radio, usar_mapa_real=False):
+        """
+        Busca la ciudad dibujada más cerca de un punto del dibujo.
+        
+        Args:
+            x (float): Coordenada x del punto, en las unidades del dibujo.
+            y (float): Coordenada y del punto.
+            radio (float): Distancia máxima a la ciudad.
+            usar_mapa_real (bool, optional): Modo del dibujo (ver posiciones).
+            
+        Returns:
+            str or None: Nombre de la ciudad más cercana a menos de radio, o None.
+            
+        Usa el índice espacial de las posiciones (ver IndiceEspacial), de modo que no
+        recorre todas las ciudades ni recalcula el layout en cada consulta.
+        """
+        return self._dibujo(usar_mapa_real)[3].mas_cercana(x, y, radio)
+    
+    def ciudades_en_rectangulo(self, x_min, y_min, x_max, y_max, usar_mapa_real=False):
+        """
+        Busca las ciudades dibujadas dentro de un rectángulo del dibujo.
+        
+        Args:
+            x_min (float): Borde izquierdo, en las unidades del dibujo.
+            y_min (float): Borde inferior.
+            x_max (float): Borde derecho.
+            y_max (float): Borde superior.
+            usar_mapa_real (bool, optional): Modo del dibujo (ver posiciones).
+            
+        Returns:
+            list: Nombres de las ciudades dentro del rectángulo.
+            
+        Usa el mismo índice espacial que ciudad_en_posicion, de modo que el costo depende
+        de las ciudades que hay en el rectángulo y no del total.
+        """
+        return self._dibujo(usar_mapa_real)[3].en_rectangulo(x_min, y_min, x_max, y_max)
     
     def visualizar_grafo(self, ruta=None, usar_mapa_real=False, ax=None):
         """
@@ -623,35 +1758,19 @@ class GrafoEcuador:
         if ax is None:
             fig, ax = plt.subplots(figsize=(15, 10))
         
-        G = nx.Graph()
+        G = self.grafo_networkx()
         
-        # Agregar nodos y aristas al grafo
-        for origen, destinos in self.grafo.items():
-            G.add_node(origen)
-            for destino, distancia in destinos.items():
-                G.add_edge(origen, destino, weight=distancia)
+        # Posiciones de los nodos: geográficas reales o layout de spring si no tenemos
+        # coordenadas o no queremos usarlas (se reutilizan mientras el grafo no cambie)
+        pos = self.posiciones(usar_mapa_real)
         
-        if usar_mapa_real and all(ciudad in self.coordenadas for ciudad in self.grafo):
-            # Usar posiciones geográficas reales para los nodos
-            pos = {ciudad: (lon, lat) for ciudad, (lat, lon) in self.coordenadas.items()}
-            
+        if self.usa_coordenadas_reales(usar_mapa_real):
             # Fondo del mapa de Ecuador (simplificado)
             ax.set_facecolor('#e6f7ff')  # Color azul claro como fondo
             
             # Dibujar bordes aproximados de Ecuador
-            ecuador_border = [
-                (-81.0, 1.5),  # Esquina noroeste
-                (-75.0, 1.5),  # Esquina noreste
-                (-75.0, -5.0),  # Esquina sureste
-                (-81.0, -5.0),  # Esquina suroeste
-                (-81.0, 1.5)    # Cerrar el polígono
-            ]
-            lons, lats = zip(*ecuador_border)
+            lons, lats = zip(*BORDE_ECUADOR)
             ax.fill(lons, lats, alpha=0.2, color='green')
-            
-        else:
-            # Usar el layout de spring si no tenemos coordenadas o no queremos usarlas
-            pos = nx.spring_layout(G, seed=42)
         
         # Dibujar los nodos
         nodos = nx.draw_networkx_nodes(G, pos, node_size=500, node_color='lightblue', ax=ax)
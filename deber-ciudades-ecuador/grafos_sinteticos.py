@@ -0,0 +1,215 @@
+# Importación de math para calcular distancias geográficas
+# Se utiliza para asignar a cada arista una distancia coherente con sus coordenadas
+import math
+
+# Importación de random para generar grafos reproducibles
+# Se utiliza con una semilla fija para que cada ejecución produzca el mismo grafo
+import random
+
+# Importación de json y os para leer el grafo real del Ecuador que se replica a mayor escala
+import json
+import os
+
+
+# Caja geográfica aproximada del Ecuador continental (latitud, longitud)
+LATITUD_MAXIMA = 1.5
+LATITUD_MINIMA = -5.0
+LONGITUD_MINIMA = -81.0
+LONGITUD_MAXIMA = -75.0
+
+
+def distancia_haversine(lat1, lon1, lat2, lon2):
+    """
+    Calcula la distancia en kilómetros entre dos puntos con la fórmula de Haversine.
+
+    Args:
+        lat1 (float): Latitud del primer punto en grados.
+        lon1 (float): Longitud del primer punto en grados.
+        lat2 (float): Latitud del segundo punto en grados.
+        lon2 (float): Longitud del segundo punto en grados.
+
+    Returns:
+        float: Distancia en línea recta en kilómetros.
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * math.asin(math.sqrt(a)) * 6371
+
+
+def distancia_carretera(coord1, coord2, generador, desvio_maximo=0.4):
+    """
+    Genera una distancia por carretera a partir de la distancia en línea recta.
+
+    Args:
+        coord1 (tuple): (latitud, longitud) de la ciudad de origen.
+        coord2 (tuple): (latitud, longitud) de la ciudad de destino.
+        generador (random.Random): Generador aleatorio con semilla.
+        desvio_maximo (float): Recargo máximo sobre la línea recta (0.4 = hasta 40% más).
+
+    Returns:
+        int: Distancia entera en kilómetros, nunca menor que la distancia en línea recta,
+        de modo que la heurística de A* sigue siendo admisible.
+    """
+    recta = distancia_haversine(coord1[0], coord1[1], coord2[0], coord2[1])
+    return max(1, math.ceil(recta * (1 + generador.random() * desvio_maximo)))
+
+
+def generar_cuadricula(filas, columnas, semilla=42):
+    """
+    Genera una red de carreteras en forma de cuadrícula sobre el territorio del Ecuador.
+
+    Args:
+        filas (int): Número de filas de la cuadrícula.
+        columnas (int): Número de columnas de la cuadrícula.
+        semilla (int): Semilla del generador aleatorio para obtener siempre el mismo grafo.
+
+    Returns:
+        tuple: (grafo, coordenadas) donde:
+            - grafo: Diccionario {ciudad: {vecino: distancia}} simétrico
+            - coordenadas: Diccionario {ciudad: (latitud, longitud)}
+
+    Cada nodo se conecta con sus vecinos de arriba, abajo, izquierda y derecha, con
+    distancias derivadas de las coordenadas y un pequeño desvío aleatorio.
+    """
+    generador = random.Random(semilla)
+    paso_lat = (LATITUD_MAXIMA - LATITUD_MINIMA) / max(filas - 1, 1)
+    paso_lon = (LONGITUD_MAXIMA - LONGITUD_MINIMA) / max(columnas - 1, 1)
+
+    def nombre(fila, columna):
+        return f"C{fila}-{columna}"
+
+    coordenadas = {}
+    grafo = {}
+    for fila in range(filas):
+        for columna in range(columnas):
+            coordenadas[nombre(fila, columna)] = (LATITUD_MAXIMA - fila * paso_lat,
+                                                  LONGITUD_MINIMA + columna * paso_lon)
+            grafo[nombre(fila, columna)] = {}
+
+    for fila in range(filas):
+        for columna in range(columnas):
+            actual = nombre(fila, columna)
+            for vecino in ([nombre(fila + 1, columna)] if fila + 1 < filas else []) + \
+                          ([nombre(fila, columna + 1)] if columna + 1 < columnas else []):
+                distancia = distancia_carretera(coordenadas[actual], coordenadas[vecino], generador)
+                grafo[actual][vecino] = distancia
+                grafo[vecino][actual] = distancia
+
+    return grafo, coordenadas
+
+
+def generar_geometrico_aleatorio(num_ciudades, grado_medio=6, semilla=42):
+    """
+    Genera una red geométrica aleatoria: ciudades dispersas y carreteras entre las cercanas.
+
+    Args:
+        num_ciudades (int): Número de ciudades.
+        grado_medio (float): Número medio de carreteras por ciudad.
+        semilla (int): Semilla del generador aleatorio para obtener siempre el mismo grafo.
+
+    Returns:
+        tuple: (grafo, coordenadas) con el mismo formato que generar_cuadricula.
+
+    Las ciudades se ubican al azar dentro del Ecuador y se conectan todas las parejas a menos
+    de un radio elegido para obtener el grado medio pedido (unas grado_medio / 2 carreteras
+    por ciudad). Para no comparar todas las parejas, las ciudades se reparten en celdas del
+    tamaño del radio y solo se comparan las de celdas vecinas. Con un grado medio de 6 casi
+    todas las ciudades quedan en una misma componente conexa.
+    """
+    generador = random.Random(semilla)
+    ancho = LONGITUD_MAXIMA - LONGITUD_MINIMA
+    alto = LATITUD_MAXIMA - LATITUD_MINIMA
+    radio = math.sqrt(grado_medio * ancho * alto / (math.pi * max(num_ciudades, 1)))
+
+    coordenadas = {}
+    celdas = {}
+    for i in range(num_ciudades):
+        nombre = f"G{i}"
+        lat = generador.uniform(LATITUD_MINIMA, LATITUD_MAXIMA)
+        lon = generador.uniform(LONGITUD_MINIMA, LONGITUD_MAXIMA)
+        coordenadas[nombre] = (lat, lon)
+        celdas.setdefault((int(lat // radio), int(lon // radio)), []).append(nombre)
+
+    grafo = {nombre: {} for nombre in coordenadas}
+    for (fila, columna), ciudades in celdas.items():
+        for actual in ciudades:
+            lat, lon = coordenadas[actual]
+            for df in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    for vecino in celdas.get((fila + df, columna + dc), ()):
+                        # Cada pareja se considera una sola vez
+                        if vecino <= actual or vecino in grafo[actual]:
+                            continue
+                        lat_v, lon_v = coordenadas[vecino]
+                        if (lat - lat_v) ** 2 + (lon - lon_v) ** 2 <= radio ** 2:
+                            distancia = distancia_carretera(coordenadas[actual], coordenadas[vecino], generador)
+                            grafo[actual][vecino] = distancia
+                            grafo[vecino][actual] = distancia
+
+    return grafo, coordenadas
+
+
+def generar_ecuador_escalado(copias, desvio_grados=0.25, semilla=42, ruta_json=None):
+    """
+    Genera una versión a mayor escala de la red real del Ecuador.
+
+    Args:
+        copias (int): Número de copias de la red de grafo_ecuador.json.
+        desvio_grados (float): Desviación estándar, en grados, del desplazamiento aleatorio de
+            cada ciudad copiada.
+        semilla (int): Semilla del generador aleatorio para obtener siempre el mismo grafo.
+        ruta_json (str, optional): Ruta del grafo base. Por defecto, grafo_ecuador.json junto a
+            este módulo.
+
+    Returns:
+        tuple: (grafo, coordenadas) con el mismo formato que generar_cuadricula.
+
+    Cada copia conserva la topología real: la ciudad "Quito #3" está conectada con las
+    copias número 3 de los vecinos de Quito. Las coordenadas se desplazan al azar y la
+    distancia de cada carretera se escala en la misma proporción que su línea recta, de modo
+    que el factor de desvío de las carreteras de montaña se mantiene. Además, cada ciudad se
+    conecta con su copia en la réplica siguiente, lo que une todas las réplicas en una sola red.
+    """
+    if ruta_json is None:
+        ruta_json = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grafo_ecuador.json")
+    with open(ruta_json, "r", encoding="utf-8") as archivo:
+        datos = json.load(archivo)
+    base = datos["grafo"]
+    coordenadas_base = {ciudad: (c["lat"], c["lng"]) for ciudad, c in datos["coords"].items()
+                        if c["lat"] is not None and c["lng"] is not None}
+
+    generador = random.Random(semilla)
+
+    def nombre(ciudad, copia):
+        return f"{ciudad} #{copia}"
+
+    coordenadas = {}
+    for copia in range(copias):
+        for ciudad, (lat, lon) in coordenadas_base.items():
+            coordenadas[nombre(ciudad, copia)] = (lat + generador.gauss(0, desvio_grados),
+                                                  lon + generador.gauss(0, desvio_grados))
+
+    grafo = {nombre(ciudad, copia): {} for copia in range(copias) for ciudad in base}
+    for copia in range(copias):
+        for ciudad, vecinos in base.items():
+            for vecino, distancia in vecinos.items():
+                actual, otro = nombre(ciudad, copia), nombre(vecino, copia)
+                if ciudad in coordenadas_base and vecino in coordenadas_base:
+                    recta_original = distancia_haversine(*coordenadas_base[ciudad], *coordenadas_base[vecino])
+                    recta_nueva = distancia_haversine(*coordenadas[actual], *coordenadas[otro])
+                    if recta_original > 0:
+                        distancia = max(1, round(distancia * recta_nueva / recta_original))
+                grafo[actual][otro] = distancia
+
+        # Enlace entre réplicas consecutivas
+        if copia + 1 < copias:
+            for ciudad in base:
+                actual, otro = nombre(ciudad, copia), nombre(ciudad, copia + 1)
+                if actual in coordenadas and otro in coordenadas:
+                    distancia = distancia_carretera(coordenadas[actual], coordenadas[otro], generador)
+                else:
+                    distancia = 1
+                grafo[actual][otro] = distancia
+                grafo[otro][actual] = distancia
+
+    return grafo, coordenadas
@@ -0,0 +1,280 @@
+# Importación de glob y os para ubicar y limpiar los archivos de landmarks
+import glob
+import os
+
+# Importación de heapq para las búsquedas de Dijkstra desde cada landmark
+import heapq
+
+# Importación de array para las distancias tentativas de cada búsqueda
+from array import array
+
+# Importación de numpy para guardar las distancias y combinar las cotas de forma vectorizada
+import numpy as np
+
+# Módulos locales
+from todos_los_pares import huella_grafo
+
+
+# Cantidad de landmarks por defecto
+NUM_LANDMARKS = 8
+
+# Cada cuántas ciudades expandidas una búsqueda de Dijkstra llama a la función verificar
+INTERVALO_VERIFICACION = 4096
+
+
+def distancias_dijkstra(compacto, origen, verificar=None):
+    """
+    Calcula la distancia más corta desde una ciudad hacia todas las demás.
+
+    Args:
+        compacto (GrafoCompacto): Grafo a recorrer (o su inversa, para distancias hacia la ciudad).
+        origen (int): Identificador de la ciudad de origen.
+        verificar (callable, optional): Función sin argumentos que se llama cada
+            INTERVALO_VERIFICACION ciudades expandidas; puede lanzar una excepción para
+            interrumpir el cálculo (por ejemplo, Tarea.verificar si se canceló la tarea).
+
+    Returns:
+        numpy.ndarray: Distancias en float64, una por identificador (inf si no es alcanzable).
+    """
+    offsets, destinos, pesos = compacto.offsets, compacto.destinos, compacto.pesos
+    distancias = array('d', [float('inf')]) * compacto.num_nodos
+    visitados = bytearray(compacto.num_nodos)
+    distancias[origen] = 0
+    cola_prioridad = [(0, origen)]
+    expandidos = 0
+    while cola_prioridad:
+        distancia, actual = heapq.heappop(cola_prioridad)
+        if visitados[actual]:
+            continue
+        visitados[actual] = 1
+        expandidos += 1
+        if verificar is not None and expandidos % INTERVALO_VERIFICACION == 0:
+            verificar()
+        for k in range(offsets[actual], offsets[actual + 1]):
+            vecino = destinos[k]
+            nueva_distancia = distancia + pesos[k]
+            if nueva_distancia < distancias[vecino]:
+                distancias[vecino] = nueva_distancia
+                heapq.heappush(cola_prioridad, (nueva_distancia, vecino))
+    return np.frombuffer(distancias, dtype=np.float64)
+
+
+class LandmarksALT:
+    """
+    Heurística ALT (A*, Landmarks y desigualdad Triangular) para la búsqueda A*.
+
+    Se eligen algunas ciudades de referencia (landmarks) y se precalculan las distancias por
+    carretera desde y hacia cada una. Por la desigualdad triangular, para cualquier landmark L:
+        d(v, t) >= d(L, t) - d(L, v)    y    d(v, t) >= d(v, L) - d(t, L)
+    La mayor de estas cotas es una heurística admisible y consistente que, a diferencia de la
+    línea recta, conoce la red real: en rutas de montaña con un factor de desvío alto la
+    cota es mucho más ajustada.
+
+    Los landmarks se eligen por el método del punto más lejano: cada nuevo landmark es la
+    ciudad más alejada de los ya elegidos, de modo que quedan en la periferia de la red.
+    Las distancias se guardan en un archivo .npz junto al JSON del grafo, con la huella del
+    contenido del grafo en el nombre.
+    """
+
+    def __init__(self, landmarks, desde, hacia):
+        """
+        Crea la heurística a partir de distancias ya calculadas o leídas desde disco.
+
+        Args:
+            landmarks (numpy.ndarray): Identificadores de las ciudades elegidas como landmarks.
+            desde (numpy.ndarray): Matriz k x n con d(L, v) para cada landmark L y ciudad v.
+            hacia (numpy.ndarray): Matriz k x n con d(v, L) para cada landmark L y ciudad v.
+        """
+        self.landmarks = landmarks
+        self.desde = desde
+        self.hacia = hacia
+
+    @classmethod
+    def calcular(cls, compacto, num_landmarks=NUM_LANDMARKS, verificar=None):
+        """
+        Elige los landmarks y calcula sus distancias.
+
+        Args:
+            compacto (GrafoCompacto): Representación compacta del grafo.
+            num_landmarks (int, optional): Cantidad de landmarks a elegir.
+            verificar (callable, optional): Función que se llama durante el cálculo y puede
+                interrumpirlo lanzando una excepción (ver distancias_dijkstra).
+
+        Returns:
+            LandmarksALT: La heurística lista para usar.
+
+        El primer landmark es la ciudad más lejana a la ciudad 0; cada uno de los siguientes
+        es la ciudad cuya distancia al landmark más cercano es máxima. Las ciudades que
+        ningún landmark alcanza tienen distancia infinita y se eligen primero, así cada
+        componente desconectada recibe su propio landmark.
+        """
+        n = compacto.num_nodos
+        num_landmarks = min(num_landmarks, n)
+        inversa = compacto.inversa
+
+        landmarks, desde, hacia = [], [], []
+        if num_landmarks == 0:
+            return cls(np.array(landmarks, dtype=np.int32), np.empty((0, n)), np.empty((0, n)))
+
+        # Distancia de cada ciudad a su landmark más cercano (en ambos sentidos). Antes del
+        # primer landmark se usa la distancia desde la ciudad 0
+        cercania = distancias_dijkstra(compacto, 0, verificar).copy()
+        while len(landmarks) < num_landmarks:
+            cercania[landmarks] = -1
+            landmark = int(np.argmax(cercania))
+            landmarks.append(landmark)
+            desde.append(distancias_dijkstra(compacto, landmark, verificar))
+            hacia.append(distancias_dijkstra(inversa, landmark, verificar))
+
+            nueva = np.minimum(desde[-1], hacia[-1])
+            cercania = nueva if len(landmarks) == 1 else np.minimum(cercania, nueva)
+
+        return cls(np.array(landmarks, dtype=np.int32), np.vstack(desde), np.vstack(hacia))
+
+    @staticmethod
+    def ruta_archivo(ruta_json, huella):
+        """
+        Obtiene la ruta del archivo de landmarks para un grafo.
+
+        Args:
+            ruta_json (str): Ruta del archivo JSON del grafo, junto al cual se guardan los landmarks.
+            huella (str): Huella del contenido del grafo.
+
+        Returns:
+            str: Ruta del archivo .npz.
+        """
+        base = os.path.splitext(ruta_json)[0]
+        return f"{base}.landmarks.{huella[:16]}.npz"
+
+    def guardar(self, ruta_archivo):
+        """
+        Guarda los landmarks y sus distancias en un archivo .npz.
+
+        Args:
+            ruta_archivo (str): Ruta del archivo a escribir.
+        """
+        # El temporal lleva el identificador del proceso: varios procesos que comparten la
+        # carpeta (ver comparacion_algoritmos) pueden guardar el mismo archivo a la vez
+        temporal = f"{ruta_archivo}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as archivo:
+            np.savez(archivo, landmarks=self.landmarks, desde=self.desde, hacia=self.hacia)
+        os.replace(temporal, ruta_archivo)
+
+    @classmethod
+    def cargar(cls, ruta_archivo, num_nodos, num_landmarks):
+        """
+        Lee los landmarks guardados con guardar().
+
+        Args:
+            ruta_archivo (str): Ruta del archivo .npz.
+            num_nodos (int): Cantidad de ciudades del grafo actual.
+            num_landmarks (int): Cantidad de landmarks pedida.
+
+        Returns:
+            LandmarksALT or None: La heurística leída, o None si el archivo no existe o se
+            calculó con otra cantidad de landmarks.
+        """
+        if not os.path.exists(ruta_archivo):
+            return None
+
+        with np.load(ruta_archivo) as datos:
+            landmarks, desde, hacia = datos["landmarks"], datos["desde"], datos["hacia"]
+        if desde.shape != (min(num_landmarks, num_nodos), num_nodos) or hacia.shape != desde.shape:
+            return None
+        return cls(landmarks, desde, hacia)
+
+    @classmethod
+    def obtener(cls, compacto, ruta_json, num_landmarks=NUM_LANDMARKS, forzar=False, verificar=None):
+        """
+        Carga los landmarks del grafo desde disco o los calcula y los guarda.
+
+        Args:
+            compacto (GrafoCompacto): Representación compacta del grafo.
+            ruta_json (str): Ruta del archivo JSON del grafo.
+            num_landmarks (int, optional): Cantidad de landmarks.
+            forzar (bool, optional): Si es True, recalcula aunque exista el archivo.
+            verificar (callable, optional): Función que puede interrumpir el cálculo (ver
+                calcular); si lo interrumpe, no se guarda nada.
+
+        Returns:
+            LandmarksALT: La heurística correspondiente al contenido actual del grafo.
+
+        Al guardar landmarks nuevos se eliminan los de versiones anteriores del grafo.
+        """
+        ruta_archivo = cls.ruta_archivo(ruta_json, huella_grafo(compacto))
+        landmarks = None if forzar else cls.cargar(ruta_archivo, compacto.num_nodos, num_landmarks)
+        if landmarks is None:
+            landmarks = cls.calcular(compacto, num_landmarks, verificar)
+
+            base = os.path.splitext(ruta_json)[0]
+            for anterior in glob.glob(f"{glob.escape(base)}.landmarks.*.npz"):
+                if anterior != ruta_archivo:
+                    # Otro proceso pudo haberlo eliminado ya
+                    try:
+                        os.remove(anterior)
+                    except FileNotFoundError:
+                        pass
+            landmarks.guardar(ruta_archivo)
+        return landmarks
+
+    def cotas_hacia(self, destino):
+        """
+        Calcula la cota inferior de landmarks de la distancia de cada ciudad hasta un destino.
+
+        Args:
+            destino (int): Identificador de la ciudad de destino.
+
+        Returns:
+            numpy.ndarray: Para cada ciudad v, el máximo sobre los landmarks de
+            d(L, t) - d(L, v) y d(v, L) - d(t, L), nunca menor que 0. Vale inf si las
+            distancias prueban que v no puede llegar al destino.
+        """
+        if len(self.landmarks) == 0:
+            return np.zeros(self.desde.shape[1])
+
+        # inf - inf produce NaN (el landmark no aporta información): se ignora con fmax
+        with np.errstate(invalid="ignore"):
+            cotas = np.fmax(np.fmax.reduce(self.desde[:, destino:destino + 1] - self.desde, axis=0),
+                            np.fmax.reduce(self.hacia - self.hacia[:, destino:destino + 1], axis=0))
+        cotas[np.isnan(cotas)] = 0
+        return np.maximum(cotas, 0)
+
+
+if __name__ == "__main__":
+    """
+    Compara las ciudades expandidas por A* con la heurística de línea recta y por ALT, en
+    todos los pares del grafo del archivo JSON y en consultas aleatorias sobre una cuadrícula
+    sintética de unos 10.000 nodos.
+    """
+    # Importaciones locales para evitar una dependencia circular con grafo_ecuador
+    import random
+    import time
+    from grafo_ecuador import GrafoEcuador
+    from grafos_sinteticos import generar_cuadricula
+
+    def comparar(descripcion, grafo, consultas):
+        totales = {}
+        for nombre, metodo in (("A*", grafo.busqueda_a_estrella), ("ALT", grafo.busqueda_alt)):
+            expandidos = 0
+            inicio = time.perf_counter()
+            for origen, destino in consultas:
+                metodo(origen, destino)
+                expandidos += grafo.ultimas_estadisticas.expandidos
+            totales[nombre] = (expandidos, time.perf_counter() - inicio)
+
+        print(f"{descripcion}: {len(consultas)} consultas")
+        for nombre, (expandidos, segundos) in totales.items():
+            print(f"  {nombre:<4} ciudades expandidas: {expandidos:>9}  tiempo: {segundos:.3f} s")
+        print(f"  ALT expande {totales['ALT'][0] / max(totales['A*'][0], 1):.0%} de lo que expande A*")
+
+    grafo = GrafoEcuador("grafo_ecuador.json")
+    comparar("grafo_ecuador.json", grafo,
+             [(o, d) for o in grafo.ciudades for d in grafo.ciudades if o != d])
+
+    grafo_dict, coordenadas = generar_cuadricula(100, 100)
+    cuadricula = GrafoEcuador(grafo_dict)
+    cuadricula.coordenadas = coordenadas
+    cuadricula.preparar_landmarks(ruta_json="cuadricula_100x100.json")
+    generador = random.Random(7)
+    comparar("cuadrícula 100x100", cuadricula,
+             [tuple(generador.sample(cuadricula.ciudades, 2)) for _ in range(50)])
@@ -0,0 +1,125 @@
+# Importación de threading y queue para el hilo que ejecuta las escrituras en orden
+import queue
+import threading
+
+# Importación de contextlib para el préstamo del escritor como administrador de contexto
+import contextlib
+
+# Importación de Future para devolver el resultado de cada escritura al hilo que la pidió
+from concurrent.futures import Future
+
+
+class HiloEscritor:
+    """
+    Hilo único por el que pasan todas las escrituras a la base de datos.
+
+    SQLite admite muchos lectores simultáneos en modo WAL, pero un solo escritor a la vez.
+    En lugar de que varios hilos compitan por el bloqueo de escritura (y fallen con
+    "database is locked"), las escrituras se encolan y este hilo las ejecuta de a una, en
+    el orden en que llegaron. El hilo que pide una escritura espera su resultado.
+
+    Un hilo puede además tomar prestado el escritor (ver prestar) para ejecutar varias
+    escrituras seguidas en una sola transacción; mientras tanto, las escrituras de los
+    demás hilos esperan en la cola.
+    """
+
+    def __init__(self, nombre="escritor-base-datos"):
+        """
+        Crea e inicia el hilo escritor.
+
+        Args:
+            nombre (str, optional): Nombre del hilo, útil al depurar.
+        """
+        self._cola = queue.Queue()
+        self._hilo = threading.Thread(target=self._atender, name=nombre, daemon=True)
+        # Hilo autorizado a escribir: el propio escritor, o el que lo tomó prestado
+        self._propietario = None
+        self._hilo.start()
+
+    def _atender(self):
+        """
+        Ciclo del hilo escritor: ejecuta las tareas de la cola hasta recibir None.
+        """
+        self._propietario = threading.get_ident()
+        while True:
+            tarea = self._cola.get()
+            if tarea is None:
+                break
+            funcion, args, kwargs, futuro = tarea
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            try:
+                futuro.set_result(funcion(*args, **kwargs))
+            except BaseException as e:
+                futuro.set_exception(e)
+
+    def es_propietario(self):
+        """
+        Indica si el hilo actual puede escribir directamente.
+
+        Returns:
+            bool: True en el hilo escritor o en el hilo que lo tiene prestado.
+        """
+        return self._propietario == threading.get_ident()
+
+    def ejecutar(self, funcion, *args, **kwargs):
+        """
+        Ejecuta una función en el hilo escritor y espera su resultado.
+
+        Args:
+            funcion (callable): Función que realiza la escritura.
+            *args: Argumentos posicionales de la función.
+            **kwargs: Argumentos con nombre de la función.
+
+        Returns:
+            object: Lo que retorne la función. Si la función lanza una excepción, se
+            vuelve a lanzar en el hilo que llamó.
+
+        Si el hilo actual ya es el propietario, la función se ejecuta directamente, lo que
+        permite que una escritura llame a otra sin bloquearse.
+        """
+        if self.es_propietario():
+            return funcion(*args, **kwargs)
+        futuro = Future()
+        self._cola.put((funcion, args, kwargs, futuro))
+        return futuro.result()
+
+    @contextlib.contextmanager
+    def prestar(self):
+        """
+        Administrador de contexto que cede el derecho de escritura al hilo actual.
+
+        Yields:
+            None: Dentro del bloque, es_propietario() es True en el hilo actual y las
+            escrituras se ejecutan en él; las de otros hilos esperan hasta salir del bloque.
+        """
+        if self.es_propietario():
+            yield
+            return
+
+        tomado = threading.Event()
+        liberado = threading.Event()
+        solicitante = threading.get_ident()
+
+        def ceder():
+            escritor = self._propietario
+            self._propietario = solicitante
+            tomado.set()
+            liberado.wait()
+            self._propietario = escritor
+
+        futuro = Future()
+        self._cola.put((ceder, (), {}, futuro))
+        tomado.wait()
+        try:
+            yield
+        finally:
+            liberado.set()
+            futuro.result()
+
+    def detener(self):
+        """
+        Termina el hilo después de ejecutar las escrituras pendientes.
+        """
+        self._cola.put(None)
+        self._hilo.join()
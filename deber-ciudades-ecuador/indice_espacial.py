@@ -0,0 +1,135 @@
+# Importación de math para ubicar los puntos en las celdas de la cuadrícula
+import math
+
+
+# Cantidad media de puntos por celda con la que se elige el tamaño de las celdas
+PUNTOS_POR_CELDA = 2
+
+# Máximo de veces que se reduce el tamaño de las celdas cuando las ciudades están agrupadas
+MAXIMO_REDUCCIONES = 8
+
+
+class IndiceEspacial:
+    """
+    Índice de cuadrícula uniforme sobre las posiciones de las ciudades en el dibujo.
+
+    El plano se divide en celdas cuadradas del mismo tamaño y cada ciudad se guarda en la
+    celda que contiene su posición. Para encontrar la ciudad más cercana a un punto solo
+    se revisan las celdas que tocan el círculo de búsqueda, por lo que el costo de una
+    consulta no depende de la cantidad total de ciudades sino de las que hay cerca.
+
+    Atributos:
+        tamano_celda (float): Lado de cada celda, en las unidades del dibujo.
+    """
+
+    def __init__(self, posiciones):
+        """
+        Construye el índice.
+
+        Args:
+            posiciones (dict): Diccionario {ciudad: (x, y)} con las posiciones del dibujo.
+
+        El tamaño de las celdas se elige para que haya en promedio PUNTOS_POR_CELDA
+        ciudades por celda dentro del rectángulo que contiene a todas. Si las ciudades
+        están agrupadas (como en el layout automático, con grupos separados por espacio
+        vacío), quedan muchas ciudades en pocas celdas; en ese caso se reduce el tamaño a
+        la mitad hasta que las celdas ocupadas tengan a lo sumo 4 * PUNTOS_POR_CELDA
+        ciudades en promedio.
+        """
+        if posiciones:
+            xs = [x for x, _ in posiciones.values()]
+            ys = [y for _, y in posiciones.values()]
+            area = max(max(xs) - min(xs), 1e-9) * max(max(ys) - min(ys), 1e-9)
+            self.tamano_celda = math.sqrt(area * PUNTOS_POR_CELDA / len(posiciones))
+        else:
+            self.tamano_celda = 1.0
+
+        for _ in range(MAXIMO_REDUCCIONES + 1):
+            self._celdas = {}
+            for ciudad, (x, y) in posiciones.items():
+                self._celdas.setdefault(self._celda(x, y), []).append((x, y, ciudad))
+            if len(posiciones) <= 4 * PUNTOS_POR_CELDA * len(self._celdas):
+                break
+            self.tamano_celda /= 2
+
+    def _celda(self, x, y):
+        """
+        Calcula la celda que contiene un punto.
+
+        Args:
+            x (float): Coordenada x.
+            y (float): Coordenada y.
+
+        Returns:
+            tuple: (columna, fila) de la celda.
+        """
+        return math.floor(x / self.tamano_celda), math.floor(y / self.tamano_celda)
+
+    def mas_cercana(self, x, y, radio):
+        """
+        Busca la ciudad más cercana a un punto dentro de un radio.
+
+        Args:
+            x (float): Coordenada x del punto.
+            y (float): Coordenada y del punto.
+            radio (float): Distancia máxima, en las unidades del dibujo.
+
+        Returns:
+            str or None: Nombre de la ciudad más cercana a menos de radio, o None si no hay.
+        """
+        columna, fila = self._celda(x, y)
+        alcance = math.ceil(radio / self.tamano_celda)
+        # Si el círculo cubre más celdas de las que hay ocupadas, se recorren las ocupadas
+        if (2 * alcance + 1) ** 2 > len(self._celdas):
+            celdas = self._celdas.values()
+        else:
+            celdas = [self._celdas[(c, f)]
+                      for c in range(columna - alcance, columna + alcance + 1)
+                      for f in range(fila - alcance, fila + alcance + 1)
+                      if (c, f) in self._celdas]
+
+        mejor = None
+        mejor_distancia = radio * radio
+        for puntos in celdas:
+            for px, py, ciudad in puntos:
+                distancia = (px - x) ** 2 + (py - y) ** 2
+                if distancia < mejor_distancia:
+                    mejor_distancia = distancia
+                    mejor = ciudad
+        return mejor
+
+    def en_rectangulo(self, x_min, y_min, x_max, y_max):
+        """
+        Busca las ciudades dentro de un rectángulo (por ejemplo, la vista actual de los ejes).
+
+        Args:
+            x_min (float): Borde izquierdo.
+            y_min (float): Borde inferior.
+            x_max (float): Borde derecho.
+            y_max (float): Borde superior.
+
+        Returns:
+            list: Nombres de las ciudades cuya posición está dentro del rectángulo (bordes incluidos).
+
+        Solo se revisan las celdas que tocan el rectángulo; las que quedan completamente
+        adentro se agregan sin comparar cada punto. Si el rectángulo cubre más celdas de
+        las que hay ocupadas, se recorren las ocupadas.
+        """
+        columna_min, fila_min = self._celda(x_min, y_min)
+        columna_max, fila_max = self._celda(x_max, y_max)
+        if (columna_max - columna_min + 1) * (fila_max - fila_min + 1) > len(self._celdas):
+            celdas = self._celdas.items()
+        else:
+            celdas = [((c, f), self._celdas[(c, f)])
+                      for c in range(columna_min, columna_max + 1)
+                      for f in range(fila_min, fila_max + 1)
+                      if (c, f) in self._celdas]
+
+        ciudades = []
+        for (columna, fila), puntos in celdas:
+            if columna_min < columna < columna_max and fila_min < fila < fila_max:
+                ciudades.extend(ciudad for _, _, ciudad in puntos)
+            else:
+                ciudades.extend(ciudad for x, y, ciudad in puntos
+                                if x_min <= x <= x_max and y_min <= y <= y_max)
+        return ciudades
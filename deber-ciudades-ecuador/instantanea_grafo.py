@@ -0,0 +1,150 @@
+# Importación de mmap para abrir la instantánea sin leerla ni copiarla a memoria
+import mmap
+
+# Importación de os para reemplazar la instantánea anterior de una sola vez
+import os
+
+# Importación de struct para escribir y leer la cabecera binaria
+import struct
+
+# Importación de numpy para las coordenadas en arreglos float64
+import numpy as np
+
+# Importación de la representación compacta (CSR) del grafo, que se guarda tal cual
+from grafo_compacto import GrafoCompacto
+
+
+# Identificador del formato al comienzo del archivo y versión actual del formato. Si cambia
+# la estructura del archivo, se incrementa la versión y las instantáneas anteriores se rechazan
+MAGIA = b"GRAFOEC\0"
+VERSION_FORMATO = 2
+
+# Cabecera: magia, versión, tipo de los pesos ('q' o 'd'), ciudades, aristas, bytes de la
+# tabla de cadenas y número de secuencia del último cambio de la base de datos incluido en
+# el grafo. Todo en little-endian; las secciones siguientes empiezan alineadas a 8 bytes
+CABECERA = struct.Struct("<8sII4Q")
+
+
+def _relleno(tamano):
+    """
+    Calcula los bytes de relleno necesarios para alinear una sección a 8 bytes.
+
+    Args:
+        tamano (int): Tamaño en bytes de la sección.
+
+    Returns:
+        int: Bytes de relleno (entre 0 y 7).
+    """
+    return -tamano % 8
+
+
+def guardar_instantanea(ruta_archivo, compacto, coordenadas, seq_cambios=0):
+    """
+    Guarda el grafo en el formato binario de instantánea.
+
+    Args:
+        ruta_archivo (str): Ruta del archivo de salida.
+        compacto (GrafoCompacto): Representación compacta del grafo.
+        coordenadas (dict): Diccionario {ciudad: (latitud, longitud)} en grados.
+        seq_cambios (int, optional): Último cambio del registro de la base de datos que
+            el grafo ya tiene (ver BaseDatosRutas.ultimo_cambio).
+
+    Returns:
+        int: Tamaño del archivo en bytes.
+
+    Raises:
+        ValueError: Si el nombre de alguna ciudad contiene el carácter nulo.
+
+    Estructura del archivo, con cada sección alineada a 8 bytes:
+    1. Cabecera (ver CABECERA)
+    2. Tabla de cadenas: nombres en UTF-8 separados por '\\0', en orden de identificador
+    3. Latitudes y longitudes: dos arreglos float64 con una posición por ciudad (NaN si no tiene)
+    4. Adyacencia CSR: offsets (int64, ciudades + 1), destinos (int64) y pesos (int64 o float64)
+
+    El archivo se escribe primero en un temporal junto al destino y después reemplaza al
+    anterior. Así se puede guardar sobre la misma instantánea de la que se abrió el grafo:
+    sus arreglos son vistas sobre ese archivo mapeado, y truncarlo antes de copiarlos
+    invalidaría la memoria que se está leyendo.
+    """
+    if any("\0" in nombre for nombre in compacto.nombres):
+        raise ValueError("Los nombres de las ciudades no pueden contener el carácter nulo")
+
+    cadenas = "\0".join(compacto.nombres).encode("utf-8")
+    latitudes = np.full(compacto.num_nodos, np.nan)
+    longitudes = np.full(compacto.num_nodos, np.nan)
+    for i, nombre in enumerate(compacto.nombres):
+        lat, lon = coordenadas.get(nombre, (None, None))
+        if lat is not None and lon is not None:
+            latitudes[i] = lat
+            longitudes[i] = lon
+
+    temporal = ruta_archivo + ".tmp"
+    with open(temporal, "wb") as f:
+        f.write(CABECERA.pack(MAGIA, VERSION_FORMATO, ord(compacto.tipo_pesos),
+                              compacto.num_nodos, compacto.num_aristas, len(cadenas), seq_cambios))
+        f.write(cadenas + b"\0" * _relleno(len(cadenas)))
+        f.write(latitudes.tobytes())
+        f.write(longitudes.tobytes())
+        for arreglo in (compacto.offsets, compacto.destinos, compacto.pesos):
+            f.write(memoryview(arreglo).tobytes())
+        tamano = f.tell()
+    os.replace(temporal, ruta_archivo)
+    return tamano
+
+
+def cargar_instantanea(ruta_archivo):
+    """
+    Abre una instantánea con mapeo de memoria.
+
+    Args:
+        ruta_archivo (str): Ruta del archivo de instantánea.
+
+    Returns:
+        tuple: (compacto, latitudes, longitudes, seq_cambios) donde compacto es un
+        GrafoCompacto cuyos arreglos offsets, destinos y pesos son vistas (memoryview) sobre
+        el archivo mapeado, latitudes y longitudes son arreglos numpy float64 también sobre
+        el archivo y seq_cambios es el número de secuencia guardado con la instantánea.
+
+    Raises:
+        ValueError: Si el archivo no es una instantánea o tiene otra versión del formato.
+
+    El archivo se mapea en modo copia al escribir: no se lee ni se copia nada salvo la
+    tabla de cadenas, y el sistema operativo trae las páginas a medida que se usan. Las
+    modificaciones (por ejemplo, GrafoCompacto.actualizar_peso) quedan en memoria y nunca
+    se escriben en el archivo.
+    """
+    with open(ruta_archivo, "rb") as f:
+        datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    if len(datos) < CABECERA.size:
+        raise ValueError(f"{ruta_archivo} no es una instantánea del grafo")
+    magia, version, tipo_pesos, num_nodos, num_aristas, bytes_cadenas, seq_cambios = CABECERA.unpack_from(datos)
+    if magia != MAGIA:
+        raise ValueError(f"{ruta_archivo} no es una instantánea del grafo")
+    if version != VERSION_FORMATO:
+        raise ValueError(f"Versión de instantánea {version} no soportada (se esperaba {VERSION_FORMATO})")
+    tipo_pesos = chr(tipo_pesos)
+    tamano = (CABECERA.size + bytes_cadenas + _relleno(bytes_cadenas)
+              + 8 * (2 * num_nodos + (num_nodos + 1) + 2 * num_aristas))
+    if len(datos) < tamano:
+        raise ValueError(f"{ruta_archivo} está incompleto")
+
+    vista = memoryview(datos)
+    posicion = CABECERA.size
+    nombres = str(vista[posicion:posicion + bytes_cadenas], "utf-8").split("\0") if num_nodos else []
+    posicion += bytes_cadenas + _relleno(bytes_cadenas)
+
+    def seccion(cantidad, formato):
+        nonlocal posicion
+        inicio = posicion
+        posicion += cantidad * 8
+        return vista[inicio:posicion].cast(formato)
+
+    latitudes = np.frombuffer(seccion(num_nodos, "d"), dtype=np.float64)
+    longitudes = np.frombuffer(seccion(num_nodos, "d"), dtype=np.float64)
+    offsets = seccion(num_nodos + 1, "q")
+    destinos = seccion(num_aristas, "q")
+    pesos = seccion(num_aristas, tipo_pesos)
+
+    compacto = GrafoCompacto.desde_arreglos(nombres, offsets, destinos, pesos, tipo_pesos)
+    return compacto, latitudes, longitudes, seq_cambios
@@ -5,8 +5,8 @@ from tkinter import ttk, messagebox, filedialog, simpledialog
 # Importación de módulos para manejo de datos y visualización
 import json
 import matplotlib.pyplot as plt
+from matplotlib.colors import to_hex
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import networkx as nx
 
 # Importación de módulos del sistema
 import sys
@@ -19,6 +19,20 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Importación de módulos locales
 from grafo_ecuador import GrafoEcuador
 from base_datos_rutas import BaseDatosRutas
+from capa_mapa import CapaMapa
+from trabajador_segundo_plano import TrabajadorSegundoPlano
+from comparacion_algoritmos import ComparadorAlgoritmos
+
+# Cada cuántos milisegundos se revisa el registro de cambios de la base de datos
+INTERVALO_CAMBIOS_MS = 2000
+
+# Instantánea binaria del grafo que se guarda al cerrar y se abre al iniciar; al abrirla se
+# aplican los cambios posteriores de la base de datos (ver instantanea_grafo y main.inicializar_sistema)
+ARCHIVO_INSTANTANEA = 'grafo_ecuador.snap'
+
+# Colores de las rutas de cada algoritmo al compararlos (en el orden de GrafoEcuador.ALGORITMOS)
+COLORES_COMPARACION = ['tab:blue', 'tab:orange', 'tab:green', 'tab:red',
+                       'tab:purple', 'tab:brown', 'tab:pink', 'tab:olive']
 
 class AplicacionRutas:
     """
@@ -36,12 +50,15 @@ class AplicacionRutas:
         - Panel derecho: Visualización del grafo/mapa
     """
     
-    def __init__(self, root):
+    def __init__(self, root, grafo=None):
         """
             Inicializa la aplicación con la ventana principal.
             
             Args:
                 root (tk.Tk): Ventana principal de la aplicación.
+                grafo (GrafoEcuador, optional): Grafo ya cargado (por ejemplo, abierto desde la
+                    instantánea); se le aplican los cambios de la base de datos posteriores a su
+                    seq_instantanea. Si es None, se carga de la base de datos.
                 
             Configura:
             - Título y tamaño de la ventana
@@ -54,14 +71,19 @@ class AplicacionRutas:
         self.root.title("Sistema de Rutas de Ecuador")
         self.root.geometry("1200x700")
         
-        # Inicializar conexión a la base de datos
-        self.db = BaseDatosRutas('rutas_ecuador.db')
-        
-        # Inicializar el grafo
-        self.grafo = GrafoEcuador()
+        # Inicializar conexión a la base de datos (una conexión por hilo, para que las
+        # tareas en segundo plano puedan leer mientras la interfaz escribe)
+        self.db = BaseDatosRutas('rutas_ecuador.db', pool=True)
         
-        # Sincronizar el grafo con la base de datos
-        self.sincronizar_grafo_bd()
+        # Sincronizar el grafo con la base de datos, salvo que ya venga cargado
+        if grafo is None:
+            self.seq_cambios = self.db.ultimo_cambio()
+            self.grafo = GrafoEcuador()
+            self.sincronizar_grafo_bd()
+        else:
+            # El grafo de la instantánea recibe los cambios que se hicieron después de guardarla
+            self.grafo = grafo
+            self.seq_cambios = self.db.aplicar_cambios_desde(grafo.seq_instantanea or 0, grafo)
         
         # Variables de control para la interfaz
         self.ciudad_origen_var = tk.StringVar()
@@ -72,8 +94,18 @@ class AplicacionRutas:
         # Variables de estado
         self.ruta_actual = None
         self.ciudad_seleccionada = None
+        self.ciudad_hover = None
         self.ultima_figura = None
         
+        # Hilos para las búsquedas, la comparación de algoritmos y el layout del dibujo,
+        # fuera del bucle de eventos de Tk
+        self.trabajador = TrabajadorSegundoPlano(self.root, canales=("busqueda", "comparacion", "dibujo"))
+        # Grupo de procesos que ejecuta todos los algoritmos a la vez (se inicia al usarlo)
+        self.comparador = ComparadorAlgoritmos(self.grafo)
+        # Rutas de la última comparación, [(algoritmo, ruta, color)], y versión del grafo en que se hizo
+        self.rutas_comparadas = []
+        self.version_comparacion = None
+        
         # Configurar la interfaz gráfica
         self.configurar_interfaz()
     
@@ -93,30 +125,25 @@ class AplicacionRutas:
             El proceso asegura que el grafo en memoria y la base de datos estén
             siempre sincronizados, manteniendo la consistencia de los datos.
         """
-        # Obtener lista de ciudades desde la base de datos
-        ciudades = self.db.listar_ciudades()
+        # Cargar ciudades y rutas de la base de datos en dos consultas (ver BaseDatosRutas._cargar_grafo)
+        grafo_dict, coords_dict = self.db.obtener_grafo_completo_con_coords()
         
-        if not ciudades:
+        if not grafo_dict:
             # Caso 1: Base de datos vacía - inicializar con grafo predeterminado
             grafo_dict = self.grafo.grafo
             # Preparar diccionario de coordenadas en formato para la BD
             coords_dict = {ciudad: {"lat": lat, "lng": lng} 
                           for ciudad, (lat, lng) in self.grafo.coordenadas.items()}
             
-            # Importar grafo predeterminado a la base de datos
-            self.db.importar_grafo(grafo_dict, coords_dict)
+            # Importar grafo predeterminado a la base de datos en una sola transacción
+            self.db.importar_grafo_masivo(grafo_dict, coords_dict)
+            # El grafo en memoria ya tiene lo importado: no hace falta aplicar el reinicio
+            self.seq_cambios = self.db.ultimo_cambio()
             messagebox.showinfo("Información", "Base de datos inicializada con el grafo predeterminado.")
         else:
-            # Caso 2: Cargar datos existentes de la base de datos
-            grafo_dict, coords_dict = self.db.obtener_grafo_completo_con_coords()
-            # Actualizar grafo en memoria
-            self.grafo.grafo = grafo_dict
-            # Convertir coordenadas al formato del grafo
-            self.grafo.coordenadas = {ciudad: (datos["lat"], datos["lng"]) 
-                                    for ciudad, datos in coords_dict.items() 
-                                    if datos["lat"] is not None and datos["lng"] is not None}
-            # Actualizar lista de ciudades
-            self.grafo.ciudades = list(self.grafo.grafo.keys())
+            # Caso 2: Usar los datos existentes de la base de datos
+            # Actualizar grafo, coordenadas y lista de ciudades en memoria
+            self.grafo.reemplazar_grafo(grafo_dict, coords_dict)
     
     def configurar_interfaz(self):
         """
@@ -174,8 +201,7 @@ class AplicacionRutas:
         
         # Configurar selector de algoritmo
         ttk.Label(panel_busqueda, text="Seleccione el algoritmo de búsqueda:").pack(pady=(10, 5), anchor=tk.W)
-        algoritmos = ["Búsqueda en Amplitud", "Búsqueda en Profundidad", 
-                     "Búsqueda de Costo Uniforme", "Búsqueda A*"]
+        algoritmos = list(GrafoEcuador.ALGORITMOS)
         self.combo_algoritmo = ttk.Combobox(panel_busqueda, textvariable=self.algoritmo_var, 
                                         values=algoritmos, state="readonly")
         self.combo_algoritmo.pack(fill=tk.X, padx=5, pady=5)
@@ -185,7 +211,19 @@ class AplicacionRutas:
                        command=self.actualizar_visualizacion).pack(pady=5)
         
         # Botón de búsqueda
-        ttk.Button(panel_busqueda, text="Buscar Ruta", command=self.buscar_ruta).pack(pady=20)
+        ttk.Button(panel_busqueda, text="Buscar Ruta", command=self.buscar_ruta).pack(pady=(20, 5))
+        ttk.Button(panel_busqueda, text="Comparar algoritmos", command=self.comparar_algoritmos).pack(pady=(0, 5))
+        
+        # Progreso de la búsqueda en curso, con su botón para cancelarla
+        marco_progreso = ttk.Frame(panel_busqueda)
+        marco_progreso.pack(fill=tk.X, padx=5, pady=(0, 10))
+        self.barra_progreso = ttk.Progressbar(marco_progreso, mode='determinate')
+        self.barra_progreso.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.boton_cancelar = ttk.Button(marco_progreso, text="Cancelar", command=self.cancelar_busqueda,
+                                         state=tk.DISABLED)
+        self.boton_cancelar.pack(side=tk.LEFT, padx=(5, 0))
+        self.progreso_var = tk.StringVar()
+        ttk.Label(panel_busqueda, textvariable=self.progreso_var).pack(fill=tk.X, padx=5)
         
         # Panel de información de ruta
         self.marco_info = ttk.LabelFrame(panel_busqueda, text="Información de la Ruta")
@@ -253,12 +291,47 @@ class AplicacionRutas:
         self.toolbar_frame.pack(fill=tk.X)
         self.toolbar = NavigationToolbar2Tk(self.canvas, self.toolbar_frame)
         
+        # Capa de dibujo que conserva los artistas del grafo entre búsquedas (ver CapaMapa)
+        self.capa_mapa = CapaMapa(self.canvas, self.ax, self.grafo)
+        
         # Configurar eventos de interacción con el mapa
         self.canvas.mpl_connect('button_press_event', self.on_click_mapa)
         self.canvas.mpl_connect('motion_notify_event', self.on_hover_mapa)
         
         # Visualizar el grafo inicial
         self.visualizar_grafo()
+        
+        # Revisar periódicamente los cambios hechos por otros procesos
+        self.root.after(INTERVALO_CAMBIOS_MS, self.revisar_cambios)
+    
+    def revisar_cambios(self):
+        """
+        Aplica al grafo en memoria los cambios registrados en la base de datos.
+        
+        Otros procesos que comparten rutas_ecuador.db pueden agregar o eliminar ciudades
+        y rutas; en lugar de recargar el grafo completo, se aplican solo los cambios
+        posteriores al último revisado (ver BaseDatosRutas.aplicar_cambios_desde). Si el
+        grafo cambió, se actualizan las listas de ciudades y la visualización. Los cambios
+        hechos desde esta misma ventana ya están en el grafo y no provocan un redibujado.
+        
+        Se vuelve a programar con root.after cada INTERVALO_CAMBIOS_MS milisegundos. Si hay
+        una búsqueda o un layout en curso (que leen el grafo), la revisión se posterga.
+        """
+        # Mientras una tarea en segundo plano lee el grafo, los cambios esperan a la próxima revisión
+        if self.trabajador.ocupado():
+            self.root.after(INTERVALO_CAMBIOS_MS, self.revisar_cambios)
+            return
+        
+        version = self.grafo.version
+        self.seq_cambios = self.db.aplicar_cambios_desde(self.seq_cambios, self.grafo)
+        if self.grafo.version != version:
+            # La ruta resaltada deja de ser válida si se eliminó alguna de sus ciudades
+            if self.ruta_actual and any(ciudad not in self.grafo.grafo for ciudad in self.ruta_actual):
+                self.ruta_actual = None
+            self.combo_origen.config(values=self.grafo.listar_ciudades())
+            self.combo_destino.config(values=self.grafo.listar_ciudades())
+            self.visualizar_grafo(self.ruta_actual)
+        self.root.after(INTERVALO_CAMBIOS_MS, self.revisar_cambios)
     
     def on_click_mapa(self, event):
         """
@@ -303,34 +376,18 @@ class AplicacionRutas:
             Returns:
                 str or None: Nombre de la ciudad más cercana si está dentro del umbral,
                             None si no hay ciudades cercanas al punto de clic.
+                            
+            Las posiciones son las mismas del dibujo y, junto con su índice espacial, se
+            guardan en el grafo mientras no cambie (ver GrafoEcuador.ciudad_en_posicion):
+            la consulta solo revisa las ciudades cercanas al punto y nunca recalcula el layout.
         """
-        ciudad_mas_cercana = None
-        distancia_minima = float('inf')
-        
-        # Crear grafo de NetworkX para calcular posiciones
-        G = nx.Graph()
-        for origen in self.grafo.grafo:
-            G.add_node(origen)
-        
-        # Obtener posiciones según el modo de visualización
-        if usar_mapa_real:
-            # Usar coordenadas reales (longitud, latitud)
-            pos = {ciudad: (lon, lat) for ciudad, (lat, lon) in self.grafo.coordenadas.items() 
-                  if ciudad in self.grafo.grafo}
-        else:
-            # Usar layout automático para vista abstracta
-            pos = nx.spring_layout(G, seed=42)
-        
-        # Calcular distancia a cada ciudad
-        for ciudad, (px, py) in pos.items():
-            distancia = ((px - x) ** 2 + (py - y) ** 2) ** 0.5
-            if distancia < distancia_minima:
-                distancia_minima = distancia
-                ciudad_mas_cercana = ciudad
+        # Mientras se calcula el layout en segundo plano, no se bloquea la interfaz calculándolo aquí
+        if self.trabajador.ocupado('dibujo'):
+            return None
         
         # Definir umbral según el modo de visualización
-        umbral = 0.05 if usar_mapa_real else 0.1
-        return ciudad_mas_cercana if distancia_minima < umbral else None
+        umbral = 0.05 if self.grafo.usa_coordenadas_reales(usar_mapa_real) else 0.1
+        return self.grafo.ciudad_en_posicion(x, y, umbral, usar_mapa_real)
         
     def mostrar_menu_ciudad(self, event):
         
@@ -424,6 +481,9 @@ class AplicacionRutas:
             2. Cambia el cursor a una mano para indicar que la ciudad es clickeable
             3. Restaura el título original cuando el mouse sale de la ciudad
             
+            El título y el cursor solo se actualizan cuando cambia la ciudad bajo el mouse,
+            de modo que moverlo sobre el mismo lugar no redibuja el mapa.
+            
             Args:
                 event (matplotlib.backend_bases.MouseEvent): Evento de movimiento del mouse
                     que contiene las coordenadas actuales del cursor.
@@ -435,24 +495,22 @@ class AplicacionRutas:
         usar_mapa_real = self.mapa_real_var.get()
         # Encontrar ciudad más cercana al cursor
         ciudad = self.encontrar_ciudad_cercana(event.xdata, event.ydata, usar_mapa_real)
+        if ciudad == self.ciudad_hover:
+            return
+        self.ciudad_hover = ciudad
         
         if ciudad:
             # Cambiar cursor a mano para indicar que es clickeable
             self.canvas.get_tk_widget().config(cursor="hand2")
             
-            # Mostrar nombre de la ciudad en el título
-            self.ax.set_title(f"Ciudad: {ciudad}")
-            self.canvas.draw_idle()
+            # Mostrar nombre de la ciudad en el título (solo se redibuja el título)
+            self.capa_mapa.mostrar_titulo(f"Ciudad: {ciudad}")
         else:
             # Restaurar cursor normal
             self.canvas.get_tk_widget().config(cursor="")
             
-            # Restaurar título original según el contexto
-            if self.ruta_actual:
-                self.ax.set_title("Grafo de Distancias entre Ciudades de Ecuador - Ruta Encontrada")
-            else:
-                self.ax.set_title("Grafo de Distancias entre Ciudades de Ecuador")
-            self.canvas.draw_idle()
+            # Restaurar el título que corresponde a las rutas resaltadas
+            self.capa_mapa.restaurar_titulo()
     
     def ver_conexiones(self):
         """
@@ -546,13 +604,22 @@ class AplicacionRutas:
            - Búsqueda en Profundidad
            - Búsqueda A*
            - Búsqueda de Costo Uniforme
+           - Dijkstra Bidireccional
+           - A* Bidireccional
         5. Si se encuentra una ruta:
            - Actualiza la ruta actual
            - Muestra la información de la ruta
            - Visualiza el grafo con la ruta resaltada
         6. Si no se encuentra ruta, muestra un mensaje de error
         
-        Nota: Este método se llama cuando el usuario presiona el botón de búsqueda.
+        La búsqueda se ejecuta en segundo plano (ver TrabajadorSegundoPlano), de modo que la
+        ventana sigue respondiendo; mientras tanto, la barra de progreso muestra las ciudades
+        expandidas y el botón Cancelar la interrumpe. Los pasos 5 y 6 se hacen en
+        terminar_busqueda cuando llega el resultado. Una nueva búsqueda reemplaza a la que
+        está en curso, cuyo resultado se descarta.
+        
+        Nota: Este método se llama cuando el usuario presiona el botón de búsqueda. Repetir la
+        misma búsqueda sin cambiar el grafo responde desde la caché de rutas de GrafoEcuador.
         """
         origen = self.ciudad_origen_var.get()
         destino = self.ciudad_destino_var.get()
@@ -566,22 +633,214 @@ class AplicacionRutas:
             messagebox.showinfo("Información", "El origen y destino son la misma ciudad.")
             return
         
-        if algoritmo == "Búsqueda en Amplitud":
-            ruta, distancia = self.grafo.busqueda_amplitud(origen, destino)
-        elif algoritmo == "Búsqueda en Profundidad":
-            ruta, distancia = self.grafo.busqueda_profundidad(origen, destino)
-        elif algoritmo == "Búsqueda A*":
-            ruta, distancia = self.grafo.busqueda_a_estrella(origen, destino)
-        else:
-            ruta, distancia = self.grafo.busqueda_costo_uniforme(origen, destino)
+        grafo = self.grafo
         
+        def buscar(tarea):
+            # Las búsquedas llaman al observador en cada ciudad expandida: ahí se publica el
+            # progreso y se interrumpe la búsqueda si fue cancelada o reemplazada
+            observador_anterior = grafo.observador
+            grafo.observador = tarea.informar
+            try:
+                # Los landmarks o la jerarquía se preparan antes, para poder cancelarlos
+                grafo.preparar_algoritmo(algoritmo, tarea.verificar)
+                return grafo.buscar_ruta(origen, destino, algoritmo)
+            finally:
+                grafo.observador = observador_anterior
+        
+        self.barra_progreso.config(maximum=max(len(self.grafo.ciudades), 1), value=0)
+        self.progreso_var.set(f"Buscando ruta de {origen} a {destino}...")
+        self.boton_cancelar.config(state=tk.NORMAL)
+        # Las ciudades expandidas se cuentan en la tarea: las estadísticas de la búsqueda
+        # recién se completan cuando termina
+        tarea = self.trabajador.enviar('busqueda', buscar,
+                                       lambda resultado: self.terminar_busqueda(origen, destino, algoritmo, *resultado),
+                                       al_progresar=lambda progreso: self.mostrar_progreso(progreso, tarea.avisos),
+                                       al_fallar=self.fallo_busqueda)
+    
+    def mostrar_progreso(self, progreso, expandidos):
+        """
+        Muestra el avance de la búsqueda en curso.
+        
+        Args:
+            progreso (tuple): (ciudad, distancia, tamaño de la frontera) de la última ciudad
+                expandida, tal como la informa el observador de la búsqueda.
+            expandidos (int): Ciudades expandidas hasta el momento (ver Tarea.avisos).
+        
+        La barra avanza con las ciudades expandidas que lleva la búsqueda sobre el total de
+        ciudades del grafo.
+        """
+        ciudad, distancia, frontera = progreso
+        self.barra_progreso.config(value=min(expandidos, self.barra_progreso.cget('maximum')))
+        self.progreso_var.set(f"Expandidas: {expandidos} · Frontera: {frontera} · {ciudad} ({distancia} km)")
+    
+    def terminar_busqueda(self, origen, destino, algoritmo, ruta, distancia):
+        """
+        Muestra el resultado de la búsqueda en segundo plano (en el hilo de la interfaz).
+        
+        Args:
+            origen (str): Ciudad de origen buscada.
+            destino (str): Ciudad de destino buscada.
+            algoritmo (str): Algoritmo utilizado.
+            ruta (list or None): Ruta encontrada.
+            distancia (float): Distancia total de la ruta.
+        """
+        self.limpiar_progreso()
         if ruta:
             self.ruta_actual = ruta
+            self.rutas_comparadas = []
             self.mostrar_info_ruta(ruta, distancia, algoritmo)
             self.visualizar_grafo(ruta)
         else:
             messagebox.showerror("Error", f"No se encontró ruta entre {origen} y {destino}.")
     
+    def fallo_busqueda(self, error):
+        """
+        Informa un error de la búsqueda en segundo plano.
+        
+        Args:
+            error (Exception): Excepción que lanzó la búsqueda.
+        """
+        self.limpiar_progreso()
+        messagebox.showerror("Error", f"Error al buscar la ruta: {error}")
+    
+    def comparar_algoritmos(self):
+        """
+        Busca la ruta entre el origen y el destino con todos los algoritmos a la vez.
+        
+        Los algoritmos de GrafoEcuador.ALGORITMOS se ejecutan en paralelo en un grupo de
+        procesos (ver ComparadorAlgoritmos), esperado desde un hilo en segundo plano para no
+        bloquear la ventana. La barra de progreso avanza con cada algoritmo que termina y el
+        botón Cancelar descarta la comparación. Al terminar, mostrar_comparacion muestra la
+        tabla de resultados y todas las rutas superpuestas en el mapa.
+        """
+        origen = self.ciudad_origen_var.get()
+        destino = self.ciudad_destino_var.get()
+        
+        if not origen or not destino:
+            messagebox.showerror("Error", "Debe seleccionar ciudad de origen y destino.")
+            return
+        
+        if origen == destino:
+            messagebox.showinfo("Información", "El origen y destino son la misma ciudad.")
+            return
+        
+        comparador = self.comparador
+        self.barra_progreso.config(maximum=len(GrafoEcuador.ALGORITMOS), value=0)
+        self.progreso_var.set(f"Comparando algoritmos de {origen} a {destino}...")
+        self.boton_cancelar.config(state=tk.NORMAL)
+        self.trabajador.enviar('comparacion', lambda tarea: comparador.comparar(origen, destino, tarea),
+                               lambda resultados: self.mostrar_comparacion(origen, destino, resultados),
+                               al_progresar=self.mostrar_progreso_comparacion,
+                               al_fallar=self.fallo_busqueda)
+    
+    def mostrar_progreso_comparacion(self, progreso):
+        """
+        Muestra cuántos algoritmos terminaron en la comparación en curso.
+        
+        Args:
+            progreso (tuple): (algoritmos terminados, total).
+        """
+        terminados, total = progreso
+        self.barra_progreso.config(value=terminados)
+        self.progreso_var.set(f"Algoritmos terminados: {terminados} de {total}")
+    
+    def mostrar_comparacion(self, origen, destino, resultados):
+        """
+        Muestra el resultado de la comparación de algoritmos.
+        
+        Args:
+            origen (str): Ciudad de origen.
+            destino (str): Ciudad de destino.
+            resultados (list): Un diccionario por algoritmo (ver ComparadorAlgoritmos.comparar).
+        
+        Abre una ventana con una tabla de ruta, distancia, ciudades expandidas y tiempo de
+        cada algoritmo, con el color de su ruta, y resalta todas las rutas en el mapa a la
+        vez con un solo redibujado de la capa de rutas.
+        """
+        self.limpiar_progreso()
+        self.rutas_comparadas = [(resultado["algoritmo"], resultado["ruta"], color)
+                                 for resultado, color in zip(resultados, COLORES_COMPARACION)
+                                 if resultado["ruta"]]
+        self.version_comparacion = self.grafo.version
+        self.ruta_actual = None
+        self.visualizar_grafo()
+        
+        # Crear ventana para mostrar la comparación
+        ventana = tk.Toplevel(self.root)
+        ventana.title(f"Comparación de algoritmos: {origen} → {destino}")
+        ventana.geometry("900x300")
+        ventana.transient(self.root)
+        
+        # Crear frame para la tabla
+        frame = ttk.Frame(ventana)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Agregar barra de desplazamiento
+        scrollbar = ttk.Scrollbar(frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Crear tabla de resultados
+        columnas = ("algoritmo", "distancia", "expandidos", "tiempo", "ruta")
+        treeview = ttk.Treeview(frame, columns=columnas, show="headings")
+        treeview.heading("algoritmo", text="Algoritmo")
+        treeview.heading("distancia", text="Distancia (km)")
+        treeview.heading("expandidos", text="Expandidas")
+        treeview.heading("tiempo", text="Tiempo (ms)")
+        treeview.heading("ruta", text="Ruta")
+        treeview.column("algoritmo", width=180)
+        treeview.column("distancia", width=100, anchor=tk.E)
+        treeview.column("expandidos", width=90, anchor=tk.E)
+        treeview.column("tiempo", width=90, anchor=tk.E)
+        treeview.column("ruta", width=400)
+        
+        # Cada fila se escribe con el color de su ruta en el mapa
+        for resultado, color in zip(resultados, COLORES_COMPARACION):
+            ruta = resultado["ruta"]
+            treeview.tag_configure(color, foreground=to_hex(color))
+            treeview.insert("", "end", tags=(color,), values=(
+                resultado["algoritmo"],
+                resultado["distancia"] if ruta else "Sin ruta",
+                resultado["expandidos"],
+                f"{resultado['segundos'] * 1000:.1f}",
+                " → ".join(ruta) if ruta else "",
+            ))
+        
+        # Configurar scrollbar y mostrar tabla
+        treeview.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=treeview.yview)
+        treeview.config(yscrollcommand=scrollbar.set)
+        
+        # Botón para cerrar
+        ttk.Button(ventana, text="Cerrar", command=ventana.destroy).pack(pady=10)
+    
+    def cancelar_busqueda(self):
+        """
+        Cancela la búsqueda o la comparación en curso; su resultado se descarta.
+        """
+        self.trabajador.cancelar('busqueda')
+        self.trabajador.cancelar('comparacion')
+        self.limpiar_progreso()
+        self.progreso_var.set("Búsqueda cancelada.")
+    
+    def limpiar_progreso(self):
+        """
+        Deja la barra de progreso y el botón Cancelar como cuando no hay búsqueda en curso.
+        """
+        self.barra_progreso.config(value=0)
+        self.progreso_var.set("")
+        self.boton_cancelar.config(state=tk.DISABLED)
+    
+    def detener_tareas(self):
+        """
+        Cancela las tareas en segundo plano y espera a que terminen las que están en curso.
+        
+        Se llama antes de modificar el grafo en memoria, que las búsquedas y el layout leen
+        desde otro hilo. Una búsqueda cancelada se detiene en la siguiente ciudad que expande.
+        """
+        if self.trabajador.ocupado('busqueda') or self.trabajador.ocupado('comparacion'):
+            self.limpiar_progreso()
+        self.trabajador.cancelar_todas(esperar=True)
+    
     def mostrar_info_ruta(self, ruta, distancia, algoritmo):
         """
         Muestra información detallada sobre la ruta encontrada en el área de texto de la interfaz.
@@ -594,7 +853,9 @@ class AplicacionRutas:
         5. Si las ciudades tienen coordenadas, calcula y muestra:
            - La distancia en línea recta entre origen y destino
            - El factor de desvío (distancia real / distancia en línea recta)
-        6. Muestra la ruta completa con las distancias entre cada par de ciudades
+        6. Muestra las estadísticas de la búsqueda: ciudades expandidas, operaciones de la
+           frontera, tamaño máximo de la frontera, memoria usada para la ruta y tiempo
+        7. Muestra la ruta completa con las distancias entre cada par de ciudades
         
         Parámetros:
             ruta (list): Lista de ciudades que forman la ruta
@@ -608,14 +869,23 @@ class AplicacionRutas:
         self.info_ruta_text.insert(tk.END, f"Destino: {ruta[-1]}\n")
         self.info_ruta_text.insert(tk.END, f"Distancia total: {distancia} km\n\n")
         
-        # Calcular distancia en línea recta si hay coordenadas
+        # Calcular distancia en línea recta si hay coordenadas, reutilizando la tabla
+        # vectorizada de distancias al destino (la misma que usa la heurística de A*)
         if ruta[0] in self.grafo.coordenadas and ruta[-1] in self.grafo.coordenadas:
-            dist_linea_recta = self.grafo.obtener_distancia_linea_recta(ruta[0], ruta[-1])
+            distancias_al_destino = self.grafo.distancias_linea_recta(ruta[-1])
+            dist_linea_recta = float(distancias_al_destino[self.grafo.compacto.indice(ruta[0])])
             factor_desvio = distancia / dist_linea_recta if dist_linea_recta > 0 else "N/A"
             
             self.info_ruta_text.insert(tk.END, f"Distancia en línea recta: {dist_linea_recta:.2f} km\n")
             self.info_ruta_text.insert(tk.END, f"Factor de desvío: {factor_desvio:.2f}\n\n")
         
+        # Contadores de la búsqueda (ver EstadisticasBusqueda)
+        self.info_ruta_text.insert(tk.END, "Estadísticas de la búsqueda:\n")
+        for linea in self.grafo.ultimas_estadisticas.resumen():
+            self.info_ruta_text.insert(tk.END, f"  {linea}\n")
+        self.info_ruta_text.insert(tk.END, f"  {self.grafo.cache_rutas.resumen()}\n")
+        self.info_ruta_text.insert(tk.END, "\n")
+        
         self.info_ruta_text.insert(tk.END, "Ruta completa:\n")
         for i in range(len(ruta) - 1):
             dist = self.grafo.obtener_distancia(ruta[i], ruta[i+1])
@@ -641,27 +911,34 @@ class AplicacionRutas:
         Visualiza el grafo en el panel derecho de la interfaz.
         
         Este método:
-        1. Limpia el área de visualización actual
-        2. Obtiene el modo de visualización seleccionado (mapa real o abstracto)
-        3. Llama al método de visualización del grafo con los parámetros adecuados
-        4. Actualiza el título del gráfico según si hay una ruta resaltada
-        5. Redibuja el canvas para mostrar los cambios
+        1. Obtiene el modo de visualización seleccionado (mapa real o abstracto)
+        2. Calcula en segundo plano las posiciones de las ciudades (el layout automático
+           puede tardar en grafos grandes; si ya están calculadas, la tarea es inmediata)
+        3. Pasa el modo y la ruta a la capa de dibujo del mapa (ver CapaMapa), que:
+           - Reconstruye y redibuja el grafo completo solo si cambió el grafo o el modo
+           - En otro caso, actualiza la ruta resaltada y el título con blitting
         
         Parámetros:
             ruta (list, optional): Lista de ciudades que forman la ruta a resaltar.
                 Si se proporciona, la ruta se mostrará de manera destacada en el grafo.
+                Si es None y hay una comparación de algoritmos vigente (hecha con la
+                versión actual del grafo), se resaltan sus rutas, cada una con su color.
         """
-        self.ax.clear()
+        # El título vuelve al original: la próxima ciudad bajo el mouse debe volver a mostrarse
+        self.ciudad_hover = None
         
         usar_mapa_real = self.mapa_real_var.get()
-        self.grafo.visualizar_grafo(ruta, usar_mapa_real=usar_mapa_real, ax=self.ax)
-        
-        if ruta:
-            self.ax.set_title("Grafo de Distancias entre Ciudades de Ecuador - Ruta Encontrada")
+        grafo = self.grafo
+        if self.grafo.version != self.version_comparacion:
+            # Las rutas comparadas dejan de valer si el grafo cambió
+            self.rutas_comparadas = []
+        if ruta is None and self.rutas_comparadas:
+            # Sin una ruta propia se mantienen las rutas de la última comparación de algoritmos
+            rutas = list(self.rutas_comparadas)
         else:
-            self.ax.set_title("Grafo de Distancias entre Ciudades de Ecuador")
-        
-        self.canvas.draw()
+            rutas = [(None, ruta, 'r')] if ruta else []
+        self.trabajador.enviar('dibujo', lambda tarea: grafo.posiciones(usar_mapa_real),
+                               lambda _: self.capa_mapa.dibujar_rutas(usar_mapa_real, rutas))
     
     def agregar_ciudad(self):
         """
@@ -746,6 +1023,7 @@ class AplicacionRutas:
             
             if ciudad_id:
                 # Agregar ciudad al grafo
+                self.detener_tareas()
                 self.grafo.agregar_ciudad(nombre, latitud, longitud)
                 
                 # Actualizar listas de ciudades en la interfaz
@@ -886,7 +1164,8 @@ class AplicacionRutas:
                 self.db.actualizar_coordenadas(ciudad, latitud, longitud)
                 
                 # Actualizar coordenadas en el grafo
-                self.grafo.coordenadas[ciudad] = (latitud, longitud)
+                self.detener_tareas()
+                self.grafo.actualizar_coordenadas(ciudad, latitud, longitud)
             
             # Si se quiere cambiar el nombre
             if nuevo_nombre and nuevo_nombre != ciudad:
@@ -953,6 +1232,7 @@ class AplicacionRutas:
             # Eliminar de la base de datos
             if self.db.eliminar_ciudad(ciudad):
                 # Eliminar del grafo
+                self.detener_tareas()
                 self.grafo.eliminar_ciudad(ciudad)
                 
                 # Actualizar listas de ciudades en la interfaz
@@ -1061,6 +1341,7 @@ class AplicacionRutas:
             
             if self.db.agregar_ruta(origen, destino, distancia, 
                                    origen_lat, origen_lng, destino_lat, destino_lng):
+                self.detener_tareas()
                 self.grafo.agregar_conexion(origen, destino, distancia)
                 
                 # Visualizar el grafo actualizado
@@ -1193,6 +1474,7 @@ class AplicacionRutas:
                 if self.db.agregar_ruta(origen, destino, distancia,
                                        origen_lat, origen_lng, destino_lat, destino_lng):
                     # Actualizamos el grafo
+                    self.detener_tareas()
                     self.grafo.eliminar_conexion(origen, destino)
                     self.grafo.agregar_conexion(origen, destino, distancia)
                     
@@ -1291,6 +1573,7 @@ class AplicacionRutas:
             
             if messagebox.askyesno("Confirmar", f"¿Está seguro de eliminar la conexión {origen} - {destino}?"):
                 if self.db.eliminar_ruta(origen, destino):
+                    self.detener_tareas()
                     self.grafo.eliminar_conexion(origen, destino)
                     
                     # Si la conexión era parte de la ruta actual, limpiar la ruta
@@ -1334,19 +1617,17 @@ class AplicacionRutas:
         """
         ruta_archivo = filedialog.askopenfilename(
             title="Seleccionar archivo JSON",
-            filetypes=[("Archivos JSON", "*.json"), ("Todos los archivos", "*.*")]
+            filetypes=[("Archivos JSON", "*.json"), ("Archivos NDJSON (una ciudad o ruta por línea)", "*.ndjson *.jsonl"),
+                       ("Todos los archivos", "*.*")]
         )
         
         if ruta_archivo:
             if messagebox.askyesno("Confirmar", "La importación reemplazará todas las rutas existentes. ¿Desea continuar?"):
-                if self.db.importar_desde_json(ruta_archivo):
-                    # Actualizar el grafo en memoria
-                    grafo_dict, coords_dict = self.db.obtener_grafo_completo_con_coords()
-                    self.grafo.grafo = grafo_dict
-                    self.grafo.coordenadas = {ciudad: (datos["lat"], datos["lng"]) 
-                                            for ciudad, datos in coords_dict.items()
-                                            if datos["lat"] is not None and datos["lng"] is not None}
-                    self.grafo.ciudades = list(self.grafo.grafo.keys())
+                if self.db.importar_desde_json(ruta_archivo, masivo=True):
+                    self.detener_tareas()
+                    # Actualizar el grafo en memoria con el registro de cambios (la
+                    # importación masiva aparece como un reinicio y recarga el grafo)
+                    self.seq_cambios = self.db.aplicar_cambios_desde(self.seq_cambios, self.grafo)
                     
                     # Actualizar listas de ciudades en la interfaz
                     self.combo_origen.config(values=self.grafo.listar_ciudades())
@@ -1382,7 +1663,8 @@ class AplicacionRutas:
         ruta_archivo = filedialog.asksaveasfilename(
             title="Guardar archivo JSON",
             defaultextension=".json",
-            filetypes=[("Archivos JSON", "*.json"), ("Todos los archivos", "*.*")]
+            filetypes=[("Archivos JSON", "*.json"), ("Archivos NDJSON (una ciudad o ruta por línea)", "*.ndjson *.jsonl"),
+                       ("Todos los archivos", "*.*")]
         )
         
         if ruta_archivo:
@@ -1396,16 +1678,29 @@ class AplicacionRutas:
         Maneja el cierre de la aplicación.
         
         Este método:
-        1. Cierra la conexión con la base de datos:
+        1. Cancela las búsquedas y el layout en segundo plano y detiene los procesos de la
+           comparación de algoritmos
+        2. Aplica al grafo los cambios del registro que todavía no revisó
+        3. Cierra la conexión con la base de datos:
            - Libera los recursos del sistema
            - Asegura que todos los datos se guarden correctamente
-        2. Destruye la ventana principal de la aplicación
+        4. Guarda la instantánea del grafo junto con el número del último cambio aplicado,
+           para que el próximo inicio aplique solo los cambios posteriores
+        5. Destruye la ventana principal de la aplicación
         
         Nota: Este método se llama cuando el usuario intenta cerrar la ventana principal
         de la aplicación, ya sea haciendo clic en el botón de cerrar o usando atajos
         de teclado como Alt+F4.
         """
+        self.detener_tareas()
+        self.trabajador.cerrar()
+        self.comparador.cerrar()
+        self.seq_cambios = self.db.aplicar_cambios_desde(self.seq_cambios, self.grafo)
         self.db.cerrar()
+        try:
+            self.grafo.guardar_instantanea(ARCHIVO_INSTANTANEA, self.seq_cambios)
+        except (OSError, ValueError) as e:
+            print(f"No se pudo guardar la instantánea del grafo: {e}")
         self.root.destroy()
 
 
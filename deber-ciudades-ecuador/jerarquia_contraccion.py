@@ -0,0 +1,535 @@
+# Importación de glob y os para ubicar y limpiar los archivos de la jerarquía
+import glob
+import os
+
+# Importación de heapq para la cola de contracción y las búsquedas de Dijkstra
+import heapq
+
+# Importación de math para el valor infinito de las distancias no alcanzadas
+import math
+
+# Importación de array para la adyacencia de la jerarquía durante la construcción
+from array import array
+
+# Importación de numpy para serializar la jerarquía en un único archivo .npz
+import numpy as np
+
+# Módulos locales
+from todos_los_pares import huella_grafo
+
+
+# Máximo de ciudades asentadas en cada búsqueda de testigos. Si se alcanza sin encontrar
+# un camino alternativo, se crea el atajo de todos modos (la jerarquía sigue siendo correcta,
+# solo puede tener algunos atajos de más). Para estimar prioridades basta un límite menor
+LIMITE_TESTIGOS = 100
+LIMITE_TESTIGOS_PRIORIDAD = 20
+
+
+def _csr_desde_listas(listas, tipo_pesos):
+    """
+    Convierte listas de adyacencia {vecino: (peso, medio)} en arreglos CSR.
+
+    Args:
+        listas (list): Para cada ciudad, diccionario {vecino: (peso, medio)}.
+        tipo_pesos (str): Código de tipo de los pesos ('q' enteros, 'd' reales).
+
+    Returns:
+        tuple: (offsets, destinos, pesos, medios) como arreglos compactos.
+    """
+    offsets = array('q', [0])
+    destinos = array('q')
+    pesos = array(tipo_pesos)
+    medios = array('i')
+    for vecinos in listas:
+        for vecino, (peso, medio) in vecinos.items():
+            destinos.append(vecino)
+            pesos.append(peso)
+            medios.append(medio)
+        offsets.append(len(destinos))
+    return offsets, destinos, pesos, medios
+
+
+class JerarquiaContraccion:
+    """
+    Jerarquía de contracción (Contraction Hierarchies) para consultas de ruta más corta.
+
+    En el preprocesamiento las ciudades se contraen una por una, de la menos importante a
+    la más importante. Al contraer una ciudad v, por cada par de vecinos u -> v -> w se
+    agrega un atajo u -> w (con v como ciudad intermedia) salvo que exista un camino
+    testigo igual de corto que no pase por v. El orden se elige por diferencia de aristas:
+    atajos que habría que crear menos aristas que se eliminan.
+
+    Una consulta ejecuta dos búsquedas de Dijkstra que solo suben en la jerarquía: desde
+    el origen por las aristas hacia ciudades de mayor rango y desde el destino por las
+    aristas que llegan desde ciudades de mayor rango. Ambas búsquedas asientan muy pocas
+    ciudades, y la ruta se obtiene desempaquetando los atajos del camino encontrado.
+
+    La jerarquía se guarda en un archivo .npz junto al JSON del grafo; el nombre incluye
+    la huella del contenido del grafo, de modo que un grafo modificado no reutiliza una
+    jerarquía anterior.
+    """
+
+    def __init__(self, nombres, rango, tipo_pesos, subida, bajada):
+        """
+        Crea la jerarquía a partir de sus arreglos ya construidos o leídos desde disco.
+
+        Args:
+            nombres (list): Nombres de las ciudades ordenados por identificador.
+            rango (list): Posición de cada ciudad en el orden de contracción.
+            tipo_pesos (str): Código de tipo de los pesos ('q' enteros, 'd' reales).
+            subida (tuple): (offsets, destinos, pesos, medios) de las aristas u -> v con
+                rango[v] > rango[u], usadas por la búsqueda desde el origen.
+            bajada (tuple): (offsets, destinos, pesos, medios) de las aristas u -> v con
+                rango[u] > rango[v], guardadas en la fila de v, usadas por la búsqueda desde el destino.
+
+        En ambos casos medios[k] es la ciudad intermedia del atajo, o -1 si es una arista original.
+        """
+        self.nombres = nombres
+        self.indices = {nombre: i for i, nombre in enumerate(nombres)}
+        self.rango = rango
+        self.tipo_pesos = tipo_pesos
+        self.subida = subida
+        self.bajada = bajada
+
+    @property
+    def num_atajos(self):
+        """
+        Número de atajos agregados durante la contracción.
+
+        Returns:
+            int: Cantidad de aristas de la jerarquía que no existen en el grafo original.
+        """
+        return sum(1 for medio in self.subida[3] if medio != -1) + \
+            sum(1 for medio in self.bajada[3] if medio != -1)
+
+    @classmethod
+    def construir(cls, compacto, verificar=None):
+        """
+        Contrae todas las ciudades del grafo y arma la jerarquía.
+
+        Args:
+            compacto (GrafoCompacto): Representación compacta del grafo.
+            verificar (callable, optional): Función sin argumentos que se llama antes de
+                calcular la prioridad inicial de cada ciudad y antes de cada contracción;
+                puede lanzar una excepción para interrumpir la construcción (por ejemplo,
+                Tarea.verificar si se canceló la tarea).
+
+        Returns:
+            JerarquiaContraccion: La jerarquía lista para consultas.
+
+        La prioridad de cada ciudad es su diferencia de aristas más la cantidad de vecinos
+        ya contraídos, que reparte las contracciones de manera uniforme por todo el grafo.
+        Tras contraer una ciudad se recalcula la prioridad de sus vecinos, y al sacar una
+        ciudad de la cola se vuelve a calcular la suya (actualización perezosa): si ya no
+        es la menor, se vuelve a encolar.
+        """
+        n = compacto.num_nodos
+
+        # Grafo que queda por contraer: salidas[u][w] = entradas[w][u] = (peso, medio)
+        salidas = [{} for _ in range(n)]
+        entradas = [{} for _ in range(n)]
+        for u in range(n):
+            for k in range(compacto.offsets[u], compacto.offsets[u + 1]):
+                w = compacto.destinos[k]
+                if w != u and (w not in salidas[u] or compacto.pesos[k] < salidas[u][w][0]):
+                    salidas[u][w] = (compacto.pesos[k], -1)
+                    entradas[w][u] = (compacto.pesos[k], -1)
+
+        vecinos_contraidos = array('i', [0]) * n
+
+        def prioridad(v):
+            atajos = len(cls._atajos_necesarios(v, salidas, entradas, LIMITE_TESTIGOS_PRIORIDAD))
+            return atajos - len(entradas[v]) - len(salidas[v]) + vecinos_contraidos[v]
+
+        vigente = []
+        for v in range(n):
+            if verificar is not None:
+                verificar()
+            vigente.append(prioridad(v))
+        cola = [(p, v) for v, p in enumerate(vigente)]
+        heapq.heapify(cola)
+        contraidas = bytearray(n)
+        rango = [0] * n
+        subida = [None] * n
+        bajada = [None] * n
+
+        for siguiente_rango in range(n):
+            if verificar is not None:
+                verificar()
+            while True:
+                p, v = heapq.heappop(cola)
+                if contraidas[v] or p != vigente[v]:
+                    continue
+
+                # Actualización perezosa: si la prioridad empeoró, volver a encolar
+                vigente[v] = prioridad(v)
+                if not cola or vigente[v] <= cola[0][0]:
+                    break
+                heapq.heappush(cola, (vigente[v], v))
+
+            for u, w, peso in cls._atajos_necesarios(v, salidas, entradas, LIMITE_TESTIGOS):
+                salidas[u][w] = (peso, v)
+                entradas[w][u] = (peso, v)
+
+            # Las aristas que le quedan a v van hacia ciudades de mayor rango: pasan a la
+            # jerarquía y se quitan del grafo que queda por contraer
+            contraidas[v] = 1
+            rango[v] = siguiente_rango
+            subida[v] = salidas[v]
+            bajada[v] = entradas[v]
+            for u in entradas[v]:
+                del salidas[u][v]
+            for w in salidas[v]:
+                del entradas[w][v]
+
+            # Los vecinos cambian de grado y de vecinos contraídos: recalcular su prioridad
+            for vecino in set(entradas[v]) | set(salidas[v]):
+                vecinos_contraidos[vecino] += 1
+                vigente[vecino] = prioridad(vecino)
+                heapq.heappush(cola, (vigente[vecino], vecino))
+            salidas[v] = entradas[v] = None
+
+        return cls(list(compacto.nombres), rango, compacto.tipo_pesos,
+                   _csr_desde_listas(subida, compacto.tipo_pesos),
+                   _csr_desde_listas(bajada, compacto.tipo_pesos))
+
+    @staticmethod
+    def _atajos_necesarios(v, salidas, entradas, limite_asentadas):
+        """
+        Calcula los atajos que habría que agregar al contraer una ciudad.
+
+        Args:
+            v (int): Ciudad a contraer.
+            salidas (list): Aristas salientes de cada ciudad en el grafo que queda por contraer.
+            entradas (list): Aristas entrantes de cada ciudad en el grafo que queda por contraer.
+            limite_asentadas (int): Máximo de ciudades asentadas por cada búsqueda de testigos.
+
+        Returns:
+            list: Tuplas (u, w, peso) con los atajos u -> w que no tienen un camino testigo
+            tan corto como u -> v -> w entre las ciudades que aún no se contrajeron.
+        """
+        atajos = []
+        destinos = [(w, peso) for w, (peso, _) in salidas[v].items()]
+        if not destinos:
+            return atajos
+        peso_salida_maximo = max(peso for _, peso in destinos)
+
+        for u, (peso_entrada, _) in entradas[v].items():
+            limite = peso_entrada + peso_salida_maximo
+
+            # Búsqueda de testigos desde u sin pasar por v, acotada por el atajo más largo
+            distancias = {u: 0}
+            asentadas = set()
+            cola = [(0, u)]
+            while cola and len(asentadas) < limite_asentadas:
+                distancia, x = heapq.heappop(cola)
+                if x in asentadas:
+                    continue
+                if distancia > limite:
+                    break
+                asentadas.add(x)
+                for y, (peso, _) in salidas[x].items():
+                    if y == v:
+                        continue
+                    nueva_distancia = distancia + peso
+                    if nueva_distancia < distancias.get(y, math.inf):
+                        distancias[y] = nueva_distancia
+                        heapq.heappush(cola, (nueva_distancia, y))
+
+            for w, peso_salida in destinos:
+                if w == u:
+                    continue
+                por_v = peso_entrada + peso_salida
+                if distancias.get(w, math.inf) > por_v:
+                    atajos.append((u, w, por_v))
+        return atajos
+
+    @staticmethod
+    def ruta_archivo(ruta_json, huella):
+        """
+        Obtiene la ruta del archivo de la jerarquía para un grafo.
+
+        Args:
+            ruta_json (str): Ruta del archivo JSON del grafo, junto al cual se guarda la jerarquía.
+            huella (str): Huella del contenido del grafo.
+
+        Returns:
+            str: Ruta del archivo .npz.
+        """
+        base = os.path.splitext(ruta_json)[0]
+        return f"{base}.jerarquia.{huella[:16]}.npz"
+
+    def guardar(self, ruta_archivo):
+        """
+        Serializa la jerarquía en un archivo .npz.
+
+        Args:
+            ruta_archivo (str): Ruta del archivo a escribir.
+
+        El archivo se escribe con un nombre temporal y se renombra al terminar, para que
+        una escritura interrumpida no deje una jerarquía incompleta con el nombre definitivo.
+        """
+        arreglos = {"nombres": np.array(self.nombres, dtype=str),
+                    "rango": np.array(self.rango, dtype=np.int32),
+                    "tipo_pesos": np.array(self.tipo_pesos)}
+        for prefijo, (offsets, destinos, pesos, medios) in (("subida", self.subida), ("bajada", self.bajada)):
+            arreglos[f"{prefijo}_offsets"] = np.frombuffer(offsets, dtype=np.int64)
+            arreglos[f"{prefijo}_destinos"] = np.frombuffer(destinos, dtype=np.int64)
+            arreglos[f"{prefijo}_pesos"] = np.frombuffer(pesos, dtype=np.int64 if self.tipo_pesos == 'q' else np.float64)
+            arreglos[f"{prefijo}_medios"] = np.frombuffer(medios, dtype=np.int32)
+
+        # El temporal lleva el identificador del proceso: varios procesos que comparten la
+        # carpeta (ver comparacion_algoritmos) pueden guardar el mismo archivo a la vez
+        temporal = f"{ruta_archivo}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as archivo:
+            np.savez(archivo, **arreglos)
+        os.replace(temporal, ruta_archivo)
+
+    @classmethod
+    def cargar(cls, ruta_archivo):
+        """
+        Lee una jerarquía serializada con guardar().
+
+        Args:
+            ruta_archivo (str): Ruta del archivo .npz.
+
+        Returns:
+            JerarquiaContraccion or None: La jerarquía leída, o None si el archivo no existe.
+        """
+        if not os.path.exists(ruta_archivo):
+            return None
+
+        with np.load(ruta_archivo) as datos:
+            tipo_pesos = str(datos["tipo_pesos"])
+            partes = []
+            for prefijo in ("subida", "bajada"):
+                partes.append((array('q', datos[f"{prefijo}_offsets"].tolist()),
+                               array('q', datos[f"{prefijo}_destinos"].tolist()),
+                               array(tipo_pesos, datos[f"{prefijo}_pesos"].tolist()),
+                               array('i', datos[f"{prefijo}_medios"].tolist())))
+            return cls(datos["nombres"].tolist(), datos["rango"].tolist(), tipo_pesos, *partes)
+
+    @classmethod
+    def obtener(cls, compacto, ruta_json, forzar=False, verificar=None):
+        """
+        Carga la jerarquía del grafo desde disco o la construye y la guarda.
+
+        Args:
+            compacto (GrafoCompacto): Representación compacta del grafo.
+            ruta_json (str): Ruta del archivo JSON del grafo.
+            forzar (bool, optional): Si es True, reconstruye aunque exista el archivo.
+            verificar (callable, optional): Función que puede interrumpir la construcción
+                (ver construir); si la interrumpe, no se guarda nada.
+
+        Returns:
+            JerarquiaContraccion: La jerarquía correspondiente al contenido actual del grafo.
+
+        Al guardar una jerarquía nueva se eliminan las de versiones anteriores del grafo.
+        """
+        ruta_archivo = cls.ruta_archivo(ruta_json, huella_grafo(compacto))
+        jerarquia = None if forzar else cls.cargar(ruta_archivo)
+        if jerarquia is None:
+            jerarquia = cls.construir(compacto, verificar)
+
+            base = os.path.splitext(ruta_json)[0]
+            for anterior in glob.glob(f"{glob.escape(base)}.jerarquia.*.npz"):
+                if anterior != ruta_archivo:
+                    # Otro proceso pudo haberlo eliminado ya
+                    try:
+                        os.remove(anterior)
+                    except FileNotFoundError:
+                        pass
+            jerarquia.guardar(ruta_archivo)
+        return jerarquia
+
+    def _arista(self, u, w):
+        """
+        Busca una arista u -> w de la jerarquía.
+
+        Args:
+            u (int): Identificador de la ciudad de origen.
+            w (int): Identificador de la ciudad de destino.
+
+        Returns:
+            tuple: (peso, medio) de la arista.
+        """
+        if self.rango[w] > self.rango[u]:
+            offsets, destinos, pesos, medios = self.subida
+            fila, buscado = u, w
+        else:
+            offsets, destinos, pesos, medios = self.bajada
+            fila, buscado = w, u
+        for k in range(offsets[fila], offsets[fila + 1]):
+            if destinos[k] == buscado:
+                return pesos[k], medios[k]
+        raise KeyError((u, w))
+
+    def _desempaquetar(self, u, w, ruta):
+        """
+        Agrega a la ruta las ciudades originales que representa la arista u -> w (sin u).
+
+        Args:
+            u (int): Identificador de la ciudad de origen de la arista.
+            w (int): Identificador de la ciudad de destino de la arista.
+            ruta (list): Lista de identificadores a la que se agregan las ciudades.
+
+        Usa una pila en lugar de recursión, porque un atajo puede anidar muchos otros.
+        """
+        pila = [(u, w)]
+        while pila:
+            a, b = pila.pop()
+            _, medio = self._arista(a, b)
+            if medio == -1:
+                ruta.append(b)
+            else:
+                # Primero se procesa a -> medio, por eso se apila al final
+                pila.append((medio, b))
+                pila.append((a, medio))
+
+    def consultar(self, origen, destino, estadisticas=None, observador=None):
+        """
+        Encuentra la ruta más corta entre dos ciudades usando la jerarquía.
+
+        Args:
+            origen (str): Nombre de la ciudad de origen.
+            destino (str): Nombre de la ciudad de destino.
+            estadisticas (EstadisticasBusqueda, optional): Contadores a completar con la consulta.
+            observador (callable, optional): Función observador(ciudad, distancia, tamaño_frontera)
+                llamada en cada expansión.
+
+        Returns:
+            tuple: (ruta, distancia) con el mismo formato que las búsquedas de GrafoEcuador.
+                Si no hay ruta, retorna (None, 0).
+
+        Alterna una búsqueda hacia arriba desde el origen (aristas de subida) y otra desde
+        el destino (aristas de bajada, recorridas al revés). Ambas se encuentran en la ciudad
+        de mayor rango del camino más corto; cada dirección se detiene cuando su menor
+        distancia pendiente ya no puede mejorar el mejor encuentro.
+        """
+        s = self.indices.get(origen)
+        t = self.indices.get(destino)
+        if s is None or t is None:
+            return None, 0
+        if s == t:
+            return [origen], 0
+
+        aristas = (self.subida, self.bajada)
+        distancias = ({s: 0}, {t: 0})
+        predecesores = ({s: s}, {t: t})
+        asentadas = (set(), set())
+        colas = ([(0, s)], [(0, t)])
+
+        mejor_distancia = math.inf
+        encuentro = -1
+        lado = 1
+        inserciones, extracciones, obsoletas, frontera_maxima = 2, 0, 0, 2
+        while colas[0] or colas[1]:
+            # Alternar de dirección mientras ambas tengan ciudades pendientes
+            if colas[1 - lado]:
+                lado = 1 - lado
+            cola = colas[lado]
+            distancia, actual = heapq.heappop(cola)
+            extracciones += 1
+            if distancia >= mejor_distancia:
+                cola.clear()
+                continue
+            if actual in asentadas[lado]:
+                obsoletas += 1
+                continue
+            asentadas[lado].add(actual)
+
+            opuestas = distancias[1 - lado]
+            if actual in opuestas and distancia + opuestas[actual] < mejor_distancia:
+                mejor_distancia = distancia + opuestas[actual]
+                encuentro = actual
+
+            offsets, destinos, pesos, _ = aristas[lado]
+            propias = distancias[lado]
+            for k in range(offsets[actual], offsets[actual + 1]):
+                vecino = destinos[k]
+                nueva_distancia = distancia + pesos[k]
+                if nueva_distancia < propias.get(vecino, math.inf):
+                    propias[vecino] = nueva_distancia
+                    predecesores[lado][vecino] = actual
+                    heapq.heappush(cola, (nueva_distancia, vecino))
+                    inserciones += 1
+
+            frontera_maxima = max(frontera_maxima, len(colas[0]) + len(colas[1]))
+            if observador is not None:
+                observador(self.nombres[actual], distancia, len(colas[0]) + len(colas[1]))
+
+        if estadisticas is not None:
+            estadisticas.asentados_adelante = len(asentadas[0])
+            estadisticas.asentados_atras = len(asentadas[1])
+            estadisticas.expandidos = len(asentadas[0]) + len(asentadas[1])
+            estadisticas.inserciones = inserciones
+            estadisticas.extracciones = extracciones
+            estadisticas.extracciones_obsoletas = obsoletas
+            estadisticas.frontera_maxima = frontera_maxima
+            estadisticas.registrar_memoria(*distancias, *predecesores)
+
+        if encuentro == -1:
+            return None, 0
+
+        # Camino en la jerarquía: origen -> encuentro (subiendo) y encuentro -> destino (bajando)
+        camino = [encuentro]
+        while camino[-1] != s:
+            camino.append(predecesores[0][camino[-1]])
+        camino.reverse()
+        while camino[-1] != t:
+            camino.append(predecesores[1][camino[-1]])
+
+        ruta = [s]
+        for u, w in zip(camino, camino[1:]):
+            self._desempaquetar(u, w, ruta)
+        return [self.nombres[i] for i in ruta], mejor_distancia
+
+
+def verificar_contra_costo_uniforme(grafo, jerarquia):
+    """
+    Compara la jerarquía con busqueda_costo_uniforme para todos los pares de ciudades.
+
+    Args:
+        grafo (GrafoEcuador): Grafo de referencia.
+        jerarquia (JerarquiaContraccion): Jerarquía construida a partir del mismo grafo.
+
+    Returns:
+        list: Pares (origen, destino) en los que la distancia difiere, la ruta no existe en
+        uno solo de los dos métodos, o la ruta desempaquetada no suma la distancia reportada.
+        Una lista vacía indica que la jerarquía es correcta.
+    """
+    errores = []
+    for origen in grafo.ciudades:
+        for destino in grafo.ciudades:
+            ruta_esperada, distancia_esperada = grafo.busqueda_costo_uniforme(origen, destino)
+            ruta, distancia = jerarquia.consultar(origen, destino)
+            if (ruta is None) != (ruta_esperada is None) or distancia != distancia_esperada:
+                errores.append((origen, destino))
+            elif ruta is not None and (ruta[0] != origen or ruta[-1] != destino or
+                                       sum(grafo.grafo[a][b] for a, b in zip(ruta, ruta[1:])) != distancia):
+                errores.append((origen, destino))
+    return errores
+
+
+if __name__ == "__main__":
+    """
+    Construye la jerarquía del grafo de ejemplo y la del archivo JSON, y verifica que
+    ambas den las mismas distancias que la búsqueda de costo uniforme para todos los pares.
+    """
+    # Importación local para evitar una dependencia circular con grafo_ecuador
+    import time
+    from grafo_ecuador import GrafoEcuador
+
+    for descripcion, grafo in (("grafo de ejemplo", GrafoEcuador()),
+                               ("grafo_ecuador.json", GrafoEcuador("grafo_ecuador.json"))):
+        inicio = time.perf_counter()
+        jerarquia = JerarquiaContraccion.construir(grafo.compacto)
+        segundos = time.perf_counter() - inicio
+
+        errores = verificar_contra_costo_uniforme(grafo, jerarquia)
+        print(f"{descripcion}: {len(grafo.ciudades)} ciudades, {jerarquia.num_atajos} atajos, "
+              f"construida en {segundos:.3f} s")
+        if errores:
+            print(f"  ERROR: {len(errores)} pares no coinciden, por ejemplo {errores[:3]}")
+        else:
+            print(f"  Correcta: {len(grafo.ciudades) ** 2} pares coinciden con busqueda_costo_uniforme")
@@ -9,7 +9,7 @@ import json
 
 # Módulos locales
 # Clase principal que implementa la interfaz gráfica de la aplicación
-from interfaz_grafo import AplicacionRutas 
+from interfaz_grafo import AplicacionRutas, ARCHIVO_INSTANTANEA 
 # Clase que maneja la estructura de datos del grafo de ciudades
 from grafo_ecuador import GrafoEcuador 
 # Clase para gestionar la base de datos SQLite de rutas
@@ -30,6 +30,11 @@ def inicializar_sistema():
     4. Verifica si la base de datos tiene las columnas de coordenadas
     5. Actualiza las coordenadas faltantes en la base de datos
     6. Cierra la conexión a la base de datos
+    7. Si hay una instantánea del grafo de esta base de datos, la abre
+    
+    Retorna:
+        GrafoEcuador: El grafo abierto desde la instantánea, o None si no hay una
+        instantánea válida y el grafo debe cargarse desde la base de datos
     
     Nota: Este método debe ser llamado al inicio de la aplicación para asegurar
     que todos los componentes necesarios estén disponibles y configurados correctamente.
@@ -64,9 +69,45 @@ def inicializar_sistema():
     # Verificar si hay ciudades sin coordenadas y asignarlas desde el grafo predeterminado
     actualizar_coordenadas_faltantes(db)
     
+    grafo = cargar_instantanea_vigente(db)
+    
     db.cerrar()
     
     print("Sistema inicializado correctamente.")
+    return grafo
+
+def cargar_instantanea_vigente(db):
+    """
+    Abre la instantánea binaria del grafo si corresponde a la base de datos.
+    
+    La instantánea guarda el número del último cambio de la base de datos que incluye
+    (ver GrafoEcuador.desde_instantanea): los cambios posteriores, hechos por este u otro
+    proceso, los aplica AplicacionRutas al iniciar con BaseDatosRutas.aplicar_cambios_desde.
+    Si ese número es mayor que el último cambio de la base de datos, la instantánea no puede
+    ser de esta base de datos (por ejemplo, se borró y se volvió a crear) y se descarta.
+    Como el archivo se abre con mapeo de memoria, un grafo grande queda listo en
+    milisegundos, sin leer las tablas de SQLite.
+    
+    Parámetros:
+        db (BaseDatosRutas): Base de datos con la que se compara la instantánea
+    
+    Retorna:
+        GrafoEcuador: El grafo abierto desde la instantánea, o None si no existe, es de
+        otra base de datos o no se puede leer
+    """
+    if not os.path.exists(ARCHIVO_INSTANTANEA):
+        return None
+    
+    try:
+        grafo = GrafoEcuador.desde_instantanea(ARCHIVO_INSTANTANEA)
+    except (OSError, ValueError) as e:
+        print(f"No se pudo abrir la instantánea del grafo: {e}")
+        return None
+    if grafo.seq_instantanea > db.ultimo_cambio():
+        print("La instantánea del grafo no corresponde a la base de datos; se cargará la base de datos.")
+        return None
+    print(f"Grafo abierto desde la instantánea ({len(grafo.ciudades)} ciudades).")
+    return grafo
 
 def actualizar_coordenadas_faltantes(db):
     """
@@ -119,6 +160,7 @@ def verificar_dependencias():
     - tkinter: Para la interfaz gráfica de usuario
     - matplotlib: Para la visualización de grafos y mapas
     - networkx: Para el manejo y análisis de grafos
+    - numpy: Para el cálculo vectorizado de distancias en línea recta
     
     Proceso:
     1. Define un diccionario con las dependencias y sus descripciones
@@ -135,7 +177,8 @@ def verificar_dependencias():
     dependencias = {
         "tkinter": "Interfaz gráfica",
         "matplotlib": "Visualización de grafos",
-        "networkx": "Manejo de grafos"
+        "networkx": "Manejo de grafos",
+        "numpy": "Cálculo vectorizado de distancias"
     }
     
     faltantes = []
@@ -150,7 +193,7 @@ def verificar_dependencias():
         for dep in faltantes:
             print(f"  - {dep}")
         print("\nPuede instalarlas con pip:")
-        print("pip install matplotlib networkx")
+        print("pip install matplotlib networkx numpy")
         return False
     
     return True
@@ -191,12 +234,12 @@ def main():
             input("Presione Enter para salir...")
             return
         
-        # Inicializar el sistema
-        inicializar_sistema()
+        # Inicializar el sistema (y abrir la instantánea del grafo si está al día)
+        grafo = inicializar_sistema()
         
         # Crear y ejecutar la interfaz gráfica
         root = tk.Tk()
-        app = AplicacionRutas(root)
+        app = AplicacionRutas(root, grafo=grafo)
         root.protocol("WM_DELETE_WINDOW", app.on_closing)
         root.mainloop()
     except Exception as e:
@@ -0,0 +1,254 @@
+# Importación de glob y os para ubicar y limpiar los archivos de caché
+import glob
+import os
+
+# Importación de hashlib para calcular la huella del contenido del grafo
+# Se utiliza para invalidar la caché cuando el grafo cambia
+import hashlib
+
+# Importación de heapq para la cola de prioridad de Dijkstra
+import heapq
+
+# Importación de ProcessPoolExecutor para ejecutar Dijkstra desde cada origen en paralelo
+from concurrent.futures import ProcessPoolExecutor
+
+# Importación de array para las estructuras auxiliares de cada búsqueda
+from array import array
+
+# Importación de numpy para las matrices de distancias y siguiente salto
+# Se guardan como archivos .npy y se abren con mapeo de memoria
+import numpy as np
+
+
+# Datos del grafo compartidos por cada proceso trabajador (se fijan en _inicializar_trabajador)
+_offsets = None
+_destinos = None
+_pesos = None
+
+
+def huella_grafo(compacto):
+    """
+    Calcula una huella del contenido del grafo para invalidar la caché de todos los pares.
+
+    Args:
+        compacto (GrafoCompacto): Representación compacta del grafo.
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal de los nombres, la adyacencia y las distancias.
+
+    La huella cambia si se agrega o elimina una ciudad o arista, si cambia una distancia
+    o si cambia el orden de los identificadores, que es el orden de filas y columnas de
+    las matrices guardadas.
+    """
+    huella = hashlib.sha256()
+    huella.update("\0".join(compacto.nombres).encode("utf-8"))
+    huella.update(compacto.tipo_pesos.encode("ascii"))
+    huella.update(compacto.offsets.tobytes())
+    huella.update(compacto.destinos.tobytes())
+    huella.update(compacto.pesos.tobytes())
+    return huella.hexdigest()
+
+
+def _inicializar_trabajador(offsets, destinos, pesos):
+    """
+    Inicializa un proceso trabajador con los arreglos CSR del grafo.
+
+    Args:
+        offsets (array): Desplazamientos de cada ciudad.
+        destinos (array): Destino de cada arista.
+        pesos (array): Distancia de cada arista.
+    """
+    global _offsets, _destinos, _pesos
+    _offsets, _destinos, _pesos = offsets, destinos, pesos
+
+
+def _fila_desde(origen):
+    """
+    Ejecuta Dijkstra desde un origen y calcula su fila de distancias y de siguiente salto.
+
+    Args:
+        origen (int): Identificador de la ciudad de origen.
+
+    Returns:
+        tuple: (origen, distancias, siguiente) donde:
+            - distancias: numpy.ndarray de float64 con la distancia más corta a cada ciudad (inf si no es alcanzable)
+            - siguiente: numpy.ndarray de int32 con la primera ciudad del camino más corto hacia cada
+              ciudad (-1 si no es alcanzable; el propio origen para sí mismo)
+    """
+    n = len(_offsets) - 1
+    distancias = array('d', [float('inf')]) * n  # Distancia tentativa (definitiva al asentarse)
+    predecesores = array('i', [-1]) * n
+    visitados = bytearray(n)
+    orden = []  # Ciudades en el orden en que quedan asentadas
+
+    distancias[origen] = 0
+    cola_prioridad = [(0, origen)]
+    while cola_prioridad:
+        distancia, actual = heapq.heappop(cola_prioridad)
+        if visitados[actual]:
+            continue
+        visitados[actual] = 1
+        orden.append(actual)
+
+        for k in range(_offsets[actual], _offsets[actual + 1]):
+            vecino = _destinos[k]
+            if not visitados[vecino]:
+                nueva_distancia = distancia + _pesos[k]
+                if nueva_distancia < distancias[vecino]:
+                    distancias[vecino] = nueva_distancia
+                    predecesores[vecino] = actual
+                    heapq.heappush(cola_prioridad, (nueva_distancia, vecino))
+
+    # El primer salto hacia cada ciudad es el de su predecesor, salvo los vecinos directos
+    # del origen. Se recorre en orden de asentamiento para que el predecesor ya esté resuelto
+    siguiente = np.full(n, -1, dtype=np.int32)
+    siguiente[origen] = origen
+    for ciudad in orden[1:]:
+        predecesor = predecesores[ciudad]
+        siguiente[ciudad] = ciudad if predecesor == origen else siguiente[predecesor]
+
+    return origen, np.frombuffer(distancias, dtype=np.float64), siguiente
+
+
+class MatrizTodosLosPares:
+    """
+    Distancias más cortas y tabla de siguiente salto entre todos los pares de ciudades.
+
+    Las matrices se guardan en disco como archivos .npy junto al archivo JSON del grafo y
+    se abren con mapeo de memoria, de modo que solo se leen las filas que se consultan.
+    El nombre de los archivos incluye la huella del grafo: si el grafo cambia, la caché
+    anterior deja de coincidir y se recalcula.
+
+    Nota: cada matriz ocupa n² posiciones (8 bytes por distancia y 4 por salto), por lo que
+    es adecuada para redes de hasta algunos miles de ciudades.
+    """
+
+    def __init__(self, compacto, distancias, siguiente):
+        """
+        Crea la matriz a partir de arreglos ya calculados o abiertos desde disco.
+
+        Args:
+            compacto (GrafoCompacto): Representación compacta del grafo (para traducir nombres).
+            distancias (numpy.ndarray): Matriz n x n de distancias.
+            siguiente (numpy.ndarray): Matriz n x n de siguiente salto.
+        """
+        self.compacto = compacto
+        self.distancias = distancias
+        self.siguiente = siguiente
+
+    @staticmethod
+    def rutas_cache(ruta_json, huella):
+        """
+        Obtiene las rutas de los archivos de caché para un grafo.
+
+        Args:
+            ruta_json (str): Ruta del archivo JSON del grafo, junto al cual se guarda la caché.
+            huella (str): Huella del contenido del grafo.
+
+        Returns:
+            tuple: (ruta_distancias, ruta_siguiente) de los archivos .npy.
+        """
+        base = os.path.splitext(ruta_json)[0]
+        return (f"{base}.distancias.{huella[:16]}.npy",
+                f"{base}.siguiente.{huella[:16]}.npy")
+
+    @classmethod
+    def cargar(cls, compacto, ruta_json):
+        """
+        Abre la caché de disco si existe y corresponde al contenido actual del grafo.
+
+        Args:
+            compacto (GrafoCompacto): Representación compacta del grafo.
+            ruta_json (str): Ruta del archivo JSON del grafo.
+
+        Returns:
+            MatrizTodosLosPares or None: La matriz mapeada en memoria, o None si no hay caché válida.
+        """
+        ruta_distancias, ruta_siguiente = cls.rutas_cache(ruta_json, huella_grafo(compacto))
+        if not (os.path.exists(ruta_distancias) and os.path.exists(ruta_siguiente)):
+            return None
+
+        distancias = np.load(ruta_distancias, mmap_mode='r')
+        siguiente = np.load(ruta_siguiente, mmap_mode='r')
+        if distancias.shape != (compacto.num_nodos, compacto.num_nodos) or siguiente.shape != distancias.shape:
+            return None
+        return cls(compacto, distancias, siguiente)
+
+    @classmethod
+    def calcular(cls, compacto, ruta_json, procesos=None):
+        """
+        Calcula las matrices ejecutando Dijkstra desde cada ciudad en un grupo de procesos.
+
+        Args:
+            compacto (GrafoCompacto): Representación compacta del grafo.
+            ruta_json (str): Ruta del archivo JSON del grafo, junto al cual se guarda la caché.
+            procesos (int, optional): Número de procesos trabajadores. Por defecto, uno por CPU.
+
+        Returns:
+            MatrizTodosLosPares: La matriz recién calculada, abierta desde disco con mapeo de memoria.
+
+        Cada fila se escribe directamente en archivos .npy mapeados en memoria a medida que
+        llega de los trabajadores, así que la matriz completa nunca se arma en RAM. Los
+        archivos se escriben con un nombre temporal y se renombran al terminar, y las cachés
+        de versiones anteriores del grafo se eliminan.
+        """
+        n = compacto.num_nodos
+        ruta_distancias, ruta_siguiente = cls.rutas_cache(ruta_json, huella_grafo(compacto))
+        temporal_distancias = ruta_distancias + ".tmp"
+        temporal_siguiente = ruta_siguiente + ".tmp"
+
+        distancias = np.lib.format.open_memmap(temporal_distancias, mode='w+', dtype=np.float64, shape=(n, n))
+        siguiente = np.lib.format.open_memmap(temporal_siguiente, mode='w+', dtype=np.int32, shape=(n, n))
+
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_trabajador,
+                                 initargs=(array('q', compacto.offsets), array('q', compacto.destinos),
+                                           array(compacto.tipo_pesos, compacto.pesos))) as grupo:
+            lote = max(1, n // (4 * (procesos or os.cpu_count() or 1)))
+            for origen, fila_distancias, fila_siguiente in grupo.map(_fila_desde, range(n), chunksize=lote):
+                distancias[origen] = fila_distancias
+                siguiente[origen] = fila_siguiente
+
+        distancias.flush()
+        siguiente.flush()
+        del distancias, siguiente
+
+        # Eliminar cachés de versiones anteriores del grafo antes de publicar la nueva
+        base = os.path.splitext(ruta_json)[0]
+        for anterior in glob.glob(f"{glob.escape(base)}.distancias.*.npy") + glob.glob(f"{glob.escape(base)}.siguiente.*.npy"):
+            if anterior not in (ruta_distancias, ruta_siguiente):
+                os.remove(anterior)
+
+        os.replace(temporal_distancias, ruta_distancias)
+        os.replace(temporal_siguiente, ruta_siguiente)
+
+        return cls.cargar(compacto, ruta_json)
+
+    def obtener_ruta(self, origen, destino):
+        """
+        Reconstruye la ruta más corta entre dos ciudades siguiendo la tabla de siguiente salto.
+
+        Args:
+            origen (str): Nombre de la ciudad de origen.
+            destino (str): Nombre de la ciudad de destino.
+
+        Returns:
+            tuple: (ruta, distancia) con el mismo formato que las búsquedas de GrafoEcuador.
+                Si no hay ruta, retorna (None, 0).
+
+        El costo es proporcional a la longitud de la ruta: no se ejecuta ninguna búsqueda.
+        """
+        i = self.compacto.indice(origen)
+        j = self.compacto.indice(destino)
+        if i is None or j is None or self.siguiente[i, j] == -1:
+            return None, 0
+
+        ruta = [i]
+        actual = i
+        while actual != j:
+            actual = int(self.siguiente[actual, j])
+            ruta.append(actual)
+
+        distancia = float(self.distancias[i, j])
+        if self.compacto.tipo_pesos == 'q':
+            distancia = int(distancia)
+        return self.compacto.traducir_ruta(ruta), distancia
@@ -0,0 +1,200 @@
+# Importación de concurrent.futures para los hilos que ejecutan las tareas y para esperar
+# a que termine una tarea cancelada
+import concurrent.futures
+
+
+# Cada cuántos milisegundos el hilo de la interfaz revisa el progreso y los resultados
+INTERVALO_REVISION_MS = 50
+
+
+class TareaCancelada(Exception):
+    """
+    Excepción con la que una tarea se interrumpe cuando fue cancelada o reemplazada.
+    """
+
+
+class Tarea:
+    """
+    Estado que comparten una tarea en segundo plano y la interfaz.
+
+    La tarea llama a informar (o a verificar) cada cierto tiempo: ambos lanzan
+    TareaCancelada si la tarea fue cancelada, de modo que termina en el siguiente paso.
+
+    Atributos:
+        cancelada (bool): Se vuelve True al cancelar o reemplazar la tarea. Es un atributo
+            simple y no un threading.Event porque se consulta en cada paso de la búsqueda.
+        progreso (tuple): Último progreso informado por la tarea; lo lee la interfaz.
+        avisos (int): Cuántas veces la tarea llamó a informar. Usada como observador de una
+            búsqueda, es la cantidad de ciudades expandidas hasta el momento.
+    """
+
+    def __init__(self):
+        """
+        Crea el estado de una tarea sin cancelar y sin progreso.
+        """
+        self.cancelada = False
+        self.progreso = None
+        self.avisos = 0
+
+    def verificar(self):
+        """
+        Interrumpe la tarea si fue cancelada.
+
+        Raises:
+            TareaCancelada: Si la tarea fue cancelada o reemplazada.
+        """
+        if self.cancelada:
+            raise TareaCancelada()
+
+    def informar(self, *progreso):
+        """
+        Publica el progreso de la tarea e interrumpe la tarea si fue cancelada.
+
+        Args:
+            *progreso: Valores que la interfaz recibe como tupla en al_progresar. Así,
+                informar puede usarse directamente como función de aviso (por ejemplo,
+                como GrafoEcuador.observador) sin una función intermedia.
+
+        Raises:
+            TareaCancelada: Si la tarea fue cancelada o reemplazada.
+        """
+        if self.cancelada:
+            raise TareaCancelada()
+        self.progreso = progreso
+        self.avisos += 1
+
+
+class TrabajadorSegundoPlano:
+    """
+    Ejecuta tareas largas fuera del bucle de eventos de Tk y entrega sus resultados en él.
+
+    Cada tarea pertenece a un canal (por ejemplo, "busqueda" o "dibujo") y cada canal tiene
+    su propio hilo, así que las tareas de canales distintos avanzan a la vez y las de un
+    mismo canal se ejecutan de a una. Enviar una tarea a un canal reemplaza a la anterior
+    del mismo canal: si todavía no empezó se descarta, y si está en curso se marca como
+    cancelada y su resultado se ignora. Así, varios clics seguidos no acumulan trabajo viejo.
+
+    Los hilos nunca tocan los widgets: el progreso y los resultados se revisan desde el
+    hilo de la interfaz con root.after cada INTERVALO_REVISION_MS milisegundos mientras
+    haya tareas pendientes, y las funciones al_terminar, al_progresar y al_fallar se
+    llaman siempre en ese hilo.
+    """
+
+    def __init__(self, root, canales=("busqueda", "dibujo")):
+        """
+        Crea un hilo por canal.
+
+        Args:
+            root (tk.Tk): Ventana principal, para programar las revisiones con root.after.
+            canales (tuple, optional): Nombres de los canales.
+        """
+        self.root = root
+        self._hilos = {canal: concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=canal)
+                       for canal in canales}
+        # {canal: (tarea, futuro, al_terminar, al_progresar, al_fallar)} de la tarea vigente
+        self._vigentes = {}
+        self._revisando = False
+
+    def enviar(self, canal, funcion, al_terminar, al_progresar=None, al_fallar=None):
+        """
+        Ejecuta una función en el hilo de un canal, reemplazando la tarea anterior del canal.
+
+        Args:
+            canal (str): Canal de la tarea.
+            funcion (callable): Función funcion(tarea) que se ejecuta en segundo plano;
+                recibe la Tarea para informar el progreso y detectar la cancelación.
+            al_terminar (callable): Recibe el resultado de la función.
+            al_progresar (callable, optional): Recibe el último progreso informado.
+            al_fallar (callable, optional): Recibe la excepción si la función falla (salvo
+                TareaCancelada). Si es None, el error se imprime.
+
+        Returns:
+            Tarea: Estado de la tarea enviada.
+        """
+        self.cancelar(canal)
+        tarea = Tarea()
+        futuro = self._hilos[canal].submit(funcion, tarea)
+        self._vigentes[canal] = (tarea, futuro, al_terminar, al_progresar, al_fallar)
+        if not self._revisando:
+            self._revisando = True
+            self.root.after(INTERVALO_REVISION_MS, self._revisar)
+        return tarea
+
+    def cancelar(self, canal, esperar=False):
+        """
+        Cancela la tarea vigente de un canal; su resultado ya no se entrega.
+
+        Args:
+            canal (str): Canal de la tarea.
+            esperar (bool, optional): Si es True y la tarea está en curso, espera a que
+                termine (por ejemplo, antes de modificar los datos que la tarea lee).
+        """
+        vigente = self._vigentes.pop(canal, None)
+        if vigente is None:
+            return
+        tarea, futuro = vigente[:2]
+        tarea.cancelada = True
+        if not futuro.cancel() and esperar:
+            concurrent.futures.wait([futuro])
+
+    def cancelar_todas(self, esperar=False):
+        """
+        Cancela las tareas vigentes de todos los canales.
+
+        Args:
+            esperar (bool, optional): Si es True, espera a que terminen las que están en curso.
+        """
+        for canal in list(self._vigentes):
+            self.cancelar(canal, esperar)
+
+    def ocupado(self, canal=None):
+        """
+        Indica si hay una tarea vigente sin entregar.
+
+        Args:
+            canal (str, optional): Canal a consultar; si es None, cualquiera.
+
+        Returns:
+            bool: True si el canal (o alguno) tiene una tarea pendiente.
+        """
+        return canal in self._vigentes if canal is not None else bool(self._vigentes)
+
+    def cerrar(self):
+        """
+        Cancela las tareas y detiene los hilos sin esperar a las que estén en curso.
+        """
+        self.cancelar_todas()
+        for hilo in self._hilos.values():
+            hilo.shutdown(wait=False, cancel_futures=True)
+
+    def _revisar(self):
+        """
+        Entrega el progreso y los resultados de las tareas vigentes (en el hilo de la interfaz).
+        """
+        for canal, vigente in list(self._vigentes.items()):
+            # Una función entregada antes en esta misma revisión pudo reemplazar la tarea
+            if self._vigentes.get(canal) is not vigente:
+                continue
+            tarea, futuro, al_terminar, al_progresar, al_fallar = vigente
+            if not futuro.done():
+                if al_progresar is not None and tarea.progreso is not None:
+                    al_progresar(tarea.progreso)
+                continue
+
+            del self._vigentes[canal]
+            try:
+                resultado = futuro.result()
+            except (TareaCancelada, concurrent.futures.CancelledError):
+                continue
+            except Exception as e:
+                if al_fallar is not None:
+                    al_fallar(e)
+                else:
+                    print(f"Error en la tarea en segundo plano ({canal}): {e}")
+                continue
+            al_terminar(resultado)
+
+        if self._vigentes:
+            self.root.after(INTERVALO_REVISION_MS, self._revisar)
+        else:
+            self._revisando = False